@@ -1,5 +1,9 @@
+import time
+
 import pandas as pd
 
+from atlas_cache import AtlasCache
+
 TARGET_TRACTS = [
     "40109108005", "40109107900", "40109101500", "40109107806",
     "40109107703", "40109107218", "40109105300", "40109107002",
@@ -8,8 +12,6 @@ TARGET_TRACTS = [
     "40109100800"
 ]
 
-df = pd.read_csv("food_access.csv", dtype=str)
-
 # 100% confirmed correct USDA columns:
 numeric_cols = [
     "PovertyRate", "MedianFamilyIncome",
@@ -18,20 +20,26 @@ numeric_cols = [
     "LAPOP1_20",  # ✅ population within 10 miles
     "lapop20share"
 ]
+
+# Typed Feather cache of food_access.csv, rebuilt only when the CSV changes (see atlas_cache.py)
+t0 = time.perf_counter()
+atlas = AtlasCache.open("food_access.csv", columns=numeric_cols)
 for col in numeric_cols:
-    if col in df.columns:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
-    else:
+    if col not in atlas.columns:
         print(f"ERROR: Missing column '{col}' — check spelling in your CSV.")
         exit()
 
+rows = atlas.lookup(TARGET_TRACTS)
+for col in numeric_cols:
+    rows[col] = pd.to_numeric(rows[col], errors="coerce")
+print(f"Loaded {len(rows)} of {len(TARGET_TRACTS)} tracts from {atlas.path} in {time.perf_counter() - t0:.3f}s\n")
+
 for tract in TARGET_TRACTS:
-    row = df[df["CensusTract"] == tract]
-    if row.empty:
+    if tract not in rows.index:
         print(f"Tract {tract} — NOT FOUND.\n")
         continue
 
-    row = row.iloc[0]
+    row = rows.loc[tract]
 
     poverty = f"{row['PovertyRate']:.1f}%" if pd.notna(row['PovertyRate']) else "N/A"
     income = f"${row['MedianFamilyIncome']:,.0f}" if pd.notna(row['MedianFamilyIncome']) else "N/A"
@@ -1,46 +1,82 @@
+import sys
+
 import pandas as pd
 import numpy as np
-from libpysal.weights import KNN
-from esda.moran import Moran
+
+import parsing
+import schema
+import scoring
+import spatial_stats
+import spatial_weights
 
 CSV_FILE = "okc_data.csv"
+LOCAL_CSV = "spatial_clusters.csv"
+PERMUTATIONS = 9999
+WORKERS = 1  # worker processes for the permutation chunks
+# "need" is scoring's weighting renormalized over the indicators okc_data.csv carries
+# (poverty, health, 1-mile grocery share, income; no SNAP), so it is not OKC_MAPPED's
+# composite_score; it is left out when any of those columns is missing, like a
+# health variable whose column is missing
+VARIABLES = ["poverty", "obesity", "diabetes", "inactive", "need"]
+NEED_KEYS = ("poverty", "income", "grocery", "obesity", "diabetes", "inactive")
+
+def run(csv_path=CSV_FILE, local_csv=LOCAL_CSV, variables=VARIABLES):
+    # global Moran's I of poverty, then LISA and Gi* for every variable; returns (global, local)
+    # columns are matched by the same cached keyword mapping as Regression.py (see schema.py)
+    df, profile = schema.load_sheet(csv_path, "regression")
+    col = profile["mapping"]
+    if col["poverty"] is None or col["latitude"] is None:
+        raise SystemExit(f"{csv_path} needs a poverty and a latitude column; found {profile['columns']}")
 
-df = pd.read_csv(CSV_FILE)
+    # ---- CLEAN ----
+    for key in ("poverty", "obesity", "diabetes", "inactive", "income"):
+        if col[key] is not None:
+            df[key], _ = parsing.parse_plain(df[col[key]])
 
-# ---- CLEAN ----
-df.columns = df.columns.str.strip().str.lower()
+    # parse lat/lon from coordinate column
+    df["lat"], df["lon"] = parsing.parse_latlon(df[col["latitude"]])
+    # tract id for the output, or the CSV line when the sheet has no tract column
+    df["tract_fips"] = (df[col["tract"]] if col["tract"] is not None
+                        else "row " + pd.Series(df.index + 2, index=df.index).astype(str))
 
-def clean(x):
-    if pd.isna(x): return np.nan
-    s = str(x).replace("%","").replace("$","").replace(",","")
-    try: return float(s)
-    except: return np.nan
+    # drop missing
+    df = df.dropna(subset=["lat","lon","poverty"])
 
-df["poverty"] = df["% below poverty"].apply(clean)
-df["obesity"] = df["adult obesity %"].apply(clean)
-df["diabetes"] = df["adult diabetes %"].apply(clean)
-df["inactive"] = df["% of adults physically inactive"].apply(clean)
+    # ---- MORAN'S I ----
+    # same KNN(k=4), row-standardized weights as libpysal, cached on disk; see spatial_weights.py
+    w, _ = spatial_weights.cached("knn", df["lon"], df["lat"], k=4)
 
-# simple health index like you used
-df["health"] = df[["obesity","diabetes","inactive"]].mean(axis=1)
+    y = df["poverty"].values
 
-# parse lat/lon from coordinate column
-coords = df["latitude"].str.extract(r"(-?\d+\.\d+).*(-?\d+\.\d+)")
-df["lat"] = coords[0].astype(float)
-df["lon"] = coords[1].astype(float)
+    glob, _ = spatial_stats.autocorrelation(y, w, ["poverty"])
+    mi = glob.loc["poverty"]
 
-# drop missing
-df = df.dropna(subset=["lat","lon","poverty"])
+    print("Moran's I:", round(mi.I,4))
+    print("p-value:", round(mi.p_sim,4))
 
-# ---- MORAN'S I ----
-coords = list(zip(df["lon"], df["lat"]))
+    # ---- LISA + GETIS-ORD Gi* (one pass, shared weights) ----
+    if all(col[k] is not None for k in NEED_KEYS):
+        df["lap1_pct"], _ = parsing.parse_pct(df[col["grocery"]])
+        df["need"] = scoring.composite_scores(df)
+    variables = [v for v in variables if v in df.columns]
 
-w = KNN.from_array(coords, k=4)
-w.transform = "R"
+    full = df.dropna(subset=variables).reset_index(drop=True)
+    w_full, _ = spatial_weights.cached("knn", full["lon"], full["lat"], k=4)
+    glob, local = spatial_stats.autocorrelation(full[variables].values, w_full, variables,
+                                                permutations=PERMUTATIONS, workers=WORKERS)
 
-y = df["poverty"].values
+    print(f"\nLocal statistics on {len(full)} complete tracts ({PERMUTATIONS} permutations):")
+    for v in variables:
+        lisa = pd.Series(spatial_stats.clusters(local, v)).value_counts()
+        gi = pd.Series(spatial_stats.hot_spots(local, v)).value_counts()
+        print(f"  {v:<10} I={glob.loc[v, 'I']:.4f} p={glob.loc[v, 'p_sim']:.4f}  "
+              f"LISA HH={lisa.get('HH', 0)} LL={lisa.get('LL', 0)} HL={lisa.get('HL', 0)} LH={lisa.get('LH', 0)}  "
+              f"Gi* hot={gi.get('hot', 0)} cold={gi.get('cold', 0)}")
 
-mi = Moran(y, w)
+    out = pd.concat([full[["tract_fips", "lat", "lon"]], local], axis=1)
+    out.to_csv(local_csv, index=False)
+    print(f"Local statistics saved to {local_csv}")
+    return glob, local
 
-print("Moran's I:", round(mi.I,4))
-print("p-value:", round(mi.p_sim,4))
\ No newline at end of file
+if __name__ == "__main__":
+    run(*sys.argv[1:2])
@@ -1,81 +1,102 @@
-import pandas as pd
-import re
-from sklearn.linear_model import LinearRegression
-
-# Load
-df = pd.read_csv("okc_data.csv")
-df.columns = df.columns.str.strip().str.lower()
-
-print("Columns found:", df.columns.tolist())
-
-# --- Helper to find columns ---
-def find_col(keyword):
-    for c in df.columns:
-        if keyword in c:
-            return c
-    return None
-
-poverty_col = find_col("poverty")
-income_col = find_col("income")
-grocery_col = find_col("grocery")
-obesity_col = find_col("obesity")
-diabetes_col = find_col("diabetes")
-inactive_col = find_col("inactive")
-
-print("Using:")
-print(poverty_col, income_col, grocery_col)
-
-# --- Percent extractor ---
-def get_pct(x):
-    if pd.isna(x):
-        return None
-    s = str(x)
-
-    # grab percent in parentheses first
-    m = re.search(r"\(([\d.]+)%\)", s)
-    if m:
-        return float(m.group(1))
-
-    # otherwise percent sign
-    m = re.search(r"([\d.]+)%", s)
-    if m:
-        return float(m.group(1))
-
-    # fallback number
-    m = re.search(r"[\d.]+", s)
-    if m:
-        return float(m.group())
-
-    return None
+import sys
 
-# --- Build variables ---
-df["poverty"] = pd.to_numeric(df[poverty_col], errors="coerce")
-df["income"] = pd.to_numeric(df[income_col], errors="coerce")
-
-df["obesity"] = pd.to_numeric(df[obesity_col], errors="coerce")
-df["diabetes"] = pd.to_numeric(df[diabetes_col], errors="coerce")
-df["inactive"] = pd.to_numeric(df[inactive_col], errors="coerce")
-
-df["health"] = df[["obesity","diabetes","inactive"]].mean(axis=1)
-
-df["grocery"] = df[grocery_col].apply(get_pct)
-
-# Outcome: low access
-df["low_access"] = 100 - df["grocery"]
-
-# Drop missing
-df = df.dropna(subset=["poverty","income","health","low_access"])
-
-print("Rows used:", len(df))
-
-# --- Regression ---
-X = df[["poverty","health","income"]]
-y = df["low_access"]
-
-model = LinearRegression().fit(X,y)
-
-print("\nWeights:")
-for name,coef in zip(X.columns, model.coef_):
-    print(name, round(coef,3))
+import pandas as pd
 
-print("\nR²:", round(model.score(X,y),3))
\ No newline at end of file
+import gwr
+import ols
+import parsing
+import schema
+
+BOOTSTRAPS = 5000
+FOLDS = 5
+SEED = 0
+WORKERS = 1  # worker processes for the cross-validation grid
+CSV_FILE = "okc_data.csv"
+GWR_CSV = "gwr_coefficients.csv"  # local coefficients, mapped by OKC_MAPPED.py
+
+def load_sheet(csv_path=CSV_FILE):
+    # (sheet with lowercased headers, {key: lowercased column or None}, schema profile);
+    # only the matched columns are read, the keyword match is cached per header (see schema.py)
+    df, profile = schema.load_sheet(csv_path, "regression")
+    df.columns = df.columns.str.strip().str.lower()
+    col = {k: c.strip().lower() if c else None for k, c in profile["mapping"].items()}
+    return df, col, profile
+
+def model_frame(df, col):
+    # the regression variables built from the matched columns ({key: lowercased column});
+    # rows missing any of them are dropped
+    df = df.copy()
+    # --- Build variables ---
+    df["poverty"] = pd.to_numeric(df[col["poverty"]], errors="coerce")
+    df["income"] = pd.to_numeric(df[col["income"]], errors="coerce")
+
+    df["obesity"] = pd.to_numeric(df[col["obesity"]], errors="coerce")
+    df["diabetes"] = pd.to_numeric(df[col["diabetes"]], errors="coerce")
+    df["inactive"] = pd.to_numeric(df[col["inactive"]], errors="coerce")
+
+    df["health"] = df[["obesity","diabetes","inactive"]].mean(axis=1)
+
+    # "1,234 (18.2%)" -> 18.2
+    df["grocery"], _ = parsing.parse_pct(df[col["grocery"]])
+
+    # Outcome: low access
+    df["low_access"] = 100 - df["grocery"]
+
+    # Drop missing
+    df = df.dropna(subset=["poverty","income","health","low_access"])
+    return df
+
+def run(csv_path=CSV_FILE, gwr_csv=GWR_CSV):
+    # global OLS with bootstrap intervals and k-fold CV, then GWR when the sheet has coordinates;
+    # returns (intercept, coefficients by name)
+    df, col, profile = load_sheet(csv_path)
+
+    print("Columns found:", [c.strip().lower() for c in profile["columns"]])
+
+    print("Using:")
+    print(col["poverty"], col["income"], col["grocery"])
+
+    df = model_frame(df, col)
+
+    print("Rows used:", len(df))
+
+    # --- Regression ---
+    X = df[["poverty","health","income"]]
+    y = df["low_access"]
+
+    intercept, coef = ols.fit(X, y)
+
+    print("\nWeights:")
+    for name,c in zip(X.columns, coef):
+        print(name, round(c,3))
+
+    print("\nR²:", round(ols.r2(y, ols.predict(X, intercept, coef)),3))
+
+    # --- Uncertainty: bootstrap percentile intervals ---
+    summary, _ = ols.bootstrap(X, y, X.columns, n_boot=BOOTSTRAPS, seed=SEED)
+    print(f"\nBootstrap ({BOOTSTRAPS} resamples, 95% intervals):")
+    print(summary.round(3).to_string())
+
+    # --- Out-of-sample fit: k-fold CV over every feature subset ---
+    cv = ols.cross_validate(X, y, X.columns, k=FOLDS, seed=SEED, workers=WORKERS)
+    print(f"\n{FOLDS}-fold cross-validation:")
+    print(cv.round(3).to_string(index=False))
+
+    # --- GWR: local coefficients (adaptive bisquare, AICc bandwidth) ---
+    lat_col = col["latitude"]
+    if lat_col is not None:
+        df["lat"], df["lon"] = parsing.parse_latlon(df[lat_col])
+        geo_df = df.dropna(subset=["lat","lon"])
+        model = gwr.GWR(geo_df["lat"], geo_df["lon"], geo_df[X.columns], geo_df["low_access"])
+        fit = model.fit(model.search())
+        print(f"\nGWR: bandwidth {fit.bandwidth} nearest tracts, AICc {fit.aicc:.1f}, R² {fit.r2:.3f} (global {ols.r2(y, ols.predict(X, intercept, coef)):.3f})")
+        # without a tract column the rows are labelled by their CSV line ("row 5")
+        ids = geo_df[col["tract"]] if col["tract"] is not None else "row " + pd.Series(geo_df.index + 2, index=geo_df.index).astype(str)
+        coefs = gwr.coefficient_frame(fit, X.columns, ids, geo_df["lat"], geo_df["lon"])
+        print(coefs[list(X.columns) + ["local_r2"]].describe().loc[["min","50%","max"]].round(3).to_string())
+        coefs.to_csv(gwr_csv, index=False)
+        print(f"Local coefficients saved to {gwr_csv}")
+    return intercept, dict(zip(X.columns, coef))
+
+if __name__ == "__main__":
+    run(*sys.argv[1:2])
@@ -0,0 +1,186 @@
+# accessibility.py — distance-based food access from a store/pantry point file
+# usage: python accessibility.py population_points.csv stores.csv [--catchment-miles 10]
+#                                [--decay none|gaussian] [--by-tract] [--out access.csv]
+#
+# Population points are tract centroids or block-group centroids with a population
+# column. For every point this computes the distance to the nearest store, the number
+# of stores within 1 and 10 miles, and a two-step floating catchment area (2SFCA)
+# score:
+#   1. each store's supply is divided by the (distance-weighted) population within
+#      the catchment of it
+#   2. each point sums those ratios over the stores within its catchment
+# reported as supply per 1,000 residents. Radius and nearest queries run on a KD-tree
+# of unit-sphere vectors (geo.py), so they are exact great-circle queries; the
+# 2SFCA pairs are produced in chunks of points so memory stays bounded statewide
+# or nationally. tract_access() rolls block groups up into the lap1/lap10 style
+# "% of population within 1/10 miles of a store" the scoring expects.
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from geo import KM_PER_MILE, chord_to_km, find_latlon_columns, km_to_chord, unit_xyz
+
+RADII_MILES = (1.0, 10.0)
+CATCHMENT_MILES = 10.0
+DECAY = "gaussian"   # "none" is the original 2SFCA; "gaussian" the enhanced variant
+CHUNK = 20000        # population points per catchment pass
+PER = 1000.0         # 2SFCA reported as supply per this many residents
+
+POPULATION_NAMES = ("population", "pop", "total_pop", "total population", "pop2010", "totalpopulation")
+SUPPLY_NAMES = ("supply", "capacity", "sqft", "size", "weight")
+ID_NAMES = ("geoid", "tract_fips", "tractfips", "censustract", "bg_geoid", "geoid20", "geoid10")
+
+# ---------------- inputs ----------------
+def _pick(columns, names):
+    lower = {c.strip().lower(): c for c in columns}
+    return next((lower[n] for n in names if n in lower), None)
+
+def _latlon(df, path):
+    lat_col, lon_col = find_latlon_columns(df.columns)
+    if lat_col is None or lon_col is None:
+        raise SystemExit(f"'{path}' needs latitude/longitude columns")
+    return pd.to_numeric(df[lat_col], errors="coerce"), pd.to_numeric(df[lon_col], errors="coerce")
+
+def load_stores(path):
+    # name, lat, lon, supply (1 per store unless the file has a supply/capacity/sqft column)
+    raw = pd.read_csv(path)
+    lat, lon = _latlon(raw, path)
+    name_col = _pick(raw.columns, ("name", "store", "site", "site_name", "address"))
+    supply_col = _pick(raw.columns, SUPPLY_NAMES)
+    out = pd.DataFrame({
+        "name": raw[name_col].astype(str) if name_col else [f"store {i + 1}" for i in range(len(raw))],
+        "lat": lat, "lon": lon,
+        "supply": pd.to_numeric(raw[supply_col], errors="coerce").fillna(0.0) if supply_col else 1.0,
+    })
+    return out.dropna(subset=["lat", "lon"]).reset_index(drop=True)
+
+def load_population(path):
+    # GEOID (str), lat, lon, population for tract or block-group centroids
+    raw = pd.read_csv(path, dtype=str)
+    lat, lon = _latlon(raw, path)
+    id_col = _pick(raw.columns, ID_NAMES)
+    pop_col = _pick(raw.columns, POPULATION_NAMES)
+    if id_col is None or pop_col is None:
+        raise SystemExit(f"'{path}' needs a GEOID column and a population column")
+    out = pd.DataFrame({
+        "GEOID": raw[id_col].str.strip(),
+        "lat": lat, "lon": lon,
+        "population": pd.to_numeric(raw[pop_col].str.replace(",", ""), errors="coerce").fillna(0.0),
+    })
+    return out.dropna(subset=["lat", "lon"]).reset_index(drop=True)
+
+# ---------------- engine ----------------
+def decay_weights(km, catchment_km, decay=DECAY):
+    if decay == "none":
+        return np.ones_like(km)
+    if decay == "gaussian":
+        # E2SFCA-style Gaussian, 1 at the point and 0 at the catchment edge
+        edge = np.exp(-0.5)
+        return (np.exp(-0.5 * (km / catchment_km) ** 2) - edge) / (1.0 - edge)
+    raise ValueError(f"unknown decay: {decay!r}")
+
+def _pairs(p_xyz, store_tree, chord, chunk):
+    # (point index, store index, km) for every pair within the chord radius, chunk by chunk
+    for p0 in range(0, len(p_xyz), chunk):
+        block = cKDTree(p_xyz[p0:p0 + chunk])
+        pairs = block.sparse_distance_matrix(store_tree, chord, output_type="ndarray")
+        yield pairs["i"] + p0, pairs["j"], chord_to_km(pairs["v"])
+
+def accessibility(pop_lat, pop_lon, population, store_lat, store_lon, supply=None,
+                  catchment_miles=CATCHMENT_MILES, radii_miles=RADII_MILES, decay=DECAY, chunk=CHUNK):
+    # one row per population point: nearest_km, stores_<r>mi for each radius, fca
+    p_xyz = unit_xyz(pop_lat, pop_lon)
+    s_xyz = unit_xyz(store_lat, store_lon)
+    population = np.asarray(population, dtype=float)
+    supply = np.ones(len(s_xyz)) if supply is None else np.asarray(supply, dtype=float)
+    out = pd.DataFrame(index=range(len(p_xyz)))
+    if not len(s_xyz):
+        out["nearest_km"] = np.nan
+        for r in radii_miles:
+            out[f"stores_{r:g}mi"] = 0
+        out["fca"] = 0.0
+        return out
+
+    tree = cKDTree(s_xyz)
+    chord, _ = tree.query(p_xyz)
+    out["nearest_km"] = chord_to_km(chord)
+    for r in radii_miles:
+        out[f"stores_{r:g}mi"] = tree.query_ball_point(p_xyz, km_to_chord(r * KM_PER_MILE), return_length=True)
+
+    # step 1: population reaching each store; step 2: each point's share of what it reaches
+    catchment_km = catchment_miles * KM_PER_MILE
+    c_chord = float(km_to_chord(catchment_km))
+    demand = np.zeros(len(s_xyz))
+    for i, j, km in _pairs(p_xyz, tree, c_chord, chunk):
+        demand += np.bincount(j, weights=population[i] * decay_weights(km, catchment_km, decay), minlength=len(s_xyz))
+    ratio = np.divide(supply, demand, out=np.zeros_like(demand), where=demand > 0)
+    fca = np.zeros(len(p_xyz))
+    for i, j, km in _pairs(p_xyz, tree, c_chord, chunk):
+        fca += np.bincount(i, weights=ratio[j] * decay_weights(km, catchment_km, decay), minlength=len(p_xyz))
+    out["fca"] = fca * PER
+    return out
+
+def tract_access(points, access, radii_miles=RADII_MILES):
+    # population-weighted roll-up of point results to 11-digit tracts:
+    # pct_within_<r>mi, nearest_km and fca per tract
+    pop = points["population"].to_numpy(dtype=float)
+    frame = pd.DataFrame({"Tract_FIPS": points["GEOID"].str[:11].to_numpy(), "population": pop,
+                          "nearest_km": access["nearest_km"].to_numpy() * pop, "fca": access["fca"].to_numpy() * pop})
+    for r in radii_miles:
+        frame[f"pct_within_{r:g}mi"] = (access[f"stores_{r:g}mi"].to_numpy() > 0) * pop
+    out = frame.groupby("Tract_FIPS", sort=False).sum()
+    total = out.pop("population")
+    out = out.div(total.where(total > 0), axis=0)
+    for r in radii_miles:
+        out[f"pct_within_{r:g}mi"] *= 100.0
+    out.insert(0, "population", total)
+    return out.reset_index()
+
+def work_access(work, stores, points=None, **kw):
+    # per-tract access for OKC_MAPPED's work table; tract centroids weighted by
+    # total_pop stand in for population points when no block-group file is given
+    if points is None:
+        points = pd.DataFrame({"GEOID": work["Tract_FIPS"].astype(str), "lat": work["lat"], "lon": work["lon"],
+                               "population": pd.to_numeric(work["total_pop"], errors="coerce").fillna(1.0)})
+        points = points.dropna(subset=["lat", "lon"]).reset_index(drop=True)
+    t0 = time.perf_counter()
+    res = accessibility(points["lat"], points["lon"], points["population"], stores["lat"], stores["lon"],
+                        stores["supply"], **kw)
+    table = tract_access(points, res)
+    stats = {"points": len(points), "stores": len(stores), "tracts": len(table), "seconds": time.perf_counter() - t0}
+    return table, stats
+
+def report(stats):
+    return (f"Accessibility: {stats['points']:,} population points x {stats['stores']:,} stores -> "
+            f"{stats['tracts']:,} tracts in {stats['seconds']:.2f}s")
+
+# ---------------- command line ----------------
+def main(argv):
+    args = list(argv)
+    opts = {}
+    for name in ("--catchment-miles", "--decay", "--out"):
+        if name in args:
+            i = args.index(name)
+            opts[name] = args[i + 1]
+            del args[i:i + 2]
+    by_tract = "--by-tract" in args
+    args = [a for a in args if a != "--by-tract"]
+    if len(args) != 2:
+        raise SystemExit("usage: python accessibility.py population_points.csv stores.csv "
+                         "[--catchment-miles M] [--decay none|gaussian] [--by-tract] [--out FILE]")
+    points, stores = load_population(args[0]), load_stores(args[1])
+    t0 = time.perf_counter()
+    res = accessibility(points["lat"], points["lon"], points["population"], stores["lat"], stores["lon"],
+                        stores["supply"], catchment_miles=float(opts.get("--catchment-miles", CATCHMENT_MILES)),
+                        decay=opts.get("--decay", DECAY))
+    out = tract_access(points, res) if by_tract else pd.concat([points, res], axis=1)
+    print(f"{len(points):,} population points x {len(stores):,} stores in {time.perf_counter() - t0:.2f}s")
+    path = opts.get("--out", "access.csv")
+    out.to_csv(path, index=False)
+    print(f"Wrote {len(out):,} rows to {path}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
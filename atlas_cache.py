@@ -0,0 +1,162 @@
+# atlas_cache.py — typed, indexed Feather cache of the USDA Food Access Research Atlas CSV
+# usage: python atlas_cache.py food_access.csv [tract ...]   (prints a cold vs warm timing comparison)
+#
+# The first run converts food_access.csv into an uncompressed Feather file named
+# after the CSV's content hash. Columns whose every value parses as a number are
+# stored as int64/float64, the rest stay strings. Later runs memory-map only the
+# requested columns and look tracts up through a hash index on CensusTract.
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.feather as feather
+
+CACHE_DIR = os.path.join(".nourishnet_cache", "atlas")
+KEY_COLUMN = "CensusTract"
+HASH_BLOCK = 4 << 20
+
+# ---------------- hashing ----------------
+def _hash_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def source_hash(path, cache_dir=CACHE_DIR):
+    # content hash, remembered per (path, size, mtime) so warm runs don't re-read the CSV
+    st = os.stat(path)
+    memo_path = os.path.join(cache_dir, "hashes.json")
+    key = f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}"
+    try:
+        with open(memo_path) as f:
+            memo = json.load(f)
+    except (OSError, ValueError):
+        memo = {}
+    if key not in memo:
+        memo[key] = _hash_file(path)
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = memo_path + f".{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(memo, f)
+        os.replace(tmp, memo_path)
+    return memo[key]
+
+# ---------------- conversion ----------------
+def _typed(col):
+    # int64 or float64 when every non-null value parses, otherwise keep the strings
+    for typ in (pa.int64(), pa.float64()):
+        try:
+            return pc.cast(col, typ)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            continue
+    return col
+
+def build_cache(csv_path, cache_dir=CACHE_DIR):
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        header = next(csv.reader(f))
+    table = pacsv.read_csv(
+        csv_path,
+        convert_options=pacsv.ConvertOptions(
+            column_types={c: pa.string() for c in header},
+            strings_can_be_null=True,
+        ),
+    )
+    cols = {}
+    for name in table.column_names:
+        col = table[name]
+        if name == KEY_COLUMN:
+            # USDA drops the leading zero of two-digit state FIPS; store the 11-digit form
+            cols[name] = pc.utf8_lpad(pc.utf8_trim_whitespace(col), 11, "0")
+        else:
+            cols[name] = _typed(col)
+    table = pa.table(cols)
+    table = table.sort_by(KEY_COLUMN)
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f"{source_hash(csv_path, cache_dir)[:16]}.feather")
+    tmp = path + f".{os.getpid()}.tmp"
+    feather.write_feather(table, tmp, compression="uncompressed")
+    os.replace(tmp, path)
+    return path
+
+# ---------------- lookups ----------------
+class AtlasCache:
+    def __init__(self, table, path):
+        self.table = table
+        self.path = path
+        index = pd.Index(table[KEY_COLUMN].to_numpy(zero_copy_only=False))
+        self.positions = np.arange(len(index))
+        if not index.is_unique:
+            # like a boolean scan + iloc[0], the first row of a repeated tract wins
+            first = ~index.duplicated()
+            index, self.positions = index[first], self.positions[first]
+        self.index = index
+
+    @classmethod
+    def open(cls, csv_path, columns=None, cache_dir=CACHE_DIR):
+        # builds the cache when the CSV content changed, then memory-maps the columns asked for
+        path = os.path.join(cache_dir, f"{source_hash(csv_path, cache_dir)[:16]}.feather")
+        if not os.path.exists(path):
+            build_cache(csv_path, cache_dir)
+        if columns is not None:
+            names = pa.ipc.open_file(pa.memory_map(path)).schema.names
+            columns = [KEY_COLUMN] + [c for c in columns if c in names and c != KEY_COLUMN]
+        table = feather.read_table(path, columns=columns, memory_map=True)
+        return cls(table, path)
+
+    @property
+    def columns(self):
+        return self.table.column_names
+
+    def lookup(self, tracts):
+        # DataFrame with one row per requested tract, in order; unknown tracts are dropped
+        keys = [str(t).strip().zfill(11) for t in tracts]
+        pos = self.index.get_indexer(keys)
+        hit = pos >= 0
+        rows = self.table.take(pa.array(self.positions[pos[hit]])).to_pandas().drop(columns=KEY_COLUMN)
+        rows.index = pd.Index(np.asarray(keys)[hit], name=KEY_COLUMN)
+        return rows
+
+# ---------------- cold vs warm timing ----------------
+def main(argv):
+    if not argv:
+        raise SystemExit("usage: python atlas_cache.py food_access.csv [tract ...]")
+    csv_path, tracts = argv[0], argv[1:]
+
+    t0 = time.perf_counter()
+    df = pd.read_csv(csv_path, dtype=str)
+    sample = tracts or list(df[KEY_COLUMN].dropna().iloc[:: max(1, len(df) // 1000)])
+    for t in sample:
+        df[df[KEY_COLUMN] == t]
+    t_csv = time.perf_counter() - t0
+    del df
+
+    h = source_hash(csv_path)
+    stale = os.path.join(CACHE_DIR, f"{h[:16]}.feather")
+    if os.path.exists(stale):
+        os.remove(stale)
+    t0 = time.perf_counter()
+    atlas = AtlasCache.open(csv_path, columns=["PovertyRate"])
+    atlas.lookup(sample)
+    t_cold = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    atlas = AtlasCache.open(csv_path, columns=["PovertyRate"])
+    found = atlas.lookup(sample)
+    t_warm = time.perf_counter() - t0
+
+    print(f"{len(sample)} tract lookups in {csv_path}")
+    print(f"  CSV parse + boolean scans: {t_csv:8.3f} s")
+    print(f"  cold (build cache):        {t_cold:8.3f} s")
+    print(f"  warm (mmap + hash index):  {t_warm:8.3f} s  ({len(found)} found, cache {atlas.path})")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
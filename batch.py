@@ -0,0 +1,179 @@
+# batch.py — the OKC_MAPPED / GroceryStore_Income analysis for every county in a statewide sheet
+# usage: python batch.py [data_sheet.csv] [--atlas food_access.csv] [--out batch_output]
+#                        [--workers N] [--counties 40109,40027] [--offline]
+#
+# The sheet is read, cleaned and centroid-filled once in the parent, then sorted by
+# county FIPS (first five digits of the tract GEOID) and written as one Feather file.
+# Each worker memory-maps that file and the USDA atlas cache (atlas_cache.py) once,
+# in its initializer, and then takes counties off the queue — largest first — slicing
+# its rows out without copying the statewide table. Per county it scores and ranks
+# the tracts, renders the map and pulls the atlas access figures GroceryStore_Income.py
+# prints, writing them under <out>/<county FIPS>/. The parent gathers one summary row
+# per county plus a statewide ranking of every tract.
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+
+import datasheet
+import schema
+import scoring
+from atlas_cache import AtlasCache
+
+CSV_FILE = "Data Sheet of OKC - Sheet1.csv"
+ATLAS_CSV = "food_access.csv"
+OUT_DIR = "batch_output"
+WORKERS = os.cpu_count() or 1
+TOP_N = 10
+# the USDA columns GroceryStore_Income.py reports per tract
+ATLAS_COLUMNS = ["PovertyRate", "MedianFamilyIncome", "LAPOP1_10", "lapop1share", "LAPOP1_20", "lapop20share"]
+
+# ---------------- parent: parse once ----------------
+def load_statewide(csv_path, fetch=True, counties=None, log=print):
+    # cleaned work table for the whole sheet (or just `counties`) with a county column, sorted by county
+    df, profile = schema.load_sheet(csv_path)
+    work = datasheet.build_work(df, profile["mapping"], log=log)
+    work["county"] = work["Tract_FIPS"].str[:5]
+    if counties:
+        # before fill_centroids, so a one-county run does not geocode the rest of the state
+        work = work[work["county"].isin(counties)].reset_index(drop=True)
+    datasheet.fill_centroids(work, fetch=fetch, log=log)
+    return work.sort_values(["county", "Tract_FIPS"], kind="stable").reset_index(drop=True)
+
+def county_spans(work):
+    # {county FIPS: (first row, row count)} of a county-sorted work table
+    starts = np.flatnonzero(np.r_[True, work["county"].to_numpy()[1:] != work["county"].to_numpy()[:-1]])
+    counts = np.diff(np.r_[starts, len(work)])
+    return {work["county"].iat[s]: (int(s), int(c)) for s, c in zip(starts, counts)}
+
+# ---------------- workers ----------------
+_STATE = {}
+
+def _init_worker(state):
+    _STATE.clear()
+    _STATE.update(state)
+    # memory-mapped: every worker shares the same pages of both files
+    _STATE["table"] = feather.read_table(state["work_path"], memory_map=True)
+    if state.get("atlas_csv"):
+        _STATE["atlas"] = AtlasCache.open(state["atlas_csv"], columns=ATLAS_COLUMNS)
+
+def _run_county(task):
+    import map_render
+
+    county, start, count = task
+    t0 = time.perf_counter()
+    work = _STATE["table"].slice(start, count).to_pandas()
+    out_dir = os.path.join(_STATE["out_dir"], county)
+    os.makedirs(out_dir, exist_ok=True)
+
+    work["composite_score"] = scoring.composite_scores(work)
+    work["rank"] = scoring.rank_scores(work["composite_score"])
+    work = work.sort_values(by="composite_score", ascending=False, na_position="last").reset_index(drop=True)
+    work.to_csv(os.path.join(out_dir, "scored_tracts.csv"), index=False)
+    map_render.build_map(work, mode=_STATE["map_mode"]).save(os.path.join(out_dir, "food_map.html"))
+
+    access = None
+    if "atlas" in _STATE:
+        access = _STATE["atlas"].lookup(work["Tract_FIPS"])
+        access = access.apply(pd.to_numeric, errors="coerce")
+        access.to_csv(os.path.join(out_dir, "grocery_access.csv"))
+
+    scored = work["composite_score"].notna()
+    pop = work["total_pop"]
+    row = {
+        "county": county,
+        "tracts": len(work),
+        "scored": int(scored.sum()),
+        "mean_score": work["composite_score"].mean(),
+        "max_score": work["composite_score"].max(),
+        "high_need_tracts": int((work["composite_score"] >= 0.66).sum()),
+        "top_tract": work["Tract_FIPS"].iat[0] if scored.any() else None,
+        "population": pop.sum(min_count=1),
+        "poverty_pop_weighted": (work["poverty"] * pop).sum(min_count=1) / pop[work["poverty"].notna()].sum()
+        if work["poverty"].notna().any() else np.nan,
+        "atlas_tracts": 0 if access is None else len(access),
+        "atlas_lapop1_10": np.nan if access is None else access["LAPOP1_10"].sum(min_count=1),
+        "seconds": time.perf_counter() - t0,
+        "pid": os.getpid(),
+    }
+    return row, work[["Tract_FIPS", "county", "composite_score"]]
+
+# ---------------- driver ----------------
+def run(csv_path=CSV_FILE, out_dir=OUT_DIR, atlas_csv=ATLAS_CSV, workers=WORKERS, counties=None,
+        fetch=True, map_mode="auto", log=print):
+    # returns (county summary, statewide ranking, stats)
+    t0 = time.perf_counter()
+    work = load_statewide(csv_path, fetch=fetch, counties=counties, log=log)
+    t_load = time.perf_counter() - t0
+    if work.empty:
+        raise SystemExit(f"no tracts of {', '.join(counties)} in {csv_path}" if counties else f"no tracts in {csv_path}")
+    spans = county_spans(work)
+    if counties:
+        spans = {c: spans[c] for c in counties if c in spans}
+    os.makedirs(out_dir, exist_ok=True)
+    work_path = os.path.join(out_dir, "statewide_work.feather")
+    feather.write_feather(work, work_path, compression="uncompressed")
+    if atlas_csv and os.path.exists(atlas_csv):
+        AtlasCache.open(atlas_csv, columns=ATLAS_COLUMNS)  # builds the shared cache once, before forking
+    else:
+        atlas_csv = None
+
+    state = {"work_path": work_path, "atlas_csv": atlas_csv, "out_dir": out_dir, "map_mode": map_mode}
+    # largest counties first so one big county does not finish alone at the end
+    tasks = sorted(((c, s, n) for c, (s, n) in spans.items()), key=lambda t: -t[2])
+    t1 = time.perf_counter()
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(min(workers, len(tasks)), initializer=_init_worker, initargs=(state,)) as pool:
+            results = list(pool.map(_run_county, tasks))
+    else:
+        _init_worker(state)
+        results = [_run_county(t) for t in tasks]
+    _STATE.clear()
+    t_counties = time.perf_counter() - t1
+
+    summary = pd.DataFrame([r for r, _ in results]).sort_values("county").reset_index(drop=True)
+    ranking = pd.concat([w for _, w in results], ignore_index=True)
+    ranking["state_rank"] = scoring.rank_scores(ranking["composite_score"])
+    ranking = ranking.sort_values("state_rank", na_position="last").reset_index(drop=True)
+    summary.to_csv(os.path.join(out_dir, "statewide_summary.csv"), index=False)
+    ranking.to_csv(os.path.join(out_dir, "statewide_ranking.csv"), index=False)
+    stats = {"tracts": len(work), "counties": len(tasks), "workers": workers, "load_s": t_load,
+             "counties_s": t_counties, "county_cpu_s": float(summary["seconds"].sum()),
+             "seconds": time.perf_counter() - t0}
+    return summary, ranking, stats
+
+def report(stats):
+    return (f"{stats['counties']} counties / {stats['tracts']:,} tracts on {stats['workers']} workers in "
+            f"{stats['seconds']:.2f}s (parse {stats['load_s']:.2f}s, counties {stats['counties_s']:.2f}s "
+            f"wall for {stats['county_cpu_s']:.2f}s of per-county work)")
+
+def main(argv):
+    args = list(argv)
+    opts = {}
+    for name in ("--atlas", "--out", "--workers", "--counties", "--map-mode"):
+        if name in args:
+            i = args.index(name)
+            opts[name] = args[i + 1]
+            del args[i:i + 2]
+    fetch = "--offline" not in args
+    args = [a for a in args if a != "--offline"]
+    if len(args) > 1:
+        raise SystemExit("usage: python batch.py [data_sheet.csv] [--atlas food_access.csv] [--out DIR] "
+                         "[--workers N] [--counties FIPS,FIPS] [--map-mode auto|markers|geojson] [--offline]")
+    out_dir = opts.get("--out", OUT_DIR)
+    summary, ranking, stats = run(args[0] if args else CSV_FILE, out_dir, opts.get("--atlas", ATLAS_CSV),
+                                  int(opts.get("--workers", WORKERS)),
+                                  opts["--counties"].split(",") if "--counties" in opts else None,
+                                  fetch=fetch, map_mode=opts.get("--map-mode", "auto"))
+    print(report(stats))
+    print(summary.drop(columns=["pid"]).round(3).to_string(index=False))
+    print(f"\nStatewide top {TOP_N}:")
+    print(ranking.head(TOP_N).round(3).to_string(index=False))
+    print(f"\nPer-county outputs under {out_dir}/<county>/; summary in {out_dir}/statewide_summary.csv")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1 @@
+# benchmarks for the NourishNet pipeline; run modules with `python -m benchmarks.<name>`
@@ -0,0 +1,69 @@
+# bench_accessibility.py — 2SFCA engine timing, with parity against sklearn's haversine BallTree
+# usage: python -m benchmarks.bench_accessibility [points:stores ...]
+import sys
+import time
+
+import numpy as np
+
+import accessibility
+from geo import EARTH_RADIUS_KM, KM_PER_MILE, haversine_km
+
+SIZES = ("3000:1000", "18000:5000", "60000:12000")  # Oklahoma-, Texas- and beyond-sized
+BALLTREE_LIMIT = 50_000  # reference queries get slow past this many points
+DENSE_CHECK = (1500, 400)
+
+def synthetic(n_points, n_stores, seed=0):
+    # block groups and stores clustered around the same towns over an Oklahoma-sized area
+    rng = np.random.default_rng(seed)
+    towns = np.column_stack([rng.uniform(33.7, 37.0, 60), rng.uniform(-103.0, -94.5, 60)])
+    size = rng.pareto(1.2, 60) + 1
+    p = size / size.sum()
+
+    def around(n, spread):
+        t = rng.choice(60, n, p=p)
+        return towns[t, 0] + rng.normal(0, spread, n), towns[t, 1] + rng.normal(0, spread * 1.2, n)
+
+    plat, plon = around(n_points, 0.12)
+    slat, slon = around(n_stores, 0.10)
+    return plat, plon, rng.integers(300, 3000, n_points).astype(float), slat, slon, rng.uniform(0.5, 3, n_stores)
+
+def dense_reference(plat, plon, pop, slat, slon, supply, catchment_miles, decay):
+    km = haversine_km(plat[:, None], plon[:, None], slat[None, :], slon[None, :])
+    c = catchment_miles * KM_PER_MILE
+    w = np.where(km <= c, accessibility.decay_weights(km, c, decay), 0.0)
+    demand = pop @ w
+    ratio = np.divide(supply, demand, out=np.zeros_like(demand), where=demand > 0)
+    return w @ ratio * accessibility.PER
+
+def main(sizes):
+    from sklearn.neighbors import BallTree
+
+    plat, plon, pop, slat, slon, supply = synthetic(*DENSE_CHECK)
+    ref = dense_reference(plat, plon, pop, slat, slon, supply, accessibility.CATCHMENT_MILES, accessibility.DECAY)
+    got = accessibility.accessibility(plat, plon, pop, slat, slon, supply)["fca"].to_numpy()
+    print(f"2SFCA vs dense haversine matrix ({DENSE_CHECK[0]}x{DENSE_CHECK[1]}): max rel diff "
+          f"{np.abs(got - ref).max() / np.abs(ref).max():.1e}\n")
+
+    print(f"{'points':>8} {'stores':>7} {'engine s':>9} {'balltree s':>11} {'nearest diff km':>16} {'count mismatches':>17}")
+    for spec in sizes:
+        n, m = (int(v) for v in spec.split(":"))
+        plat, plon, pop, slat, slon, supply = synthetic(n, m)
+        t0 = time.perf_counter()
+        res = accessibility.accessibility(plat, plon, pop, slat, slon, supply)
+        t_engine = time.perf_counter() - t0
+        ref = "-", "-", "-"
+        if n <= BALLTREE_LIMIT:
+            t0 = time.perf_counter()
+            tree = BallTree(np.radians(np.column_stack([slat, slon])), metric="haversine")
+            q = np.radians(np.column_stack([plat, plon]))
+            dist, _ = tree.query(q, k=1)
+            counts = {r: tree.query_radius(q, r * KM_PER_MILE / EARTH_RADIUS_KM, count_only=True)
+                      for r in accessibility.RADII_MILES}
+            t_ref = time.perf_counter() - t0
+            # points sitting on a radius boundary can land either side in floating point
+            bad = sum(int((res[f"stores_{r:g}mi"].to_numpy() != c).sum()) for r, c in counts.items())
+            ref = (f"{t_ref:.2f}", f"{np.abs(dist[:, 0] * EARTH_RADIUS_KM - res['nearest_km']).max():.1e}", f"{bad}")
+        print(f"{n:>8} {m:>7} {t_engine:>9.2f} {ref[0]:>11} {ref[1]:>16} {ref[2]:>17}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or SIZES)
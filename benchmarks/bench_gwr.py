@@ -0,0 +1,51 @@
+# bench_gwr.py — batched GWR (bandwidth search + final fit) vs mgwr, and parity at the chosen bandwidth
+# usage: python -m benchmarks.bench_gwr [n_tracts ...]     (mgwr is optional; it is only the reference)
+import sys
+import time
+import warnings
+
+import numpy as np
+
+import gwr
+
+SIZES = (600, 2_000, 5_000)
+MGWR_LIMIT = 2_000  # mgwr's search gets slow past this
+
+def synthetic(n, seed=0):
+    rng = np.random.default_rng(seed)
+    lat, lon = rng.uniform(35.3, 35.7, n), rng.uniform(-97.8, -97.2, n)
+    X = np.column_stack([rng.uniform(1, 70, n), rng.uniform(15, 40, n), rng.integers(12000, 220000, n).astype(float)])
+    # poverty effect drifts north-south, so the local fits have something to find
+    y = 60 + (0.1 + 2 * (lat - 35.5)) * X[:, 0] - 0.6 * X[:, 1] + rng.normal(0, 10, n)
+    return lat, lon, X, y
+
+def main(sizes):
+    try:
+        from mgwr.gwr import GWR as MGWR
+        from mgwr.sel_bw import Sel_BW
+    except ImportError:
+        MGWR = None
+    print(f"{'tracts':>7} {'bw':>5} {'search+fit s':>13} {'mgwr bw':>8} {'mgwr s':>8} {'max dparam':>11} {'d AICc':>9}")
+    for n in sizes:
+        lat, lon, X, y = synthetic(n)
+        t0 = time.perf_counter()
+        # search the full range mgwr does when it is the reference, else the default cap
+        model = gwr.GWR(lat, lon, X, y, max_bandwidth=n if n <= MGWR_LIMIT else gwr.MAX_BANDWIDTH)
+        bw = model.search()
+        fit = model.fit(bw)
+        elapsed = time.perf_counter() - t0
+        ref = "-", "-", "-", "-"
+        if MGWR is not None and n <= MGWR_LIMIT:
+            coords = np.column_stack([lon, lat])
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                t0 = time.perf_counter()
+                mbw = Sel_BW(coords, y[:, None], X, kernel="bisquare", fixed=False, spherical=True).search(criterion="AICc")
+                res = MGWR(coords, y[:, None], X, bw=mbw, kernel="bisquare", fixed=False, spherical=True).fit()
+                t_ref = time.perf_counter() - t0
+            ref = (f"{int(mbw)}", f"{t_ref:.2f}", f"{np.abs(res.params - fit.params).max():.1e}" if mbw == bw else "n/a",
+                   f"{abs(res.aicc - fit.aicc):.1e}" if mbw == bw else "n/a")
+        print(f"{n:>7} {bw:>5} {elapsed:>13.2f} {ref[0]:>8} {ref[1]:>8} {ref[2]:>11} {ref[3]:>9}")
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or SIZES)
@@ -0,0 +1,43 @@
+# bench_map.py — HTML size and generation time of the two map modes
+# usage: python -m benchmarks.bench_map [n ...]
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import map_render
+import scoring
+from benchmarks.bench_scoring import synthetic_work
+
+SIZES = (100, 1_000, 10_000)
+
+def scored_work(n, seed=0):
+    rng = np.random.default_rng(seed)
+    work = synthetic_work(n, seed)
+    work["lat"] = rng.uniform(33.6, 37.0, n)
+    work["lon"] = rng.uniform(-103.0, -94.4, n)
+    work["composite_score"] = scoring.composite_scores(work)
+    work["rank"] = scoring.rank_scores(work["composite_score"])
+    return work.sort_values("composite_score", ascending=False, na_position="last").reset_index(drop=True)
+
+def render(work, mode):
+    path = os.path.join(tempfile.mkdtemp(), f"{mode}.html")
+    t0 = time.perf_counter()
+    map_render.build_map(work, mode=mode).save(path)
+    elapsed = time.perf_counter() - t0
+    size = os.path.getsize(path)
+    os.remove(path)
+    return elapsed, size
+
+def main(sizes):
+    print(f"{'tracts':>8} {'mode':>8} {'seconds':>8} {'size MB':>8} {'bytes/tract':>12}")
+    for n in sizes:
+        work = scored_work(n)
+        for mode in ("markers", "geojson"):
+            elapsed, size = render(work, mode)
+            print(f"{n:>8} {mode:>8} {elapsed:>8.2f} {size / 1e6:>8.2f} {size / n:>12.0f}")
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or SIZES)
@@ -0,0 +1,50 @@
+# bench_ols.py — batched bootstrap vs refitting sklearn LinearRegression in a loop
+# usage: python -m benchmarks.bench_ols [n_tracts ...]
+import sys
+import time
+
+import numpy as np
+
+import ols
+
+SIZES = (1_200, 10_000, 85_000)
+BOOTSTRAPS = 2_000
+LOOP_SAMPLE = 200  # sklearn refits actually timed; the rest is extrapolated
+
+def synthetic(n, seed=0):
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([rng.uniform(1, 70, n), rng.uniform(15, 40, n), rng.integers(12000, 220000, n)])
+    y = 60 + 0.15 * X[:, 0] - 0.6 * X[:, 1] + rng.normal(0, 25, n)
+    return X, y
+
+def main(sizes):
+    from sklearn.linear_model import LinearRegression
+
+    print(f"{'tracts':>8} {'coef diff':>10} {'batched s':>10} {'loop s (est)':>13} {'draw diff':>10} {'cv s':>6}")
+    for n in sizes:
+        X, y = synthetic(n)
+        ref = LinearRegression().fit(X, y)
+        b0, b = ols.fit(X, y)
+        coef_diff = max(abs(b0 - ref.intercept_), np.abs(b - ref.coef_).max())
+
+        t0 = time.perf_counter()
+        _, draws = ols.bootstrap(X, y, n_boot=BOOTSTRAPS, seed=1)
+        t_batch = time.perf_counter() - t0
+
+        # same resamples refitted one at a time
+        counts = ols._resample_counts(np.random.default_rng(1), n, min(ols.CHUNK, BOOTSTRAPS))
+        t0 = time.perf_counter()
+        diff = 0.0
+        for j in range(LOOP_SAMPLE):
+            rows = np.repeat(np.arange(n), counts[j].astype(int))
+            m = LinearRegression().fit(X[rows], y[rows])
+            diff = max(diff, np.abs(np.concatenate([[m.intercept_], m.coef_]) - draws[j]).max())
+        t_loop = (time.perf_counter() - t0) / LOOP_SAMPLE * BOOTSTRAPS
+
+        t0 = time.perf_counter()
+        ols.cross_validate(X, y, ["poverty", "health", "income"], seed=1)
+        t_cv = time.perf_counter() - t0
+        print(f"{n:>8} {coef_diff:>10.1e} {t_batch:>10.3f} {t_loop:>13.2f} {diff:>10.1e} {t_cv:>6.3f}")
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or SIZES)
@@ -0,0 +1,120 @@
+# bench_panel.py — panel.py store: incremental ingest, 2010->2020 crosswalk and trend queries
+# usage: python -m benchmarks.bench_panel [n_tracts] [first_vintage:last_vintage]
+#
+# Every vintage gets a synthetic USDA atlas file and a CDC PLACES file with the
+# indicators drifting a little per year. Vintages before 2020 are on 2010 tracts;
+# from 2020 every SPLIT_EVERY-th tract is split in two (SPLIT_SHARE / rest), and a
+# relationship file in the Census tab20_tract20_tract10 layout maps one onto the
+# other. Timed: ingesting everything, re-ingesting unchanged files, adding one more
+# vintage (only its partitions should be written), rebuilding the consolidated
+# table, then the queries behind the map's trend layer. The split tracts' carried
+# population is checked against the crosswalk weights.
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import panel
+from benchmarks import synthetic
+
+SPLIT_EVERY = 20
+SPLIT_SHARE = 0.6
+SPLIT_OFFSET = 500_000  # the second half of a split tract gets tract number + this
+
+def vintage_tracts(base, year, first):
+    # base tracts with a per-year drift; 2020+ vintages carry the split tracts
+    rng = np.random.default_rng(year)
+    t = base.copy()
+    k = year - first
+    for col, step in (("poverty", -0.3), ("income", 900.0), ("obesity", 0.2), ("diabetes", 0.05), ("inactive", -0.1)):
+        t[col] = (t[col] + k * step + rng.normal(0, abs(step), len(t))).clip(lower=0).round(1)
+    if year < panel.FIRST_2020_VINTAGE:
+        return t
+    split = t.iloc[::SPLIT_EVERY].copy()
+    t.loc[split.index, "pop"] = (split["pop"] * SPLIT_SHARE).round().astype(int)
+    split["fips"] = (split["fips"].astype(np.int64) + SPLIT_OFFSET).astype(str).str.zfill(11)
+    split["pop"] = (split["pop"] * (1 - SPLIT_SHARE)).round().astype(int)
+    return pd.concat([t, split], ignore_index=True)
+
+def relationship_file(base, path):
+    ids = base["fips"].astype(np.int64).to_numpy()
+    area = np.full(len(ids), 1_000_000)
+    rel = pd.DataFrame({"GEOID_TRACT_20": ids, "GEOID_TRACT_10": ids, "AREALAND_TRACT_10": area, "AREALAND_PART": area})
+    split = rel.iloc[::SPLIT_EVERY]
+    rel.loc[split.index, "AREALAND_PART"] = int(1_000_000 * SPLIT_SHARE)
+    extra = split.assign(GEOID_TRACT_20=split["GEOID_TRACT_20"] + SPLIT_OFFSET,
+                         AREALAND_PART=int(1_000_000 * (1 - SPLIT_SHARE)))
+    pd.concat([rel, extra]).to_csv(path, sep="|", index=False)
+
+def write_vintage(base, year, first, tmp):
+    t = vintage_tracts(base, year, first)
+    paths = {"atlas": os.path.join(tmp, f"food_access_{year}.csv"), "places": os.path.join(tmp, f"census_{year}.csv")}
+    synthetic.food_access(t, year).to_csv(paths["atlas"], index=False)
+    synthetic.census(t, year).to_csv(paths["places"], index=False)
+    return paths
+
+def row(label, value, note=""):
+    print(f"  {label:<22} {value:>9}  {note}".rstrip())
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+def main(n, first, last):
+    base = synthetic.tracts(n, 0)
+    with tempfile.TemporaryDirectory() as tmp:
+        files = {y: write_vintage(base, y, first, tmp) for y in range(first, last + 2)}
+        relationship_file(base, os.path.join(tmp, "rel.txt"))
+        store = panel.Panel(os.path.join(tmp, "store"))
+        store.set_crosswalk(os.path.join(tmp, "rel.txt"))
+
+        ingest_all = lambda years: [store.ingest(s, p, y) for y in years for s, p in files[y].items()]
+        years = range(first, last + 1)
+        _, t_cold = timed(lambda: ingest_all(years))
+        wrote, t_again = timed(lambda: ingest_all(years))
+        _, t_build = timed(store.table)
+        mtimes = {f: os.path.getmtime(os.path.join(store.root, p["file"])) for f, p in store.manifest["partitions"].items()}
+        _, t_new = timed(lambda: ingest_all([last + 1]))
+        touched = [k for k, p in store.manifest["partitions"].items() if mtimes.get(k) != os.path.getmtime(os.path.join(store.root, p["file"]))]
+        _, t_rebuild = timed(store.table)
+        table = store.table()
+        print(f"{n:,} tracts, vintages {first}-{last + 1}: {table.num_rows:,} panel rows, "
+              f"{sum(p['rows'] for p in store.manifest['partitions'].values()):,} partition rows")
+        row(f"ingest {2 * len(years)} files", f"{t_cold:.2f}s")
+        row("re-ingest unchanged", f"{t_again:.3f}s", f"{sum(w for _, w in wrote)} written")
+        row("consolidate", f"{t_build:.2f}s")
+        row(f"add vintage {last + 1}", f"{t_new:.2f}s", f"touched {sorted(touched)}")
+        row("re-consolidate", f"{t_rebuild:.2f}s")
+
+        rng = np.random.default_rng(0)
+        picks = base["fips"].to_numpy()[rng.integers(0, n, 100)]
+        reps = 20
+        _, t_hist = timed(lambda: [store.history([g]) for g in picks[:reps]])
+        _, t_batch = timed(lambda: store.history(picks))
+        state = base["state_fips"].iloc[0]
+        deltas, t_state = timed(lambda: store.deltas(state=state))
+        trend, t_trend = timed(store.trend)
+        row("history, one tract", f"{1000 * t_hist / reps:.2f}ms")
+        row("history, 100 tracts", f"{1000 * t_batch:.2f}ms")
+        row(f"deltas, state {state}", f"{t_state:.3f}s", f"{deltas['GEOID'].nunique():,} tracts")
+        row("trend, all tracts", f"{t_trend:.3f}s", f"{len(trend):,} tracts")
+
+        # a split tract's pre-2020 population is divided by land share, its rates copied
+        g10 = base["fips"].iloc[0]
+        g20 = str(int(g10) + SPLIT_OFFSET).zfill(11)
+        h = store.history([g10, g20]).set_index(["GEOID", "vintage"])
+        pop = float(base["pop"].iloc[0])
+        if first < panel.FIRST_2020_VINTAGE:
+            got = (h.loc[(g10, first), "total_pop"], h.loc[(g20, first), "total_pop"])
+            print(f"  split tract {g10} in {first}: population {got[0]:.0f} + {got[1]:.0f} "
+                  f"(expected {pop * SPLIT_SHARE:.0f} + {pop * (1 - SPLIT_SHARE):.0f}), "
+                  f"poverty {h.loc[(g10, first), 'poverty']:.1f} / {h.loc[(g20, first), 'poverty']:.1f}")
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    span = (args[1] if len(args) > 1 else "2016:2022").split(":")
+    main(int(args[0]) if args else 85_000, int(span[0]), int(span[1]))
@@ -0,0 +1,88 @@
+# bench_parsing.py — bulk column parsers vs the old per-cell helpers, with a parity check
+# usage: python -m benchmarks.bench_parsing [n ...]
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import parsing
+
+SIZES = (10_000, 100_000, 1_000_000)
+
+def messy_column(n, seed=0):
+    rng = np.random.default_rng(seed)
+    kind = rng.integers(0, 9, n)
+    a = rng.uniform(0, 100, n).round(1)
+    b = rng.integers(0, 250000, n)
+    cells = []
+    for k, x, y in zip(kind, a, b):
+        cells.append([
+            f"{x}%", f"${y:,}", f"{y:,} ({x}%)", f"{x}", f" {x} ",
+            "N/A", "", "--", f"-{x}",
+        ][k])
+    # same dtype read_csv(dtype=str) produces
+    return pd.Series(cells, dtype=object).astype("str")
+
+# ---------------- reference: the original per-cell helpers ----------------
+def clean_number(x):
+    if x is None:
+        return None
+    if isinstance(x, (int, float)) and not pd.isna(x):
+        return float(x)
+    s = str(x).strip()
+    if s == "" or s.lower() in ("na", "n/a", "nan", "--"):
+        return None
+    s = s.replace("(", "").replace(")", "").replace("$", "").replace("%", "").replace(",", "")
+    s2 = re.sub(r"[^0-9.\-]+", "", s)
+    try:
+        return float(s2) if s2 != "" else None
+    except Exception:
+        return None
+
+def get_pct(x):
+    if pd.isna(x):
+        return None
+    s = str(x)
+    m = re.search(r"\(([\d.]+)%\)", s)
+    if m:
+        return float(m.group(1))
+    m = re.search(r"([\d.]+)%", s)
+    if m:
+        return float(m.group(1))
+    m = re.search(r"[\d.]+", s)
+    if m:
+        return float(m.group())
+    return None
+
+def clean(x):
+    if pd.isna(x): return np.nan
+    s = str(x).replace("%","").replace("$","").replace(",","")
+    try: return float(s)
+    except: return np.nan
+
+PAIRS = (
+    ("clean_number", clean_number, parsing.parse_number),
+    ("get_pct", get_pct, parsing.parse_pct),
+    ("clean", clean, parsing.parse_plain),
+)
+
+def main(sizes):
+    print(f"{'cells':>9} {'parser':>13} {'per-cell s':>11} {'bulk s':>8} {'speedup':>8}  parity")
+    for n in sizes:
+        col = messy_column(n)
+        for name, old_fn, new_fn in PAIRS:
+            t0 = time.perf_counter()
+            old = col.apply(old_fn).astype(float).to_numpy()
+            t_old = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            new, _failed = new_fn(col)
+            t_new = time.perf_counter() - t0
+
+            same = np.array_equal(old, new, equal_nan=True)
+            print(f"{n:>9} {name:>13} {t_old:>11.3f} {t_new:>8.3f} {t_old / t_new:>7.1f}x  {'identical' if same else 'MISMATCH'}")
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or SIZES)
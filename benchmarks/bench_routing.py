@@ -0,0 +1,36 @@
+# bench_routing.py — route planning time and quality, cold vs cached distance matrix
+# usage: python -m benchmarks.bench_routing [n_stops ...]
+import sys
+import tempfile
+
+import numpy as np
+
+import routing
+from benchmarks.bench_map import scored_work
+
+SIZES = (100, 1_000, 3_000)
+DEPOT = (35.4676, -97.5164)
+
+def check(stop_list, n, capacity):
+    # every stop visited exactly once, no route over capacity
+    stops = stop_list[stop_list["Tract_FIPS"] != "DEPOT"]
+    assert stops["Tract_FIPS"].is_unique and len(stops) == n, "stop visited twice or skipped"
+    assert (stops.groupby("route")["demand"].sum() <= capacity).all(), "capacity exceeded"
+
+def main(sizes):
+    cache = tempfile.mkdtemp()
+    print(f"{'stops':>6} {'run':>6} {'routes':>6} {'matrix s':>9} {'total s':>8} {'savings km':>11} {'final km':>10}")
+    for n in sizes:
+        work = scored_work(n)
+        # keep the stops within a metro-sized box so shifts and capacity both bind
+        rng = np.random.default_rng(n)
+        work["lat"] = DEPOT[0] + rng.normal(0, 0.25, n)
+        work["lon"] = DEPOT[1] + rng.normal(0, 0.3, n)
+        for run in ("cold", "cached"):
+            stop_list, st = routing.plan_routes(work, DEPOT, top_n=n, shift_min=600, cache_dir=cache)
+            check(stop_list, n - st["unserved"], routing.CAPACITY)
+            print(f"{n:>6} {run:>6} {st['routes']:>6} {st['matrix_seconds']:>9.3f} {st['seconds']:>8.2f} "
+                  f"{st['constructed_km']:>11,.0f} {st['total_km']:>10,.0f}")
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or SIZES)
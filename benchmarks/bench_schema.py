@@ -0,0 +1,62 @@
+# bench_schema.py — loading a wide data sheet: full dtype=str read vs the cached schema profile
+# usage: python -m benchmarks.bench_schema [n_tracts:extra_columns ...]
+#
+# The synthetic data sheet gets extra_columns of ACS-style estimate/margin columns the
+# analysis never reads. "full" is the old load (whole sheet as strings, then column
+# detection), "cold" the first schema.load_sheet (the same read plus inference and
+# the profile write), "warm" every later run of the unchanged file (an edited sheet
+# is re-inferred, at the cold cost). Memory is the loaded frame's deep size
+# (tracemalloc does not see Arrow-backed strings). build_work output is checked to match.
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import datasheet
+import schema
+from benchmarks import synthetic
+
+SIZES = ("3000:200", "20000:200", "85000:100")
+
+def wide_sheet(n, extra, path, seed=0):
+    sheet = synthetic.data_sheet(synthetic.tracts(n, seed), seed)
+    rng = np.random.default_rng(seed)
+    fill = {}
+    for k in range(extra):
+        values = rng.integers(0, 50_000, len(sheet))
+        # estimates as plain numbers, margins as "±123" text
+        fill[f"B{k // 2:05d}_{'E' if k % 2 == 0 else 'M'}"] = values if k % 2 == 0 else [f"±{v % 999}" for v in values]
+    pd.concat([sheet, pd.DataFrame(fill)], axis=1).to_csv(path, index=False)
+
+def measure(fn):
+    # (result, seconds, MB of the loaded frame)
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0, out[0].memory_usage(deep=True).sum() / 1e6
+
+def full_load(path):
+    df = pd.read_csv(path, dtype=str)
+    return df, datasheet.detect_columns(df.columns)
+
+def main(sizes):
+    print(f"{'tracts':>7} {'columns':>8} {'MB':>6} {'full s':>7} {'cold s':>7} {'warm s':>7} "
+          f"{'full MB':>8} {'warm MB':>8}  same work table")
+    with tempfile.TemporaryDirectory() as tmp:
+        for spec in sizes:
+            n, extra = (int(v) for v in spec.split(":"))
+            path = os.path.join(tmp, f"sheet_{n}_{extra}.csv")
+            wide_sheet(n, extra, path)
+            schema_dir = os.path.join(tmp, "schema")
+            (df_full, found), t_full, m_full = measure(lambda: full_load(path))
+            _, t_cold, _ = measure(lambda: schema.load_sheet(path, schema_dir=schema_dir))
+            (df_warm, profile), t_warm, m_warm = measure(lambda: schema.load_sheet(path, schema_dir=schema_dir))
+            same = datasheet.build_work(df_full, found, log=lambda *_: None).equals(
+                datasheet.build_work(df_warm, profile["mapping"], log=lambda *_: None))
+            print(f"{n:>7} {len(profile['columns']):>8} {os.path.getsize(path) / 1e6:>6.1f} {t_full:>7.2f} "
+                  f"{t_cold:>7.2f} {t_warm:>7.2f} {m_full:>8.1f} {m_warm:>8.1f}  {same}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or SIZES)
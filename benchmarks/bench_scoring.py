@@ -0,0 +1,90 @@
+# bench_scoring.py — vectorized composite score vs the old iterrows loop
+# usage: python -m benchmarks.bench_scoring [n ...]
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import scoring
+
+SIZES = (1_000, 10_000, 85_000)
+
+def synthetic_work(n, seed=0, missing=0.1):
+    rng = np.random.default_rng(seed)
+    work = pd.DataFrame({
+        "Tract_FIPS": [f"{40000000000 + i:011d}" for i in range(n)],
+        "total_pop": rng.integers(300, 9000, n).astype(float),
+        "poverty": rng.uniform(1, 70, n).round(1),
+        "income": rng.integers(12000, 220000, n).astype(float),
+        "lap1_pct": rng.uniform(0, 100, n).round(1),
+        "lap10_pct": rng.uniform(0, 100, n).round(1),
+        "snap": rng.uniform(0, 60, n).round(1),
+        "obesity": rng.uniform(15, 55, n).round(1),
+        "diabetes": rng.uniform(4, 28, n).round(1),
+        "inactive": rng.uniform(10, 50, n).round(1),
+    })
+    for c in work.columns[2:]:
+        work.loc[rng.random(n) < missing, c] = np.nan
+    return work
+
+# ---------------- reference: the original per-row implementation ----------------
+def comp_distance_val(row):
+    if pd.notna(row["lap1_pct"]) and row["lap1_pct"] is not None:
+        return max(0.0, min(1.0, (100.0 - row["lap1_pct"]) / 100.0))
+    if pd.notna(row["lap10_pct"]) and row["lap10_pct"] is not None:
+        return max(0.0, min(1.0, (100.0 - row["lap10_pct"]) / 100.0))
+    return None
+
+def comp_pct_val(row, k):
+    if pd.notna(row[k]) and row[k] is not None:
+        return max(0.0, min(1.0, row[k] / 100.0))
+    return None
+
+def comp_health_val(row):
+    parts = []
+    for k in ("obesity", "diabetes", "inactive"):
+        if pd.notna(row[k]) and row[k] is not None:
+            parts.append(row[k] / 100.0)
+    if not parts:
+        return None
+    return sum(parts) / len(parts)
+
+def legacy_scores(work):
+    out = []
+    for _, r in work.iterrows():
+        inc = None
+        if pd.notna(r["income"]) and r["income"] is not None:
+            inc = max(0.0, min(1.0, 1.0 - (r["income"] / 200000.0)))
+        parts = [
+            (comp_pct_val(r, "poverty"), scoring.W_POV),
+            (comp_pct_val(r, "snap"), scoring.W_SNAP),
+            (comp_health_val(r), scoring.W_HEALTH),
+            (comp_distance_val(r), scoring.W_DIST),
+            (inc, scoring.W_INC),
+        ]
+        comps = [c for c, _ in parts if c is not None]
+        wts = [w for c, w in parts if c is not None]
+        out.append(sum(c * w for c, w in zip(comps, wts)) / sum(wts) if comps else None)
+    return pd.Series(out, dtype=float)
+
+def main(sizes):
+    print(f"{'tracts':>8} {'iterrows s':>11} {'vector s':>9} {'speedup':>8}  ranks")
+    for n in sizes:
+        work = synthetic_work(n)
+
+        t0 = time.perf_counter()
+        old = legacy_scores(work)
+        old_rank = old.rank(method="min", ascending=False)
+        t_old = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        new = scoring.composite_scores(work)
+        new_rank = scoring.rank_scores(new)
+        t_new = time.perf_counter() - t0
+
+        same = np.array_equal(old.to_numpy(), new, equal_nan=True) and np.array_equal(old_rank.to_numpy(), new_rank, equal_nan=True)
+        print(f"{n:>8} {t_old:>11.3f} {t_new:>9.4f} {t_old / t_new:>7.0f}x  {'identical' if same else 'MISMATCH'}")
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or SIZES)
@@ -0,0 +1,49 @@
+# bench_site_selection.py — KD-tree greedy + swaps vs a full distance-matrix greedy
+# usage: python -m benchmarks.bench_site_selection [n_tracts:n_candidates ...]
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import site_selection
+from benchmarks.bench_map import scored_work
+from geo import haversine_km
+
+SIZES = ((2_000, 500), (20_000, 5_000), (80_000, 20_000))
+MATRIX_LIMIT = 20_000 * 1_000  # skip the all-pairs reference beyond this many cells
+P = 25
+
+def candidates(m, seed=1):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"name": [f"site {i}" for i in range(m)],
+                         "lat": rng.uniform(33.6, 37.0, m), "lon": rng.uniform(-103.0, -94.4, m)})
+
+def matrix_greedy(work, cand, p):
+    # reference: plain greedy p-median on the full n x m haversine matrix
+    w = site_selection.demand_weights(work)
+    d = haversine_km(work["lat"].to_numpy()[:, None], work["lon"].to_numpy()[:, None],
+                     cand["lat"].to_numpy()[None, :], cand["lon"].to_numpy()[None, :])
+    cur = np.full(len(work), d.max())
+    for _ in range(p):
+        j = int(np.argmin(w @ np.minimum(cur[:, None], d)))
+        cur = np.minimum(cur, d[:, j])
+    return float(np.dot(w, cur))
+
+def main(sizes):
+    print(f"{'tracts':>8} {'cands':>7} {'model':>9} {'seconds':>8} {'objective':>14} {'matrix s':>9} {'matrix obj':>14}")
+    for n, m in sizes:
+        work, cand = scored_work(n), candidates(m)
+        for model in site_selection.MODELS:
+            sites, assign, stats = site_selection.select_sites(work, cand, P, model=model)
+            exact = float(np.dot(assign["weight"], assign["distance_km"]))
+            obj = exact if model == "p-median" else stats["objective"]
+            ref_s = ref_obj = float("nan")
+            if model == "p-median" and n * m <= MATRIX_LIMIT:
+                t0 = time.perf_counter()
+                ref_obj = matrix_greedy(work, cand, P)
+                ref_s = time.perf_counter() - t0
+            print(f"{n:>8} {m:>7} {model:>9} {stats['seconds']:>8.2f} {obj:>14,.0f} {ref_s:>9.2f} {ref_obj:>14,.0f}")
+
+if __name__ == "__main__":
+    main([tuple(int(x) for x in a.split(":")) for a in sys.argv[1:]] or SIZES)
@@ -0,0 +1,75 @@
+# bench_startup.py — `python -X importtime` cost of each nourishnet command against its budget
+# usage: python -m benchmarks.bench_startup [command ...] [--runs 5]
+#
+# Each command's imports (nourishnet.load) run in a fresh interpreter under
+# -X importtime; the best of --runs totals is compared with BUDGET_MS, and the light
+# commands must not pull in any of their FORBIDDEN packages. "startup" is the bare
+# `import nourishnet` that every command pays. What the interpreter imports on its
+# own (site, encodings, ...) is measured with `-c pass` and left out of the totals.
+# Exits non-zero when a budget is broken.
+import os
+import subprocess
+import sys
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = 5
+COMMANDS = ("startup", "score", "extract", "centroids", "serve", "map", "sensitivity", "regress", "moran")
+
+# milliseconds of import time; None = measured and reported only
+BUDGET_MS = {"startup": 15, "score": 650, "extract": 650, "centroids": 400,
+             "serve": None, "map": None, "sensitivity": None, "regress": None, "moran": None}
+HEAVY = ("folium", "branca", "jinja2", "scipy", "sklearn", "requests")
+FORBIDDEN = {
+    "startup": HEAVY + ("numpy", "pandas", "pyarrow"),
+    "score": HEAVY,
+    "extract": HEAVY,
+    "centroids": ("pandas", "pyarrow", "folium", "branca", "scipy", "sklearn"),
+    "serve": ("folium", "branca", "jinja2", "sklearn", "requests"),
+}
+
+def import_profile(command):
+    # (total import ms, {top-level package: cumulative ms}) for one fresh interpreter
+    code = {None: "pass", "startup": "import nourishnet"}.get(command, f"import nourishnet; nourishnet.load({command!r})")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=REPO,
+                          capture_output=True, text=True, check=True)
+    total, packages = 0, {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        total += int(self_us)
+        if not name.startswith("  "):  # outermost imports only
+            top = name.strip().split(".")[0]
+            packages[top] = packages.get(top, 0) + int(cumulative_us) / 1000
+    return total / 1000, packages
+
+def main(argv):
+    args = list(argv)
+    runs = RUNS
+    if "--runs" in args:
+        i = args.index("--runs")
+        runs = int(args[i + 1])
+        del args[i:i + 2]
+    failed = []
+    interpreter = set(import_profile(None)[1])
+    print(f"{'command':<10} {'import ms':>10} {'budget':>8}  heaviest packages")
+    for command in args or COMMANDS:
+        profiles = [import_profile(command) for _ in range(runs)]
+        total, packages = min(profiles, key=lambda p: p[0])
+        packages = {p: ms for p, ms in packages.items() if p not in interpreter}
+        total = sum(packages.values())
+        budget = BUDGET_MS.get(command)
+        heaviest = ", ".join(f"{p} {ms:.0f}" for p, ms in sorted(packages.items(), key=lambda kv: -kv[1])[:4])
+        print(f"{command:<10} {total:>10.0f} {budget if budget else '-':>8}  {heaviest}")
+        if budget and total > budget:
+            failed.append(f"{command}: {total:.0f} ms of imports, budget {budget} ms")
+        loaded = [p for p in FORBIDDEN.get(command, ()) if p in packages]
+        if loaded:
+            failed.append(f"{command}: imports {', '.join(loaded)}")
+    if failed:
+        print("\nOver budget:\n  " + "\n  ".join(failed))
+        raise SystemExit(1)
+    print("\nAll commands within their import budgets.")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,59 @@
+# bench_tiger_client.py — batched TigerClient vs one blocking request per GEOID, against the local stub
+# usage: python -m benchmarks.bench_tiger_client [n_tracts] [latency_s]
+import sys
+import time
+
+import numpy as np
+import requests
+
+from benchmarks.stub_tigerweb import StubTigerweb
+from tiger_client import TigerClient, geometry_centroid
+
+OLD_SLEEP = 0.18  # the per-attempt pause OKC_MAPPED.py used to take
+OLD_SAMPLE = 20   # the old path is slow; time a sample and extrapolate
+
+def synthetic_tracts(n, seed=0):
+    rng = np.random.default_rng(seed)
+    lat = rng.uniform(33.6, 37.0, n)
+    lon = rng.uniform(-103.0, -94.4, n)
+    return {f"40{i:09d}": (float(a), float(b)) for i, (a, b) in enumerate(zip(lat, lon))}
+
+def old_fetch(urls, geoid):
+    for svc in urls:
+        try:
+            r = requests.get(svc, params={"where": f"GEOID='{geoid}'", "f": "json"}, timeout=15)
+            feats = r.json().get("features") or []
+            if feats:
+                return geometry_centroid(feats[0]["geometry"])
+        finally:
+            time.sleep(OLD_SLEEP)
+    return None
+
+def main(n=3000, latency=0.05):
+    tracts = synthetic_tracts(n)
+    ids = list(tracts)
+    # the first layer misses 10% of tracts so the per-batch fallback gets exercised
+    layers = {"layer16": set(ids[: int(n * 0.9)]), "layer11": None, "layer23": None}
+    with StubTigerweb(tracts, layers, latency=latency, fail_rate=0.02) as stub:
+        urls = stub.urls()
+
+        t0 = time.perf_counter()
+        for g in ids[:OLD_SAMPLE]:
+            old_fetch(urls, g)
+        t_old = (time.perf_counter() - t0) / OLD_SAMPLE * n
+
+        stub.requests = 0
+        t0 = time.perf_counter()
+        with TigerClient(services=urls, rate=50, burst=16) as client:
+            got = client.fetch(ids)
+        t_new = time.perf_counter() - t0
+
+    ok = sum(1 for v in got.values() if v[0] is not None)
+    print(f"{n} tracts, {latency * 1000:.0f} ms stub latency")
+    print(f"  per-GEOID requests (extrapolated): {t_old:8.1f} s")
+    print(f"  batched client:                    {t_new:8.2f} s  ({stub.requests} HTTP calls, {ok}/{n} resolved)")
+    print(f"  {client.report()}")
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 3000, float(args[1]) if len(args) > 1 else 0.05)
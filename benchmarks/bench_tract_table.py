@@ -0,0 +1,76 @@
+# bench_tract_table.py — work DataFrame vs tract_table.TractTable: resident size and peak memory
+# usage: python -m benchmarks.bench_tract_table [n_tracts ...]
+#
+# Both containers hold the same synthetic work table (datasheet.build_work output)
+# and run the same steps: composite score, rank and sort by need. "table MB" is the
+# container's own size (deep, strings included); "peak MB" is the tracemalloc peak
+# of the steps on top of it. Arrow-backed pandas strings are invisible to
+# tracemalloc, so the DataFrame peak is if anything understated. "rows" is the
+# list of per-tract pandas Series the original OKC_MAPPED.py kept in `records`,
+# sized for reference. Scores and the map's GeoJSON feature counts are compared
+# at the end.
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import datasheet
+import map_render
+import scoring
+from benchmarks import synthetic
+from tract_table import TractTable
+
+SIZES = (10_000, 85_000)
+
+def work_table(n, seed=0):
+    sheet = synthetic.data_sheet(synthetic.tracts(n, seed), seed)
+    return datasheet.build_work(sheet, datasheet.detect_columns(sheet.columns), log=lambda *_: None)
+
+def dataframe_path(work):
+    work = work.copy()
+    work["composite_score"] = scoring.composite_scores(work)
+    work["rank"] = scoring.rank_scores(work["composite_score"])
+    return work.sort_values(by="composite_score", ascending=False, na_position="last").reset_index(drop=True)
+
+def table_path(table):
+    table["composite_score"] = scoring.composite_scores(table)
+    table["rank"] = scoring.rank_scores(table["composite_score"])
+    return table.sort_by("composite_score")
+
+def rows_size(work):
+    # tracemalloc size of the original per-tract row Series list
+    tracemalloc.start()
+    records = [r for _, r in work.astype(object).iterrows()]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del records
+    return size / 1e6
+
+def measure(fn, arg):
+    t0 = time.perf_counter()
+    tracemalloc.start()
+    out = fn(arg)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return out, time.perf_counter() - t0, peak / 1e6
+
+def main(sizes):
+    print(f"{'tracts':>7} {'container':<11} {'table MB':>9} {'peak MB':>8} {'seconds':>8}")
+    for n in sizes:
+        work = work_table(n)
+        table = TractTable.from_work(work)
+        print(f"{n:>7} {'rows':<11} {rows_size(work):>9.2f} {'-':>8} {'-':>8}")
+        df_sorted, t_df, peak_df = measure(dataframe_path, work)
+        print(f"{n:>7} {'DataFrame':<11} {work.memory_usage(deep=True).sum() / 1e6:>9.2f} {peak_df:>8.1f} {t_df:>8.2f}")
+        tt_sorted, t_tt, peak_tt = measure(table_path, table)
+        print(f"{n:>7} {'TractTable':<11} {table.nbytes / 1e6:>9.2f} {peak_tt:>8.1f} {t_tt:>8.2f}")
+        a, b = df_sorted["composite_score"].to_numpy(), tt_sorted["composite_score"]
+        ok = ~np.isnan(a)
+        features = (len(map_render.feature_collection(df_sorted)["features"]),
+                    len(map_render.feature_collection(tt_sorted)["features"]))
+        print(f"        max score diff (float32 inputs) {np.abs(a[ok] - b[ok]).max():.1e}; "
+              f"map features {features[0]:,} / {features[1]:,}")
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or SIZES)
@@ -0,0 +1,40 @@
+# bench_weights.py — libpysal KNN vs KD-tree CSR build vs memory-mapped cache load
+# usage: python -m benchmarks.bench_weights [n ...]
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+import spatial_weights
+
+SIZES = (1_000, 10_000, 85_000)
+K = 4
+
+def main(sizes):
+    from libpysal.weights import KNN
+
+    cache = tempfile.mkdtemp()
+    print(f"{'points':>8} {'libpysal s':>11} {'build s':>8} {'cache load s':>13} {'identical':>10}")
+    for n in sizes:
+        rng = np.random.default_rng(n)
+        x, y = rng.uniform(-103.0, -94.4, n), rng.uniform(33.6, 37.0, n)
+        t0 = time.perf_counter()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # disconnected-components notices
+            w = KNN.from_array(np.column_stack([x, y]), k=K)
+        w.transform = "R"
+        ref = w.sparse
+        t_lib = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        W, _ = spatial_weights.cached("knn", x, y, cache_dir=cache, k=K)
+        t_build = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        W, hit = spatial_weights.cached("knn", x, y, cache_dir=cache, k=K)
+        t_load = time.perf_counter() - t0
+        assert hit
+        print(f"{n:>8} {t_lib:>11.3f} {t_build:>8.3f} {t_load:>13.4f} {str(abs(W - ref).max() == 0):>10}")
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or SIZES)
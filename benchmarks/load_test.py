@@ -0,0 +1,162 @@
+# load_test.py — latency percentiles of tract_service.py under concurrent keep-alive clients
+# usage: python -m benchmarks.load_test [--url http://127.0.0.1:8765 --ids scored_tracts.csv]
+#                                       [--requests 20000] [--concurrency 4] [--tracts 85000]
+#
+# With --url it drives a running service, drawing GEOIDs from --ids (the table the
+# service was started on). Without it a synthetic scored table of --tracts tracts is
+# written to a temporary directory and tract_service.py is started on it in a
+# separate process on a free port, so client and server do not share a GIL (on a
+# single core they still share the CPU, and client queueing shows up in the tail).
+# The mix is MIX: single lookups with Zipf-skewed popularity (case workers keep
+# looking up the same tracts), batches of BATCH_SIZE GEOIDs, and nearest-tract
+# queries at jittered centroids. WARMUP requests are sent first and not counted.
+# Prints p50/p90/p99/max per request kind, throughput and the service's cache
+# counters, and exits non-zero when the overall p99 is over P99_TARGET_MS.
+import http.client
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+
+import numpy as np
+import pandas as pd
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REQUESTS = 20_000
+CONCURRENCY = 4
+TRACTS = 85_000
+WARMUP = 500
+MIX = {"lookup": 0.75, "batch": 0.05, "nearest": 0.20}
+BATCH_SIZE = 50
+ZIPF_A = 1.3
+JITTER_DEG = 0.02
+P99_TARGET_MS = 10.0
+
+def synthetic_scored(n, path):
+    # scored work table of n synthetic tracts, as `nourishnet score` would write it
+    import datasheet
+    import scoring
+    from benchmarks import synthetic
+
+    sheet = synthetic.data_sheet(synthetic.tracts(n, 0), 0)
+    work = datasheet.build_work(sheet, datasheet.detect_columns(sheet.columns), log=lambda *_: None)
+    work["composite_score"] = scoring.composite_scores(work)
+    work["rank"] = scoring.rank_scores(work["composite_score"])
+    work.to_csv(path, index=False)
+
+def start_service(path):
+    # tract_service.py in a child process on a free port; returns (process, base url)
+    proc = subprocess.Popen([sys.executable, os.path.join(REPO, "tract_service.py"), path, "--port", "0"],
+                            cwd=REPO, stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline()
+    if " on http" not in line:
+        proc.kill()
+        raise SystemExit(f"tract_service.py did not start: {line!r}")
+    return proc, line.split(" on ")[1].split()[0]
+
+def plan(work, n, seed=0):
+    # (kind, method, path, body) for n requests drawn from MIX
+    rng = np.random.default_rng(seed)
+    ids = work["Tract_FIPS"].to_numpy()
+    popular = rng.permutation(len(ids))
+    located = work.dropna(subset=["lat", "lon"])
+    kinds = rng.choice(list(MIX), n, p=list(MIX.values()))
+    out = []
+    for kind in kinds:
+        if kind == "lookup":
+            g = ids[popular[min(rng.zipf(ZIPF_A) - 1, len(ids) - 1)]]
+            out.append((kind, "GET", f"/tract/{g}", None))
+        elif kind == "batch":
+            body = json.dumps({"geoids": list(rng.choice(ids, BATCH_SIZE))}).encode()
+            out.append((kind, "POST", "/tracts", body))
+        else:
+            r = located.iloc[rng.integers(len(located))]
+            lat, lon = r["lat"] + rng.normal(0, JITTER_DEG), r["lon"] + rng.normal(0, JITTER_DEG)
+            out.append((kind, "GET", f"/nearest?lat={lat:.5f}&lon={lon:.5f}&k=3", None))
+    return out
+
+def run(base, requests, concurrency):
+    # [(kind, seconds, status)] for every request, spread over concurrency keep-alive connections
+    url = urlparse(base)
+    results = [[] for _ in range(concurrency)]
+
+    def worker(j):
+        conn = http.client.HTTPConnection(url.hostname, url.port, timeout=30)
+        headers = {"Content-Type": "application/json"}
+        for kind, method, path, body in requests[j::concurrency]:
+            t0 = time.perf_counter()
+            conn.request(method, path, body=body, headers=headers)
+            resp = conn.getresponse()
+            resp.read()
+            results[j].append((kind, time.perf_counter() - t0, resp.status))
+        conn.close()
+
+    threads = [threading.Thread(target=worker, args=(j,)) for j in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return [r for part in results for r in part]
+
+def get_json(base, path):
+    url = urlparse(base)
+    conn = http.client.HTTPConnection(url.hostname, url.port, timeout=30)
+    conn.request("GET", path)
+    out = json.loads(conn.getresponse().read())
+    conn.close()
+    return out
+
+def report(results, seconds):
+    frame = pd.DataFrame(results, columns=["kind", "seconds", "status"])
+    print(f"{'kind':<8} {'requests':>9} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} {'errors':>7}")
+    for kind, g in [*frame.groupby("kind", sort=False), ("all", frame)]:
+        ms = g["seconds"].to_numpy() * 1000
+        p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+        print(f"{kind:<8} {len(g):>9,} {p50:>8.2f} {p90:>8.2f} {p99:>8.2f} {ms.max():>8.2f} {int((g['status'] >= 400).sum()):>7}")
+    print(f"{len(frame) / seconds:,.0f} requests/s over {seconds:.1f}s")
+    return float(np.percentile(frame["seconds"] * 1000, 99))
+
+def main(argv):
+    args = list(argv)
+    opts = {}
+    for name in ("--url", "--ids", "--requests", "--concurrency", "--tracts"):
+        if name in args:
+            i = args.index(name)
+            opts[name] = args[i + 1]
+            del args[i:i + 2]
+    if args or ("--url" in opts) != ("--ids" in opts):
+        raise SystemExit("usage: python -m benchmarks.load_test [--url URL --ids scored_tracts.csv] "
+                         "[--requests N] [--concurrency N] [--tracts N]")
+    n, concurrency = int(opts.get("--requests", REQUESTS)), int(opts.get("--concurrency", CONCURRENCY))
+    with tempfile.TemporaryDirectory() as tmp:
+        proc = None
+        if "--url" in opts:
+            base, ids_path = opts["--url"].rstrip("/"), opts["--ids"]
+        else:
+            ids_path = os.path.join(tmp, "scored_tracts.csv")
+            synthetic_scored(int(opts.get("--tracts", TRACTS)), ids_path)
+            t0 = time.perf_counter()
+            proc, base = start_service(ids_path)
+            print(f"Started tract_service.py on {base} in {time.perf_counter() - t0:.2f}s")
+        try:
+            work = pd.read_csv(ids_path, dtype={"Tract_FIPS": str}, usecols=["Tract_FIPS", "lat", "lon"])
+            requests = plan(work, WARMUP + n)
+            run(base, requests[:WARMUP], concurrency)
+            t0 = time.perf_counter()
+            results = run(base, requests[WARMUP:], concurrency)
+            p99 = report(results, time.perf_counter() - t0)
+            health = get_json(base, "/health")
+            print(f"{health['tracts']:,} tracts served, response cache {health['cache']}")
+        finally:
+            if proc is not None:
+                proc.terminate()
+                proc.wait()
+    if p99 > P99_TARGET_MS:
+        raise SystemExit(f"p99 {p99:.2f} ms is over the {P99_TARGET_MS:.0f} ms target")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
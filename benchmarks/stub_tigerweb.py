@@ -0,0 +1,88 @@
+# stub_tigerweb.py — local stand-in for the TIGERweb ArcGIS REST query endpoints
+# Serves http://127.0.0.1:<port>/<layer>/query with GEOID='..' or GEOID IN (..) where
+# clauses, answering with a small square ring around each known tract centroid.
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+HALF_SIDE = 0.005  # degrees; ring half-width around each centroid
+
+class StubTigerweb:
+    # tracts: {geoid: (lat, lon)}; layers: {name: set of geoids or None for all}
+    def __init__(self, tracts, layers=None, latency=0.0, fail_rate=0.0, seed=0):
+        self.tracts = tracts
+        self.layers = layers or {"tracts": None}
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def urls(self):
+        port = self.server.server_address[1]
+        return [f"http://127.0.0.1:{port}/{name}/query" for name in self.layers]
+
+    def start(self):
+        self.thread.start()
+        return self.urls()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _feature(self, geoid):
+        lat, lon = self.tracts[geoid]
+        d = HALF_SIDE
+        ring = [[lon - d, lat - d], [lon + d, lat - d], [lon + d, lat + d], [lon - d, lat + d], [lon - d, lat - d]]
+        return {"attributes": {"GEOID": geoid}, "geometry": {"rings": [ring]}}
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                parts = url.path.strip("/").split("/")
+                with stub.lock:
+                    stub.requests += 1
+                    fail = stub.rng.random() < stub.fail_rate
+                if stub.latency:
+                    time.sleep(stub.latency)
+                if len(parts) != 2 or parts[1] != "query" or parts[0] not in stub.layers:
+                    return self._send(404, {"error": {"code": 404, "message": "not found"}})
+                if fail:
+                    return self._send(503, {"error": {"code": 503, "message": "busy"}})
+                where = parse_qs(url.query).get("where", [""])[0]
+                known = stub.layers[parts[0]]
+                geoids = [g for g in re.findall(r"'(\d+)'", where)
+                          if g in stub.tracts and (known is None or g in known)]
+                self._send(200, {"features": [stub._feature(g) for g in geoids]})
+
+            def _send(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
@@ -0,0 +1,194 @@
+# suite.py — time and memory of every analysis stage on synthetic state/national inputs
+# usage: python -m benchmarks.suite [n_tracts ...] [--out results.json] [--compare old.json] [--no-memory]
+#
+# For each size the four sheets are generated by benchmarks.synthetic and pushed
+# through the same steps the scripts run, in order:
+#   load        schema.load_sheet for the data sheet and okc_data.csv, the PLACES
+#               extract and the atlas Feather cache (profiles and caches are built
+#               once per size before timing, so this is the steady-state load)
+#   parse       datasheet.build_work and Regression.model_frame
+#   scoring     composite score, ranks and sort
+#   regression  OLS, bootstrap, k-fold CV and a GWR fit at a fixed bandwidth
+#   moran       KNN weights plus global/local Moran's I and Gi*
+#   map         build and save the folium map
+# Each stage is timed on its own, then re-run under tracemalloc for its peak memory.
+# Results go to benchmarks/results/suite-<time>.json; --compare prints the change
+# against an earlier file (e.g. results/baseline.json) so regressions between
+# versions show up.
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+import datasheet
+import gwr
+import map_render
+import ols
+import parsing
+import Regression
+import schema
+import scoring
+import spatial_stats
+import spatial_weights
+from atlas_cache import AtlasCache
+from benchmarks import synthetic
+from places_extract import extract_places
+
+SIZES = (100, 10_000, 85_000)
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+BOOTSTRAPS = 500
+PERMUTATIONS = 99
+GWR_BANDWIDTH = 100
+SLOWER = 1.25     # --compare flags stages at least this much slower ...
+MIN_DELTA = 0.05  # ... and by more than this many seconds (timer noise on tiny runs)
+
+# ---------------- stages ----------------
+# each takes the context built so far and returns (additions to it, detail for the report)
+def stage_load(ctx):
+    # the production readers: cached-schema loads of the two hand-made sheets, the
+    # streaming PLACES extract and the atlas Feather cache
+    paths, cache = ctx["paths"], ctx["cache"]
+    sheet, profile = schema.load_sheet(paths["data_sheet"], schema_dir=cache)
+    okc, okc_profile = schema.load_sheet(paths["okc_data"], "regression", schema_dir=cache)
+    census, _ = extract_places(paths["census"], progress=False)
+    atlas = AtlasCache.open(paths["food_access"], cache_dir=cache)
+    rows = len(sheet) + len(okc) + len(census) + len(atlas.index)
+    found = profile["mapping"]
+    return ({"sheet": sheet, "columns": found, "okc": okc, "okc_mapping": okc_profile["mapping"]},
+            {"rows": rows, "columns_found": sum(v is not None for k, v in found.items() if k != "notes")})
+
+def stage_parse(ctx):
+    # OKC_MAPPED.py's work table and Regression.py's model frame
+    work = datasheet.build_work(ctx["sheet"], ctx["columns"], log=lambda *_: None)
+    okc = ctx["okc"].copy()
+    okc.columns = okc.columns.str.strip().str.lower()
+    col = {k: c.strip().lower() if c else None for k, c in ctx["okc_mapping"].items()}
+    model = Regression.model_frame(okc, col)
+    model["lat"], model["lon"] = parsing.parse_latlon(model[col["latitude"]])
+    model = model.dropna(subset=["lat", "lon"]).reset_index(drop=True)
+    located = int((work["lat"].notna() & work["lon"].notna()).sum())
+    return {"work": work, "model": model}, {"tracts": len(work), "located": located, "model_rows": len(model)}
+
+def stage_scoring(ctx):
+    work = ctx["work"].copy()
+    work["composite_score"] = scoring.composite_scores(work)
+    work["rank"] = scoring.rank_scores(work["composite_score"])
+    work = work.sort_values("composite_score", ascending=False, na_position="last").reset_index(drop=True)
+    return {"scored": work}, {"scored": int(work["composite_score"].notna().sum())}
+
+def stage_regression(ctx):
+    d = ctx["model"]
+    X, y = d[["poverty", "health", "income"]], d["low_access"]
+    b0, b = ols.fit(X, y)
+    ols.bootstrap(X, y, X.columns, n_boot=BOOTSTRAPS, seed=0)
+    cv = ols.cross_validate(X, y, X.columns, seed=0)
+    detail = {"r2": round(float(ols.r2(y, ols.predict(X, b0, b))), 4), "best_cv_r2": round(float(cv["cv_r2"].iloc[0]), 4)}
+    bw = min(GWR_BANDWIDTH, len(d))
+    if bw > X.shape[1] + 1:
+        fit = gwr.GWR(d["lat"], d["lon"], X, y, max_bandwidth=bw).fit(bw)
+        detail["gwr_r2"] = round(float(fit.r2), 4)
+    return {}, detail
+
+def stage_moran(ctx):
+    d = ctx["model"]
+    W = spatial_weights.knn(d["lon"].to_numpy(), d["lat"].to_numpy(), k=4)
+    names = ["poverty", "obesity", "diabetes", "inactive"]
+    glob, _ = spatial_stats.autocorrelation(d[names].to_numpy(), W, names, permutations=PERMUTATIONS, seed=0)
+    return {}, {"moran_poverty": round(float(glob.loc["poverty", "I"]), 4)}
+
+def stage_map(ctx):
+    path = os.path.join(ctx["tmp"], "map.html")
+    map_render.build_map(ctx["scored"]).save(path)
+    size = os.path.getsize(path)
+    os.remove(path)
+    return {}, {"html_mb": round(size / 1e6, 2)}
+
+STAGES = [("load", stage_load), ("parse", stage_parse), ("scoring", stage_scoring),
+          ("regression", stage_regression), ("moran", stage_moran), ("map", stage_map)]
+
+# ---------------- running ----------------
+def measure(fn, ctx, memory=True):
+    t0 = time.perf_counter()
+    added, detail = fn(ctx)
+    seconds = time.perf_counter() - t0
+    peak = None
+    if memory:
+        # second run only for the allocation peak; tracemalloc slows it down
+        tracemalloc.start()
+        fn(ctx)
+        peak = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+    return added, detail, seconds, peak
+
+def run(sizes, memory=True, seed=0):
+    results = []
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            t0 = time.perf_counter()
+            ctx = {"paths": synthetic.write_all(n, tmp, seed), "tmp": tmp, "cache": os.path.join(tmp, "cache")}
+            stage_load(ctx)  # schema profiles and the atlas cache, as after a first run
+            print(f"\n{n} tracts (inputs generated in {time.perf_counter() - t0:.1f} s)")
+            for name, fn in STAGES:
+                added, detail, seconds, peak = measure(fn, ctx, memory)
+                ctx.update(added)
+                results.append({"tracts": n, "stage": name, "seconds": round(seconds, 4),
+                                "peak_mb": None if peak is None else round(peak, 1), "detail": detail})
+                mem = "-" if peak is None else f"{peak:.1f}"
+                print(f"  {name:<11} {seconds:>8.3f} s {mem:>9} MB  {detail}")
+    return results
+
+def environment():
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(RESULTS_DIR)).stdout.strip() or None
+    except OSError:
+        rev = None
+    return {"created": datetime.now(timezone.utc).isoformat(timespec="seconds"), "git": rev,
+            "python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+            "machine": platform.machine(), "cpus": os.cpu_count()}
+
+def compare(results, old_path):
+    with open(old_path) as f:
+        old = {(r["tracts"], r["stage"]): r for r in json.load(f)["results"]}
+    print(f"\nAgainst {old_path}:")
+    print(f"{'tracts':>8} {'stage':<11} {'old s':>8} {'new s':>8} {'ratio':>6} {'old MB':>8} {'new MB':>8}")
+    for r in results:
+        o = old.get((r["tracts"], r["stage"]))
+        if o is None:
+            continue
+        ratio = r["seconds"] / o["seconds"] if o["seconds"] else float("nan")
+        flag = "  SLOWER" if ratio >= SLOWER and r["seconds"] - o["seconds"] > MIN_DELTA else ""
+        old_mb = "-" if o.get("peak_mb") is None else f"{o['peak_mb']:.1f}"
+        new_mb = "-" if r.get("peak_mb") is None else f"{r['peak_mb']:.1f}"
+        print(f"{r['tracts']:>8} {r['stage']:<11} {o['seconds']:>8.3f} {r['seconds']:>8.3f} {ratio:>6.2f} {old_mb:>8} {new_mb:>8}{flag}")
+
+def main(argv):
+    args = list(argv)
+    opts = {}
+    for flag in ("--out", "--compare"):
+        if flag in args:
+            i = args.index(flag)
+            opts[flag] = args[i + 1]
+            del args[i:i + 2]
+    memory = "--no-memory" not in args
+    sizes = [int(a) for a in args if not a.startswith("--")] or SIZES
+    env = environment()
+    results = run(sizes, memory=memory)
+    out = opts.get("--out") or os.path.join(RESULTS_DIR, f"suite-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump({"environment": env, "results": results}, f, indent=1)
+    print(f"\nResults saved to {out}")
+    if "--compare" in opts:
+        compare(results, opts["--compare"])
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
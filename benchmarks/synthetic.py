@@ -0,0 +1,194 @@
+# synthetic.py — statewide/national-sized stand-ins for the four input sheets
+# usage: python -m benchmarks.synthetic n_tracts [out_dir] [seed]
+#
+# Same file names and column layouts as food_access.csv, census.csv, okc_data.csv and
+# "Data Sheet of OKC - Sheet1.csv", with the same kinds of mess the real sheets have:
+# "$45,000", "1,234 (18.2%)", "41.3%", "na"/"--"/blank cells, combined "lat, lon"
+# cells and a few non-tract rows. Tracts sit in metro-sized clusters over the lower 48.
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+MISSING = 0.08          # share of blanked-out cells in the hand-made sheets
+NON_TRACT_ROWS = 0.02   # "Total", notes etc. in the data sheet
+TRACTS_PER_METRO = 800
+NA_CELLS = ("", "na", "N/A", "--")
+
+FOOD_ACCESS_COLUMNS = [
+    "CensusTract", "State", "County", "Urban", "Pop2010", "OHU2010", "PovertyRate", "MedianFamilyIncome",
+    "LAPOP1_10", "lapop1share", "LAPOP1_20", "lapop20share", "lapophalf", "lapop1", "lapop10", "lapop20",
+    "lakidshalf", "lakids1", "lakids10", "lakids20", "laseniorshalf", "laseniors1", "laseniors10", "laseniors20",
+    "lawhitehalf", "lawhite1", "lawhite10", "lawhite20", "lablackhalf", "lablack1", "lablack10", "lablack20",
+    "lasnaphalf", "lasnap1", "lasnap10", "lasnap20", "lahunvhalf", "lahunv1", "lahunv10", "lahunv20",
+]
+CENSUS_MEASURES = ["ACCESS2", "ARTHRITIS", "BINGE", "BPHIGH", "CANCER", "CASTHMA", "OBESITY", "DIABETES",
+                   "LPA", "CHD", "CSMOKING", "DEPRESSION"]
+STATES = [("01", "Alabama", "AL"), ("04", "Arizona", "AZ"), ("06", "California", "CA"), ("08", "Colorado", "CO"),
+          ("12", "Florida", "FL"), ("13", "Georgia", "GA"), ("17", "Illinois", "IL"), ("26", "Michigan", "MI"),
+          ("36", "New York", "NY"), ("37", "North Carolina", "NC"), ("39", "Ohio", "OH"), ("40", "Oklahoma", "OK"),
+          ("42", "Pennsylvania", "PA"), ("48", "Texas", "TX"), ("53", "Washington", "WA")]
+
+FILES = {
+    "food_access": "food_access.csv",
+    "census": "census.csv",
+    "okc_data": "okc_data.csv",
+    "data_sheet": "Data Sheet of OKC - Sheet1.csv",
+}
+
+# ---------------- shared tract geography ----------------
+def tracts(n, seed=0):
+    # one row per tract: FIPS pieces, centroid and the indicators every sheet is derived from
+    rng = np.random.default_rng(seed)
+    metros = max(1, -(-n // TRACTS_PER_METRO))
+    metro = np.sort(rng.integers(0, metros, n))
+    centre_lat, centre_lon = rng.uniform(26, 48, metros), rng.uniform(-122, -70, metros)
+    if metros == 1:
+        centre_lat[:], centre_lon[:] = 35.48, -97.50
+    state = np.array(STATES, dtype=object)[metro % len(STATES)]
+    # tract numbers run within each metro, which stands in for a county
+    within = np.arange(n) - np.searchsorted(metro, metro)
+    county = 1 + 2 * (metro // len(STATES))
+    fips = [f"{s}{c:03d}{100000 + t:06d}" for s, c, t in zip(state[:, 0], county, within)]
+    dlat, dlon = rng.normal(0, 0.15, n), rng.normal(0, 0.18, n)
+    # poorer, better-served cores and richer, car-dependent edges give the
+    # spatial statistics and the regressions some structure to find
+    core = np.exp(-(dlat ** 2 + dlon ** 2) / 0.02)
+    poverty = np.clip(rng.gamma(2.0, 5.0, n) + 20 * core, 0.5, 90)
+    return pd.DataFrame({
+        "fips": fips,
+        "state_fips": state[:, 0], "state": state[:, 1], "state_abbr": state[:, 2],
+        "county_fips": [f"{s}{c:03d}" for s, c in zip(state[:, 0], county)],
+        "lat": centre_lat[metro] + dlat,
+        "lon": centre_lon[metro] + dlon,
+        "pop": rng.integers(300, 9000, n),
+        "poverty": poverty.round(1),
+        "income": np.clip(120000 - 1500 * poverty + rng.normal(0, 20000, n), 9000, 250000).round(),
+        "lap1": np.clip(30 + 50 * core + rng.normal(0, 15, n), 0, 100).round(1),
+        "lap10": rng.uniform(0, 100, n).round(1),
+        "snap": np.clip(poverty * 0.8 + rng.normal(0, 5, n), 0, 80).round(1),
+        "obesity": np.clip(28 + 0.2 * poverty + rng.normal(0, 4, n), 10, 60).round(1),
+        "diabetes": np.clip(8 + 0.12 * poverty + rng.normal(0, 2, n), 2, 35).round(1),
+        "inactive": np.clip(20 + 0.3 * poverty + rng.normal(0, 4, n), 5, 60).round(1),
+    })
+
+# ---------------- messy formatting ----------------
+def _blank(cells, rng, share=MISSING):
+    cells = np.asarray(cells, dtype=object)
+    hit = rng.random(len(cells)) < share
+    cells[hit] = rng.choice(np.array(NA_CELLS, dtype=object), int(hit.sum()))
+    return cells
+
+def _pct(values, rng, with_sign=0.5):
+    # "41.3%" or "41.3"
+    signed = rng.random(len(values)) < with_sign
+    return np.array([f"{v}%" if s else f"{v}" for v, s in zip(values, signed)], dtype=object)
+
+def _count_pct(count, pct, rng, share_only=0.3):
+    # "1,014 (76.1%)" or, for some rows, just "76.1%"
+    only = rng.random(len(count)) < share_only
+    return np.array([f"{p}%" if o else f"{c:,} ({p}%)" for c, p, o in zip(count, pct, only)], dtype=object)
+
+def _latlon(lat, lon):
+    return np.array([f"{a:.5f}, {b:.5f}" for a, b in zip(lat, lon)], dtype=object)
+
+# ---------------- sheets ----------------
+def food_access(t, seed=0):
+    # USDA Food Access Research Atlas layout: numeric cells, integer tract ids
+    rng = np.random.default_rng(seed + 1)
+    n = len(t)
+    out = pd.DataFrame({c: rng.uniform(0, 100, n).round(2) for c in FOOD_ACCESS_COLUMNS})
+    out["CensusTract"] = t["fips"].astype("int64")
+    out["State"] = t["state"].to_numpy()
+    out["County"] = "X County"
+    out["Pop2010"] = t["pop"].to_numpy()
+    out["PovertyRate"] = t["poverty"].to_numpy()
+    out["MedianFamilyIncome"] = t["income"].to_numpy()
+    out["LAPOP1_10"] = (t["pop"] * t["lap1"] / 100).round(2).to_numpy()
+    out["lapop1share"] = t["lap1"].to_numpy()
+    out["LAPOP1_20"] = (t["pop"] * t["lap10"] / 100).round(2).to_numpy()
+    out["lapop20share"] = t["lap10"].to_numpy()
+    return out
+
+def census(t, seed=0):
+    # CDC PLACES tract layout: crude prevalence plus a "(lo, hi)" interval string per measure
+    rng = np.random.default_rng(seed + 2)
+    n = len(t)
+    out = pd.DataFrame({
+        "StateAbbr": t["state_abbr"].to_numpy(), "StateDesc": t["state"].to_numpy(),
+        "CountyName": "X", "CountyFIPS": t["county_fips"].to_numpy(),
+        "TractFIPS": t["fips"].to_numpy(), "TotalPopulation": t["pop"].to_numpy(),
+    })
+    known = {"OBESITY": t["obesity"], "DIABETES": t["diabetes"], "LPA": t["inactive"]}
+    for m in CENSUS_MEASURES:
+        v = np.asarray(known[m]) if m in known else rng.uniform(3, 50, n).round(1)
+        half = rng.uniform(0.5, 3.0, n).round(1)
+        out[f"{m}_CrudePrev"] = v
+        out[f"{m}_Crude95CI"] = [f"({a:.1f}, {b:.1f})" for a, b in zip(v - half, v + half)]
+    return out
+
+def okc_data(t, seed=0):
+    # the hand-assembled regression/Moran sheet
+    rng = np.random.default_rng(seed + 3)
+    n = len(t)
+    grocery = np.round(100 - t["lap1"].to_numpy(), 1)
+    return pd.DataFrame({
+        "Tract_FIPS": t["fips"].to_numpy(),
+        "% Below Poverty": t["poverty"].to_numpy(),
+        "Median Income": t["income"].astype(int).to_numpy(),
+        "Grocery within 1 mile": _count_pct((t["pop"] * grocery / 100).astype(int).to_numpy(), grocery, rng, 0.0),
+        "Adult Obesity %": t["obesity"].to_numpy(),
+        "Adult Diabetes %": t["diabetes"].to_numpy(),
+        "% of Adults Physically Inactive": t["inactive"].to_numpy(),
+        "Latitude": _latlon(t["lat"], t["lon"]),
+    })
+
+def data_sheet(t, seed=0):
+    # the map's input sheet: everything as formatted text, with gaps and non-tract rows
+    rng = np.random.default_rng(seed + 4)
+    n = len(t)
+    pop = t["pop"].to_numpy()
+    lap1_count = (pop * t["lap1"].to_numpy() / 100).astype(int)
+    lap10 = np.where(rng.random(n) < 0.5, np.array([f"{c:,}" for c in (pop * t["lap10"].to_numpy() / 100).astype(int)], dtype=object),
+                     t["lap10"].astype(str).to_numpy())
+    out = pd.DataFrame({
+        "Tract_FIPS": t["fips"].to_numpy(),
+        "Total Population": [f"{p:,}" for p in pop],
+        "% Below Poverty": _blank(_pct(t["poverty"].to_numpy(), rng, 0.9), rng),
+        "Median_Income": _blank([f"${int(v):,}" for v in t["income"]], rng),
+        "Population within one mile": _blank(_count_pct(lap1_count, t["lap1"].to_numpy(), rng), rng),
+        "Population within 10 miles": _blank(lap10, rng),
+        "SNAP %": _blank(_pct(t["snap"].to_numpy(), rng, 0.9), rng),
+        "Adult Obesity %": _blank(t["obesity"].astype(str).to_numpy(), rng),
+        "Adult Diabetes %": _blank(_pct(t["diabetes"].to_numpy(), rng, 0.3), rng),
+        "% of adults physically inactive": _blank(t["inactive"].astype(str).to_numpy(), rng),
+        "Latitude": _latlon(t["lat"], t["lon"]),
+        "Notes": "",
+    })
+    extra = rng.random(n) < NON_TRACT_ROWS
+    if extra.any():
+        junk = pd.DataFrame({c: "" for c in out.columns}, index=range(int(extra.sum())))
+        junk["Tract_FIPS"] = rng.choice(np.array(["Total", "Source: ACS 5-year", "County average"], dtype=object), len(junk))
+        out = pd.concat([out, junk], ignore_index=True).iloc[rng.permutation(n + len(junk))].reset_index(drop=True)
+    return out
+
+SHEETS = {"food_access": food_access, "census": census, "okc_data": okc_data, "data_sheet": data_sheet}
+
+def write_all(n, out_dir, seed=0):
+    # writes the four sheets under their real file names; returns {sheet: path}
+    os.makedirs(out_dir, exist_ok=True)
+    t = tracts(n, seed)
+    paths = {}
+    for name, build in SHEETS.items():
+        paths[name] = os.path.join(out_dir, FILES[name])
+        build(t, seed).to_csv(paths[name], index=False)
+    return paths
+
+if __name__ == "__main__":
+    if not sys.argv[1:]:
+        raise SystemExit("usage: python -m benchmarks.synthetic n_tracts [out_dir] [seed]")
+    n = int(sys.argv[1])
+    out_dir = sys.argv[2] if len(sys.argv) > 2 else f"synthetic_{n}"
+    for name, path in write_all(n, out_dir, int(sys.argv[3]) if len(sys.argv) > 3 else 0).items():
+        print(f"{name:<11} {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
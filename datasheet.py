@@ -0,0 +1,188 @@
+# datasheet.py — the hand-made tract sheet turned into the numeric work table
+# Column guessing, cleaning and centroid back-fill used by OKC_MAPPED.py and batch.py.
+# Messages go through `log` (print by default) so batch workers can keep quiet.
+import numpy as np
+import pandas as pd
+
+import instrument
+import parsing
+import scoring
+from geocode_cache import GeocodeCache
+
+# prefer explicit lat/lon names
+LAT_NAMES = ["latitude", "lat", "centroid_lat", "intptlat", "y"]
+LON_NAMES = ["longitude", "lon", "centroid_lon", "intptlon", "x", "lng"]
+
+# (key, substrings tried in order) for the indicator columns
+TOKENS = [
+    ("poverty", ["% below poverty", "poverty", "povertyrate", "poverty_rate"]),
+    ("income", ["median_income", "medianfamilyincome", "median_family_income", "medianincome"]),
+    ("lap1", ["one mile", "grocery_1mi", "within one mile", "population within one mile", "lapop1", "lapop1share"]),
+    ("lap10", ["10 miles", "grocery_10mi", "within 10 miles", "population within 10 miles", "lapop10", "lapop10share"]),
+    ("snap", ["snap", "lasnap", "snap_share", "snap%"]),
+    ("obesity", ["adult obesity", "obesity"]),
+    ("diabetes", ["adult diabetes", "diabetes"]),
+    ("inactive", ["physically inactive", "inactive", "phys_inactive"]),
+    ("notes", ["notes"]),
+]
+
+# ---------------- detect columns (explicit preferred) ----------------
+def find_col(cols, tokens):
+    cols_l = {c.lower(): c for c in cols}
+    for t in tokens:
+        t = t.lower()
+        for lc, orig in cols_l.items():
+            if t in lc:
+                return orig
+    return None
+
+def detect_columns(cols):
+    # {key: column name or None} for tract, lat, lon, total_pop and the TOKENS keys
+    cols = list(cols)
+    found = {"tract": "Tract_FIPS" if "Tract_FIPS" in cols else None,
+             "total_pop": next((c for c in cols if "total population" in c.lower()), None),
+             "lat": None, "lon": None}
+    for c in cols:
+        cl = c.strip().lower()
+        if cl in LAT_NAMES and found["lat"] is None:
+            found["lat"] = c
+        if cl in LON_NAMES and found["lon"] is None:
+            found["lon"] = c
+    if found["tract"] is None:
+        found["tract"] = find_col(cols, ["tract_fips", "tractfips", "censustract", "geoid", "tract"])
+    if found["lat"] is None:
+        found["lat"] = find_col(cols, LAT_NAMES)
+    if found["lon"] is None:
+        found["lon"] = find_col(cols, LON_NAMES)
+    for key, tokens in TOKENS:
+        found[key] = find_col(cols, tokens)
+    if found["tract"] is None:
+        # try any column that looks like a tract header
+        found["tract"] = next((c for c in cols if "tract" in c.lower() or "geoid" in c.lower()), None)
+    return found
+
+def describe_columns(found):
+    return "\n".join([
+        "Detected columns (best guesses):",
+        f" Tract: {found['tract']}",
+        f" Lat: {found['lat']}  Lon: {found['lon']}",
+        f" TotalPop: {found['total_pop']}",
+        f" Poverty: {found['poverty']}  Income: {found['income']}",
+        f" 1mi: {found['lap1']}  10mi: {found['lap10']}  SNAP: {found['snap']}",
+        f" Health: {found['obesity']} {found['diabetes']} {found['inactive']}",
+    ])
+
+# ---------------- clean and build records ----------------
+def build_work(df, found, log=print):
+    # one row per valid 11-digit tract with the numeric indicators; raises SystemExit
+    # like the original script when nothing usable is left
+    if found["tract"] is None:
+        raise SystemExit("No tract id column found. Check CSV.")
+    # every row with a tract column is a candidate; non-tract rows fall out below
+    tract_raw = df[found["tract"]].astype(str).str.strip()
+    log(f"Total rows read: {len(df)}, candidate tract rows found: {len(tract_raw)}")
+
+    # normalize leading/trailing whitespace and remove non-digits
+    tract_clean = tract_raw.str.replace(r"\D", "", regex=True)
+    # keep only 11-digit tract strings
+    valid_mask = tract_clean.str.match(r"^\d{11}$", na=False)
+    valid = df[valid_mask]
+    log(f"Valid tracts kept: {len(valid)}; dropped non-tract rows: {int((~valid_mask).sum())}")
+    instrument.count("rows_dropped", int((~valid_mask).sum()))
+
+    # now parse numeric columns, one column at a time
+    unreported = {}  # col -> parse failures of report=False columns, counted by the caller
+
+    def clean_col(col, report=True):
+        if not col:
+            return pd.Series(np.nan, index=valid.index)
+        values, failed = parsing.parse_number(valid[col])
+        if not report:
+            unreported[col] = failed
+            return pd.Series(values, index=valid.index)
+        instrument.count("values_unparsed", int(failed.sum()))
+        if failed.any():
+            log(f"  {col}: {int(failed.sum())} values could not be parsed")
+        return pd.Series(values, index=valid.index)
+
+    # lat/lon cells often hold a combined "lat, lon" pair, handled below
+    lat = clean_col(found["lat"], report=False)
+    lon = clean_col(found["lon"], report=False)
+    need = lat.isna() | lon.isna()
+    if need.any():
+        # try parsing combined "lat, lon" columns; the first column that parses wins
+        hit_any = pd.Series(False, index=valid.index)
+        for c in df.columns:
+            todo = need & ~hit_any
+            if not todo.any():
+                break
+            plat, plon = parsing.parse_latlon(valid.loc[todo, c])
+            hit = ~np.isnan(plat) & ~np.isnan(plon)
+            idx = todo[todo].index[hit]
+            keep_lat = lat.loc[idx].notna() & (lat.loc[idx] != 0)
+            keep_lon = lon.loc[idx].notna() & (lon.loc[idx] != 0)
+            lat.loc[idx] = lat.loc[idx].where(keep_lat, plat[hit])
+            lon.loc[idx] = lon.loc[idx].where(keep_lon, plon[hit])
+            hit_any.loc[idx] = True
+    # a coordinate cell is only unparsed if the combined-cell fallback did not locate it either
+    for col, coord in ((found["lat"], lat), (found["lon"], lon)):
+        if col in unreported:
+            instrument.count("values_unparsed", int((unreported[col] & coord.isna().to_numpy()).sum()))
+
+    total_pop = clean_col(found["total_pop"])
+    work = pd.DataFrame({
+        "Tract_FIPS": tract_clean[valid_mask],
+        "lat": lat,
+        "lon": lon,
+        "total_pop": total_pop,
+        "poverty": clean_col(found["poverty"]),
+        "income": clean_col(found["income"]),
+        # If the lap1/10 values look absurdly large (>100), treat them as counts and convert to percent using total_pop
+        "lap1_pct": scoring.lap_to_pct(clean_col(found["lap1"]), total_pop),
+        "lap10_pct": scoring.lap_to_pct(clean_col(found["lap10"]), total_pop),
+        "snap": clean_col(found["snap"]),
+        "obesity": clean_col(found["obesity"]),
+        "diabetes": clean_col(found["diabetes"]),
+        "inactive": clean_col(found["inactive"]),
+    }).reset_index(drop=True)
+    if work.empty:
+        raise SystemExit("No valid tract rows found after filtering. Check CSV.")
+    return work
+
+# ---------------- fetch missing centroids ----------------
+def fill_centroids(work, fetch=True, log=print):
+    # fills missing lat/lon in place from the geocode cache, then TIGERweb unless fetch=False
+    missing = work[work["lat"].isna() | work["lon"].isna()]
+    instrument.count("centroids_missing", len(missing))
+    if missing.empty:
+        return
+    log(f"\n{len(missing)} tracts missing centroids — checking the geocode cache{', then TIGERweb' if fetch else ''}...")
+    with GeocodeCache() as cache:
+        cached = cache.get_many(missing["Tract_FIPS"])
+        todo = [g for g in missing["Tract_FIPS"] if g not in cached]
+        instrument.count("centroids_cached", len(cached))
+        fetched = {}
+        if todo and fetch:
+            from tiger_client import TigerClient
+
+            # rate limiting and retries live in the client (see tiger_client.RATE)
+            with TigerClient() as client, instrument.span("tigerweb"):
+                fetched = client.fetch(todo)
+                log(f"  {client.report()}")
+                instrument.count("http_calls", client.http_calls)
+                instrument.count("http_retries", client.http_retries)
+                instrument.count("throttle_s", round(client.wait_seconds, 3))
+            instrument.count("centroids_fetched", sum(lat is not None for lat, _, _ in fetched.values()))
+        for idx, row in missing.iterrows():
+            geoid = row["Tract_FIPS"]
+            rec = cached.get(geoid)
+            lat, lon = (rec.lat, rec.lon) if rec is not None else fetched.get(geoid, (None, None, None))[:2]
+            if lat is not None and lon is not None:
+                work.at[idx, "lat"] = lat
+                work.at[idx, "lon"] = lon
+                log(f"  got centroid for {geoid}: {lat}, {lon}{' (cached)' if rec is not None else ''}")
+            else:
+                log(f"  could not fetch centroid for {geoid}")
+        cache.put_many((g, lat, lon, src) for g, (lat, lon, src) in fetched.items())
+        log("Centroid fetch attempts done.")
+        log(cache.report() + "\n")
@@ -0,0 +1,32 @@
+# geo.py — small spherical-geometry helpers shared by the spatial modules
+# KD-trees are built on unit-sphere xyz vectors: chord length is monotonic in
+# great-circle distance, so nearest-neighbour and radius queries stay exact.
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_MILE = 1.609344
+
+def unit_xyz(lat, lon):
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lon = np.radians(np.asarray(lon, dtype=float))
+    c = np.cos(lat)
+    return np.column_stack([c * np.cos(lon), c * np.sin(lon), np.sin(lat)])
+
+def chord_to_km(chord):
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.clip(np.asarray(chord, dtype=float) / 2.0, 0.0, 1.0))
+
+def km_to_chord(km):
+    return 2.0 * np.sin(np.minimum(np.asarray(km, dtype=float) / (2.0 * EARTH_RADIUS_KM), np.pi / 2))
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    # broadcasts like any NumPy ufunc, so (n, 1) against (1, m) gives an (n, m) matrix
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=float)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2.0) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2.0) ** 2
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def find_latlon_columns(columns):
+    # (lat, lon) column names by the usual spellings, or (None, None)
+    lower = {c.strip().lower(): c for c in columns}
+    lat = next((lower[k] for k in ("lat", "latitude", "y", "intptlat") if k in lower), None)
+    lon = next((lower[k] for k in ("lon", "lng", "longitude", "x", "intptlon") if k in lower), None)
+    return lat, lon
@@ -0,0 +1,140 @@
+# geocode_cache.py — persistent GEOID -> tract centroid cache (single SQLite file)
+# usage: python geocode_cache.py warm tract_centroids.csv [--vintage current]
+#        python geocode_cache.py stats
+import csv
+import os
+import sqlite3
+import sys
+import time
+from collections import namedtuple
+
+CACHE_PATH = os.path.join(".nourishnet_cache", "geocode.sqlite")
+DEFAULT_VINTAGE = "current"        # TIGERweb "current" services; use e.g. "2020" for fixed vintages
+DEFAULT_TTL = 180 * 24 * 3600      # centroids barely move between refreshes
+NEGATIVE_TTL = 7 * 24 * 3600       # GEOIDs no service knew about are retried after a week
+SQL_BATCH = 500                    # stay below SQLite's bound-parameter limit
+
+CentroidRecord = namedtuple("CentroidRecord", "geoid vintage lat lon source fetched_at")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS centroids (
+    geoid TEXT NOT NULL,
+    vintage TEXT NOT NULL,
+    lat REAL,
+    lon REAL,
+    source TEXT,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (geoid, vintage)
+)
+"""
+
+class GeocodeCache:
+    # Lookups return a CentroidRecord or None. A record with lat/lon of None is a
+    # remembered "not found" so re-runs skip the network for those too.
+    # WAL mode plus a busy timeout lets several pipeline runs share one file.
+
+    def __init__(self, path=CACHE_PATH, vintage=DEFAULT_VINTAGE, ttl=DEFAULT_TTL, negative_ttl=NEGATIVE_TTL):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.vintage = str(vintage)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(SCHEMA)
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.writes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    # ---------------- reads ----------------
+    def _fresh(self, rec, now):
+        ttl = self.ttl if rec.lat is not None else self.negative_ttl
+        return ttl is None or now - rec.fetched_at <= ttl
+
+    def get_many(self, geoids):
+        # {geoid: CentroidRecord} for every fresh entry; counts hits/misses per GEOID
+        geoids = [str(g) for g in dict.fromkeys(geoids)]
+        found = {}
+        now = time.time()
+        for i in range(0, len(geoids), SQL_BATCH):
+            chunk = geoids[i:i + SQL_BATCH]
+            marks = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT geoid, vintage, lat, lon, source, fetched_at FROM centroids "
+                f"WHERE vintage = ? AND geoid IN ({marks})",
+                [self.vintage] + chunk,
+            ).fetchall()
+            for row in rows:
+                rec = CentroidRecord(*row)
+                if self._fresh(rec, now):
+                    found[rec.geoid] = rec
+                else:
+                    self.expired += 1
+        self.hits += len(found)
+        self.misses += len(geoids) - len(found)
+        return found
+
+    def get(self, geoid):
+        return self.get_many([geoid]).get(str(geoid))
+
+    # ---------------- writes ----------------
+    def put_many(self, records):
+        # records: iterable of (geoid, lat, lon, source); lat/lon None caches a miss
+        now = time.time()
+        rows = [(str(g), self.vintage, lat, lon, src, now) for g, lat, lon, src in records]
+        if not rows:
+            return 0
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.executemany("INSERT OR REPLACE INTO centroids VALUES (?, ?, ?, ?, ?, ?)", rows)
+        self.writes += len(rows)
+        return len(rows)
+
+    def put(self, geoid, lat, lon, source):
+        self.put_many([(geoid, lat, lon, source)])
+
+    def warm_from_csv(self, csv_path, source=None):
+        # expects GEOID,latitude,longitude like tract_centroids.csv
+        source = source or f"csv:{os.path.basename(csv_path)}"
+        with open(csv_path, newline="") as f:
+            rows = [
+                (r["GEOID"].strip(), float(r["latitude"]), float(r["longitude"]), source)
+                for r in csv.DictReader(f)
+                if r.get("GEOID") and r.get("latitude") and r.get("longitude")
+            ]
+        return self.put_many(rows)
+
+    # ---------------- reporting ----------------
+    def size(self):
+        return self.conn.execute("SELECT COUNT(*) FROM centroids WHERE vintage = ?", [self.vintage]).fetchone()[0]
+
+    def report(self):
+        return (f"geocode cache ({self.path}, vintage {self.vintage}): "
+                f"{self.hits} hits, {self.misses} misses ({self.expired} expired), {self.writes} writes")
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    vintage = DEFAULT_VINTAGE
+    if "--vintage" in args:
+        i = args.index("--vintage")
+        vintage = args[i + 1]
+        del args[i:i + 2]
+    if not args or args[0] not in ("warm", "stats"):
+        raise SystemExit("usage: python geocode_cache.py warm <centroids.csv> [--vintage V] | stats")
+    with GeocodeCache(vintage=vintage) as cache:
+        if args[0] == "warm":
+            n = cache.warm_from_csv(args[1] if len(args) > 1 else "tract_centroids.csv")
+            print(f"Imported {n} centroids into {cache.path}")
+        print(f"{cache.size()} centroids cached for vintage {cache.vintage}")
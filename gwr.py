@@ -0,0 +1,152 @@
+# gwr.py — geographically weighted regression with batched local fits
+# Same specification as Regression.py (low_access ~ poverty + health + income), but
+# every tract gets its own weighted least-squares fit over its kernel neighbourhood:
+#   - adaptive bisquare kernel: a tract's bandwidth is the distance to its bw-th
+#     nearest tract (itself included), as in mgwr
+#   - neighbourhoods come from one KD-tree query for the largest bandwidth searched;
+#     every candidate bandwidth slices that cached table
+#   - local fits run as batched (rows, bw, p) einsums + np.linalg.solve
+#   - the bandwidth minimizes AICc with mgwr's golden-section search
+import math
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from geo import chord_to_km, unit_xyz
+
+MAX_BANDWIDTH = 1000     # largest neighbourhood the bandwidth search considers
+BLOCK_CELLS = 1 << 22    # rows x neighbours x terms held per batch
+GOLDEN = 0.38197
+TOL = 1e-5
+MAX_ITER = 200
+
+GWRFit = namedtuple("GWRFit", "bandwidth params se predy resid local_r2 tr_S rss aicc r2")
+
+class GWR:
+    def __init__(self, lat, lon, X, y, max_bandwidth=MAX_BANDWIDTH):
+        X = np.asarray(X, dtype=float)
+        self.X = X[:, None] if X.ndim == 1 else X
+        self.y = np.asarray(y, dtype=float)
+        self.n, self.p = self.X.shape
+        # standardized columns keep the local normal equations well conditioned;
+        # coefficients are mapped back to the original units afterwards
+        self.mx, self.sx = self.X.mean(axis=0), self.X.std(axis=0)
+        self.sx[self.sx == 0] = 1.0
+        self.D = np.column_stack([np.ones(self.n), (self.X - self.mx) / self.sx])
+        kmax = min(self.n, max_bandwidth)
+        xyz = unit_xyz(lat, lon)
+        chord, idx = cKDTree(xyz).query(xyz, kmax)
+        self.nbr = np.asarray(idx).reshape(self.n, kmax)
+        self.dist = chord_to_km(chord).reshape(self.n, kmax)
+        self.scores = {}
+
+    # ---------------- local fits ----------------
+    def _batches(self, bw):
+        rows = max(1, BLOCK_CELLS // (bw * (self.p + 1)))
+        for r0 in range(0, self.n, rows):
+            yield r0, min(self.n, r0 + rows)
+
+    def _weights(self, r0, r1, bw):
+        d = self.dist[r0:r1, :bw]
+        h = d[:, -1:] * 1.0000001
+        return (1.0 - (d / h) ** 2) ** 2
+
+    def fit(self, bw, full=True):
+        # local estimates for an adaptive bandwidth of bw neighbours
+        bw = int(bw)
+        if not self.p + 1 < bw <= self.nbr.shape[1]:
+            raise ValueError(f"bandwidth {bw} outside ({self.p + 1}, {self.nbr.shape[1]}]")
+        n, q = self.n, self.p + 1
+        beta = np.empty((n, q))
+        hat = np.empty(n)
+        cov = np.empty((n, q, q)) if full else None
+        local_r2 = np.empty(n) if full else None
+        for r0, r1 in self._batches(bw):
+            nb = self.nbr[r0:r1, :bw]
+            w = self._weights(r0, r1, bw)
+            Xn, yn = self.D[nb], self.y[nb]                       # (rows, bw, q), (rows, bw)
+            XtW = Xn * w[:, :, None]
+            A = np.einsum("rki,rkj->rij", XtW, Xn)
+            b = np.linalg.solve(A, np.einsum("rki,rk->ri", XtW, yn)[:, :, None])[:, :, 0]
+            xi = self.D[r0:r1]
+            Ainv_x = np.linalg.solve(A, xi[:, :, None])[:, :, 0]
+            beta[r0:r1] = b
+            hat[r0:r1] = (xi * Ainv_x).sum(axis=1)                 # self weight is 1
+            if full:
+                Ainv = np.linalg.inv(A)
+                B = np.einsum("rki,rkj->rij", XtW * w[:, :, None], Xn)
+                cov[r0:r1] = Ainv @ B @ Ainv
+                ybar = (w * yn).sum(axis=1) / w.sum(axis=1)
+                local_r2[r0:r1] = (w * (yn - ybar[:, None]) ** 2).sum(axis=1)   # weighted TSS for now
+        predy = (self.D * beta).sum(axis=1)
+        resid = self.y - predy
+        if full:
+            # mgwr's local R²: weighted TSS against the weighted squares of every tract's own residual
+            for r0, r1 in self._batches(bw):
+                wrss = (self._weights(r0, r1, bw) * resid[self.nbr[r0:r1, :bw]] ** 2).sum(axis=1)
+                local_r2[r0:r1] = (local_r2[r0:r1] - wrss) / local_r2[r0:r1]
+        rss = float(resid @ resid)
+        tr_S = float(hat.sum())
+        aicc = n * math.log(2.0 * math.pi * rss / n) + n + 2.0 * n * (tr_S + 1.0) / (n - tr_S - 2.0)
+        self.scores[bw] = aicc
+        if not full:
+            return aicc
+        sigma2 = rss / (n - tr_S)
+        # back to original units: params = T beta, Cov(params) = T Cov(beta) T'
+        T = np.zeros((q, q))
+        T[0, 0] = 1.0
+        T[0, 1:] = -self.mx / self.sx
+        T[1:, 1:] = np.diag(1.0 / self.sx)
+        params = beta @ T.T
+        se = np.sqrt(np.einsum("ij,rjk,ik->ri", T, cov, T) * sigma2)
+        r2 = 1.0 - rss / float(((self.y - self.y.mean()) ** 2).sum())
+        return GWRFit(bw, params, se, predy, resid, local_r2, tr_S, rss, aicc, r2)
+
+    def aicc(self, bw):
+        bw = int(bw)
+        if bw not in self.scores:
+            self.fit(bw, full=False)
+        return self.scores[bw]
+
+    # ---------------- bandwidth ----------------
+    def search(self, lower=None, upper=None):
+        # golden-section search over integer bandwidths, as mgwr's Sel_BW does for adaptive kernels
+        a = float(lower if lower is not None else min(40 + 2 * (self.p + 1), self.nbr.shape[1] - 1))
+        c = float(upper if upper is not None else self.nbr.shape[1])
+        a = max(a, self.p + 2)
+        b = a + GOLDEN * abs(c - a)
+        d = c - GOLDEN * abs(c - a)
+        opt_val, diff, iters = a, 1.0e9, 0
+        while abs(diff) > TOL and iters < MAX_ITER:
+            iters += 1
+            b, d = round(b), round(d)
+            score_b, score_d = self.aicc(b), self.aicc(d)
+            if score_b <= score_d:
+                opt_val = b
+                c, d = d, b
+                b = a + GOLDEN * abs(c - a)
+            else:
+                opt_val = d
+                a, b = b, d
+                d = c - GOLDEN * abs(c - a)
+            diff = score_b - score_d
+        return int(opt_val)
+
+def coefficient_frame(fit, names, ids=None, lat=None, lon=None):
+    # one row per tract: local coefficients, standard errors, t-values and local R²
+    terms = ["intercept"] + list(names)
+    out = pd.DataFrame(index=range(len(fit.params)))
+    if ids is not None:
+        out["Tract_FIPS"] = np.asarray(ids)
+    if lat is not None:
+        out["lat"], out["lon"] = np.asarray(lat, dtype=float), np.asarray(lon, dtype=float)
+    for j, t in enumerate(terms):
+        out[t] = fit.params[:, j]
+    for j, t in enumerate(terms):
+        out[f"se_{t}"] = fit.se[:, j]
+        out[f"t_{t}"] = fit.params[:, j] / fit.se[:, j]
+    out["local_r2"] = fit.local_r2
+    out["bandwidth"] = fit.bandwidth
+    return out
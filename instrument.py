@@ -0,0 +1,185 @@
+# instrument.py — opt-in stage spans, counters and per-stage profiles for script runs
+# Turned on from the environment, off (and close to free) otherwise:
+#   NOURISHNET_TRACE=run.json          structured JSON: spans + counters
+#   NOURISHNET_TRACE=run.trace.json    Chrome trace (chrome://tracing, Perfetto)
+#   NOURISHNET_PROFILE=scoring,save    cProfile those stages ("all" for every stage);
+#                                      <trace>.<stage>.prof next to the trace file
+# Scripts mark their top-level sections with stage(name), which closes the previous
+# stage; span(name) is the nested/with-block form. Every span records wall time,
+# CPU time and the process RSS high-water mark; count() adds to the innermost open
+# span and to the run totals. The trace is written at exit.
+import atexit
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage, RSS is left out
+    resource = None
+
+ENV_TRACE = "NOURISHNET_TRACE"
+ENV_PROFILE = "NOURISHNET_PROFILE"
+
+class _Null:
+    # stand-in for span() when tracing is off
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL = _Null()
+
+def _rss_peak_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KiB elsewhere
+
+class _Span:
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+        self.counters = {}
+        self.profile = None
+
+    def __enter__(self):
+        t = self.tracer
+        self.depth = len(t.stack)
+        t.stack.append(self)
+        if t.profile_all or self.name in t.profile_names:
+            if not any(s.profile for s in t.stack[:-1]):  # cProfile does not nest
+                self.profile = cProfile.Profile()
+        self.rss0 = _rss_peak_mb()
+        self.cpu0 = time.process_time()
+        self.t0 = time.perf_counter()
+        if self.profile:
+            self.profile.enable()
+        return self
+
+    def __exit__(self, *exc):
+        if self.profile:
+            self.profile.disable()
+        t1 = time.perf_counter()
+        cpu = time.process_time() - self.cpu0
+        rss = _rss_peak_mb()
+        t = self.tracer
+        if self in t.stack:
+            t.stack.remove(self)
+        rec = {"name": self.name, "depth": self.depth, "start_s": round(self.t0 - t.t0, 6),
+               "wall_s": round(t1 - self.t0, 6), "cpu_s": round(cpu, 6),
+               "rss_peak_mb": None if rss is None else round(rss, 1),
+               "rss_growth_mb": None if rss is None else round(rss - self.rss0, 1),
+               "counters": self.counters}
+        if self.profile:
+            rec["profile"] = t.profile_path(self.name)
+            self.profile.dump_stats(rec["profile"])
+        t.spans.append(rec)
+        return False
+
+class Tracer:
+    def __init__(self, path, profile=()):
+        self.path = path
+        self.profile_all = "all" in profile
+        self.profile_names = set(profile)
+        self.t0 = time.perf_counter()
+        self.started = time.time()
+        self.stack = []
+        self.spans = []
+        self.totals = {}
+        self.current = None
+        self.lock = threading.Lock()
+
+    def span(self, name):
+        return _Span(self, name)
+
+    def stage(self, name):
+        current, self.current = self.current, None
+        if current is not None:
+            current.__exit__(None, None, None)
+        if name is not None:
+            self.current = self.span(name).__enter__()
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.totals[name] = self.totals.get(name, 0) + n
+            if self.stack:
+                c = self.stack[-1].counters
+                c[name] = c.get(name, 0) + n
+
+    def profile_path(self, name):
+        base = self.path[:-len(".json")] if self.path.endswith(".json") else self.path
+        return f"{base}.{name.replace(' ', '_')}.prof"
+
+    # ---------------- output ----------------
+    def record(self):
+        return {"script": os.path.basename(sys.argv[0]), "started": self.started,
+                "wall_s": round(time.perf_counter() - self.t0, 6), "rss_peak_mb": _rss_peak_mb(),
+                "counters": self.totals, "spans": sorted(self.spans, key=lambda s: s["start_s"])}
+
+    def chrome_events(self):
+        pid = os.getpid()
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0,
+                   "args": {"name": os.path.basename(sys.argv[0]) or "python"}}]
+        for s in sorted(self.spans, key=lambda s: s["start_s"]):
+            args = {"cpu_ms": round(s["cpu_s"] * 1e3, 3), "rss_peak_mb": s["rss_peak_mb"], **s["counters"]}
+            events.append({"name": s["name"], "ph": "X", "pid": pid, "tid": 0,
+                           "ts": s["start_s"] * 1e6, "dur": s["wall_s"] * 1e6, "args": args})
+            if s["counters"]:
+                events.append({"name": "counters", "ph": "C", "pid": pid, "tid": 0,
+                               "ts": (s["start_s"] + s["wall_s"]) * 1e6, "args": s["counters"]})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, path=None):
+        self.stage(None)
+        while self.stack:  # spans left open by an exception or an early exit
+            self.stack[-1].__exit__(None, None, None)
+        path = path or self.path
+        data = self.chrome_events() if path.endswith(".trace.json") else self.record()
+        with open(path, "w") as f:
+            json.dump(data, f, indent=1)
+        return path
+
+    def summary(self):
+        lines = [f"{'stage':<24} {'wall s':>8} {'cpu s':>8} {'rss MB':>8}  counters"]
+        for s in sorted(self.spans, key=lambda s: s["start_s"]):
+            rss = "-" if s["rss_peak_mb"] is None else f"{s['rss_peak_mb']:.0f}"
+            extra = ", ".join(f"{k}={v:g}" for k, v in s["counters"].items())
+            lines.append(f"{'  ' * s['depth'] + s['name']:<24} {s['wall_s']:>8.3f} {s['cpu_s']:>8.3f} {rss:>8}  {extra}")
+        return "\n".join(lines)
+
+# ---------------- module-level switch ----------------
+_TRACER = None
+
+def enable(path, profile=()):
+    # start tracing this process; the trace is written to path at exit
+    global _TRACER
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    _TRACER = Tracer(path, tuple(p.strip() for p in profile if p.strip()))
+    atexit.register(_finish, _TRACER)
+    return _TRACER
+
+def _finish(tracer):
+    path = tracer.write()
+    print(f"\n{tracer.summary()}\nTrace written to {path}", file=sys.stderr)
+
+def enabled():
+    return _TRACER is not None
+
+def span(name):
+    return _NULL if _TRACER is None else _TRACER.span(name)
+
+def stage(name):
+    if _TRACER is not None:
+        _TRACER.stage(name)
+
+def count(name, n=1):
+    if _TRACER is not None:
+        _TRACER.count(name, n)
+
+if os.environ.get(ENV_TRACE):
+    enable(os.environ[ENV_TRACE], os.environ.get(ENV_PROFILE, "").split(","))
@@ -1,5 +1,7 @@
-import requests
 import csv
+import sys
+
+from geocode_cache import GeocodeCache
 
 geoids = [
  "40109108005","40109107900","40109101500","40109107806","40109107703",
@@ -8,60 +10,50 @@ geoids = [
  "40109100400","40109100800"
 ]
 
-# Base URL for Census TIGERweb (tracts layer)
+# Base URL for Census TIGERweb (tracts layer); the OKC_MAPPED layers are the fallbacks
 base = "https://tigerweb.geo.census.gov/arcgis/rest/services/TIGERweb/Tracts_Blocks/MapServer/10/query"
 
-def polygon_centroid(coords):
-    if isinstance(coords[0][0], float):
-        ring = coords
-    else:
-        ring = coords[0]
-    xs = [p[0] for p in ring]
-    ys = [p[1] for p in ring]
-    return sum(ys) / len(ys), sum(xs) / len(xs)
-
-results = []
-
-# Query each GEOID separately to avoid syntax issues
-for geoid in geoids:
-    params = {
-        "where": f"GEOID='{geoid}'",
-        "outFields": "GEOID",
-        "returnGeometry": "true",
-        "f": "json",
-        "outSR": "4326"  # get lon/lat
-    }
-
-    resp = requests.get(base, params=params)
-    resp.raise_for_status()
-    data = resp.json()
+out_csv = "tract_centroids.csv"
 
-    features = data.get("features", [])
-    if not features:
-        print(f"No data for {geoid}")
-        continue
+def fetch_centroids(geoids=geoids, out_csv=out_csv):
+    # [(geoid, lat, lon)] for every tract found, cache first, also written to out_csv
+    cache = GeocodeCache()
+    cached = cache.get_many(geoids)
+
+    # Query everything the cache doesn't know in GEOID IN (...) batches
+    todo = [g for g in geoids if g not in cached]
+    fetched = {}
+    if todo:
+        # requests is only imported when something actually has to be fetched
+        from tiger_client import SERVICES, TigerClient
+
+        with TigerClient(services=[base] + SERVICES) as client:
+            fetched = client.fetch(todo)
+            print(client.report())
+
+    results = []
+    for geoid in geoids:
+        rec = cached.get(geoid)
+        lat, lon = (rec.lat, rec.lon) if rec is not None else fetched.get(geoid, (None, None, None))[:2]
+        if lat is None or lon is None:
+            print(f"No data for {geoid}")
+            continue
+        results.append((geoid, lat, lon))
 
-    feat = features[0]
-    geom = feat.get("geometry")
-    if not geom:
-        print(f"No geometry for {geoid}")
-        continue
+    # Write CSV and print
+    with open(out_csv, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["GEOID", "latitude", "longitude"])
+        writer.writerows(results)
 
-    if "rings" in geom:
-        lat, lon = polygon_centroid(geom["rings"])
-        results.append((geoid, lat, lon))
-    elif "x" in geom and "y" in geom:
-        results.append((geoid, geom["y"], geom["x"]))
-    else:
-        print(f"Unexpected geometry for {geoid}: {geom}")
+    print(f"Wrote {len(results)} rows to {out_csv}")
+    for r in results:
+        print(r)
 
-# Write CSV and print
-out_csv = "tract_centroids.csv"
-with open(out_csv, "w", newline="") as f:
-    writer = csv.writer(f)
-    writer.writerow(["GEOID", "latitude", "longitude"])
-    writer.writerows(results)
+    cache.put_many((g, lat, lon, src) for g, (lat, lon, src) in fetched.items())
+    print(cache.report())
+    cache.close()
+    return results
 
-print(f"Wrote {len(results)} rows to {out_csv}")
-for r in results:
-    print(r)
+if __name__ == "__main__":
+    fetch_centroids(sys.argv[1:] or geoids)
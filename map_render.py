@@ -0,0 +1,346 @@
+# map_render.py — folium map of the scored tracts
+# Two modes:
+#   "markers" — one folium.Marker with an inline popup per tract (the original map)
+#   "geojson" — every tract in one compact FeatureCollection; popups, badge colors
+#               and clustering are produced in the browser from a single template
+# "auto" picks markers for small runs and geojson past GEOJSON_THRESHOLD tracts.
+import json
+import math
+
+import folium
+import numpy as np
+import pandas as pd
+from branca.element import Element, MacroElement
+from folium.elements import JSCSSMixin
+from folium.map import Layer
+from folium.plugins import MarkerCluster
+from jinja2 import Template
+
+from scoring import risk_badge
+
+MAP_CENTER = [35.48, -97.50]
+GEOJSON_THRESHOLD = 200
+CLUSTER_OFF_ZOOM = 13  # markers stop clustering from this zoom level in
+
+# (key, column, decimals) of the per-tract properties shipped to the browser
+PROPERTIES = [
+    ("s", "composite_score", 3),
+    ("p", "poverty", 1),
+    ("n", "snap", 1),
+    ("l1", "lap1_pct", 1),
+    ("l10", "lap10_pct", 1),
+    ("i", "income", 0),
+    ("o", "obesity", 1),
+    ("d", "diabetes", 1),
+    ("a", "inactive", 1),
+]
+
+LEGEND_HTML = """
+<div style="position: fixed; bottom: 12px; left: 10px; width: 300px; height: 140px;
+     border:2px solid grey; z-index:9999; font-size:13px; background:white; padding:8px;">
+<b>Legend — Food insecurity composite (CDC-style)</b><br>
+🔥 HIGH: severe need (top tier)<br>
+⚠️ MEDIUM: moderate need<br>
+✅ LOW: lower priority<br>
+Icons: fire = top 3 tracts, exclamation = top 4–7<br>
+</div>
+"""
+
+# ---------------- markers mode ----------------
+def add_markers(m, work_sorted):
+    for _, r in work_sorted.iterrows():
+        lat = r["lat"]; lon = r["lon"]
+        if lat is None or lon is None or pd.isna(lat) or pd.isna(lon):
+            continue
+        tract = r["Tract_FIPS"]
+        score = r["composite_score"]
+        rank = int(r["rank"]) if not pd.isna(r["rank"]) else "N/A"
+        color, badge_text, _level = risk_badge(score)
+
+        poverty_disp = f"{r['poverty']:.1f}%" if (r['poverty'] is not None and not pd.isna(r['poverty'])) else "N/A"
+        snap_disp = f"{r['snap']:.1f}%" if (r['snap'] is not None and not pd.isna(r['snap'])) else "N/A"
+        lap1_disp = f"{r['lap1_pct']:.1f}%" if (r['lap1_pct'] is not None and not pd.isna(r['lap1_pct'])) else "N/A"
+        lap10_disp = f"{r['lap10_pct']:.1f}%" if (r['lap10_pct'] is not None and not pd.isna(r['lap10_pct'])) else "N/A"
+        income_disp = f"${int(r['income']):,}" if (r['income'] is not None and not pd.isna(r['income'])) else "N/A"
+        ob_disp = f"{r['obesity']:.1f}%" if (r['obesity'] is not None and not pd.isna(r['obesity'])) else "N/A"
+        diab_disp = f"{r['diabetes']:.1f}%" if (r['diabetes'] is not None and not pd.isna(r['diabetes'])) else "N/A"
+        inact_disp = f"{r['inactive']:.1f}%" if (r['inactive'] is not None and not pd.isna(r['inactive'])) else "N/A"
+        score_disp = f"{round(score,3)}" if score is not None and not (isinstance(score, float) and math.isnan(score)) else "N/A"
+
+        popup_html = (
+            f"<div style='max-width:320px;font-family:Arial,Helvetica,sans-serif;'>"
+            f"<b>{badge_text} FOOD INSECURITY</b> &nbsp; <i>Rank #{rank}</i><br>"
+            f"<b>Tract:</b> {tract}<br>"
+            f"<b>Composite score:</b> {score_disp}<br><br>"
+            f"<b>Poverty rate:</b> {poverty_disp}<br>"
+            f"<b>SNAP (share):</b> {snap_disp}<br>"
+            f"<b>% within 1 mile:</b> {lap1_disp} &nbsp; | &nbsp; <b>% within 10 miles:</b> {lap10_disp}<br>"
+            f"<b>Median income:</b> {income_disp}<br><br>"
+            f"<b>Health:</b> Obesity {ob_disp} &nbsp; Diabetes {diab_disp} &nbsp; Inactive {inact_disp}"
+            f"</div>"
+        )
+
+        icon_name = "fire" if (isinstance(rank, int) and rank <= 3) else ("exclamation-triangle" if (isinstance(rank, int) and rank <= 7) else "info-circle")
+        icon_color = "darkred" if color == "darkred" else ("orange" if color == "orange" else "green")
+
+        folium.Marker(
+            location=[float(lat), float(lon)],
+            popup=folium.Popup(popup_html, max_width=360),
+            tooltip=f"Rank {rank} — Tract {tract}",
+            icon=folium.Icon(icon=icon_name, prefix="fa", color=icon_color)
+        ).add_to(m)
+
+# ---------------- geojson mode ----------------
+def _located(work_sorted):
+    # rows with both coordinates, for a work DataFrame or a tract_table.TractTable
+    lat = np.asarray(work_sorted["lat"], dtype=float)
+    lon = np.asarray(work_sorted["lon"], dtype=float)
+    ok = ~np.isnan(lat) & ~np.isnan(lon)
+    return np.flatnonzero(ok), lat[ok], lon[ok]
+
+def feature_collection(work_sorted):
+    # compact FeatureCollection: 5-decimal coordinates, short property keys, no nulls
+    rows, lat, lon = _located(work_sorted)
+    lat = np.round(lat, 5).tolist()
+    lon = np.round(lon, 5).tolist()
+    rank = np.asarray(work_sorted["rank"], dtype=float)[rows]
+    cols = []
+    for key, col, nd in PROPERTIES:
+        v = (pd.to_numeric(np.asarray(work_sorted[col])[rows], errors="coerce").astype(float)
+             if col in work_sorted else np.full(len(rows), np.nan))
+        v = np.trunc(v) if nd == 0 else np.round(v, nd)  # income is shown truncated, like int()
+        cols.append((key, [None if math.isnan(x) else (int(x) if nd == 0 else x) for x in v.tolist()]))
+    features = []
+    for j, tract in enumerate(np.asarray(work_sorted["Tract_FIPS"]).astype(str)[rows].tolist()):
+        props = {"t": tract}
+        if not math.isnan(rank[j]):
+            props["r"] = int(rank[j])
+        for key, vals in cols:
+            if vals[j] is not None:
+                props[key] = vals[j]
+        features.append({"type": "Feature", "geometry": {"type": "Point", "coordinates": [lon[j], lat[j]]}, "properties": props})
+    return {"type": "FeatureCollection", "features": features}
+
+class TractLayer(JSCSSMixin, MacroElement):
+    # all tracts as one GeoJSON layer inside a marker cluster; popup HTML is built on click
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        (function() {
+            var data = {{ this.data }};
+            function badge(s) {
+                if (s === undefined) return ["gray", "⚪️ Unknown"];
+                if (s >= 0.66) return ["darkred", "🔥 HIGH"];
+                if (s >= 0.33) return ["orange", "⚠️ MEDIUM"];
+                return ["green", "✅ LOW"];
+            }
+            function pct(v) { return v === undefined ? "N/A" : v.toFixed(1) + "%"; }
+            function money(v) { return v === undefined ? "N/A" : "$" + v.toLocaleString("en-US"); }
+            function popup(p) {
+                return "<div style='max-width:320px;font-family:Arial,Helvetica,sans-serif;'>"
+                    + "<b>" + badge(p.s)[1] + " FOOD INSECURITY</b> &nbsp; <i>Rank #" + (p.r === undefined ? "N/A" : p.r) + "</i><br>"
+                    + "<b>Tract:</b> " + p.t + "<br>"
+                    + "<b>Composite score:</b> " + (p.s === undefined ? "N/A" : p.s) + "<br><br>"
+                    + "<b>Poverty rate:</b> " + pct(p.p) + "<br>"
+                    + "<b>SNAP (share):</b> " + pct(p.n) + "<br>"
+                    + "<b>% within 1 mile:</b> " + pct(p.l1) + " &nbsp; | &nbsp; <b>% within 10 miles:</b> " + pct(p.l10) + "<br>"
+                    + "<b>Median income:</b> " + money(p.i) + "<br><br>"
+                    + "<b>Health:</b> Obesity " + pct(p.o) + " &nbsp; Diabetes " + pct(p.d) + " &nbsp; Inactive " + pct(p.a)
+                    + "</div>";
+            }
+            var cluster = L.markerClusterGroup({
+                disableClusteringAtZoom: {{ this.cluster_off_zoom }},
+                chunkedLoading: true
+            });
+            L.geoJSON(data, {
+                pointToLayer: function(f, latlng) {
+                    var p = f.properties, top = p.r !== undefined && p.r <= 7;
+                    return L.circleMarker(latlng, {
+                        radius: p.r !== undefined && p.r <= 3 ? 10 : (top ? 8 : 6),
+                        color: badge(p.s)[0], fillColor: badge(p.s)[0],
+                        fillOpacity: 0.75, weight: top ? 3 : 1
+                    });
+                },
+                onEachFeature: function(f, layer) {
+                    var p = f.properties;
+                    layer.bindTooltip("Rank " + (p.r === undefined ? "N/A" : p.r) + " — Tract " + p.t);
+                    layer.bindPopup(function() { return popup(p); }, {maxWidth: 360});
+                }
+            }).addTo(cluster);
+            cluster.addTo({{ this._parent.get_name() }});
+        })();
+        {% endmacro %}
+    """)
+
+    default_js = MarkerCluster.default_js
+    default_css = MarkerCluster.default_css
+
+    def __init__(self, collection, cluster_off_zoom=CLUSTER_OFF_ZOOM):
+        super().__init__()
+        self._name = "TractLayer"
+        self.data = json.dumps(collection, separators=(",", ":"), ensure_ascii=False)
+        self.cluster_off_zoom = cluster_off_zoom
+
+def add_geojson_layer(m, work_sorted, cluster_off_zoom=CLUSTER_OFF_ZOOM):
+    TractLayer(feature_collection(work_sorted), cluster_off_zoom).add_to(m)
+
+# ---------------- proposed pantry sites ----------------
+def add_sites_layer(m, sites, name="Proposed pantry sites"):
+    # one star marker per chosen site (see site_selection.select_sites), in its own toggleable layer
+    group = folium.FeatureGroup(name=name)
+    for _, r in sites.iterrows():
+        served = f"{int(r['tracts_served'])} tracts" if "tracts_served" in r else ""
+        dist = f", mean {r['mean_km']:.1f} km" if "mean_km" in r and not pd.isna(r["mean_km"]) else ""
+        folium.Marker(
+            location=[float(r["lat"]), float(r["lon"])],
+            popup=folium.Popup(f"<b>Proposed pantry #{int(r['pick_order'])}</b><br>{r['name']}<br>{served}{dist}", max_width=300),
+            tooltip=f"Proposed pantry: {r['name']}",
+            icon=folium.Icon(icon="star", prefix="fa", color="blue"),
+        ).add_to(group)
+    group.add_to(m)
+    return group
+
+# ---------------- delivery routes ----------------
+ROUTE_COLORS = ["#1f77b4", "#d62728", "#2ca02c", "#9467bd", "#ff7f0e", "#8c564b", "#e377c2", "#17becf"]
+
+def add_routes_layer(m, stop_list, depot, name="Delivery routes"):
+    # one polyline per route (see routing.plan_routes), depot first and last;
+    # nothing is drawn when no stop could be located
+    if stop_list.empty:
+        return None
+    group = folium.FeatureGroup(name=name)
+    folium.Marker(location=[float(depot[0]), float(depot[1])], tooltip="Depot",
+                  icon=folium.Icon(icon="truck", prefix="fa", color="black")).add_to(group)
+    for n, (route, stops) in enumerate(stop_list.groupby("route", sort=True)):
+        stops = stops.sort_values("seq")
+        coords = [[float(depot[0]), float(depot[1])]] + stops[["lat", "lon"]].astype(float).values.tolist()
+        km = float(stops["cum_km"].iloc[-1])
+        folium.PolyLine(coords, color=ROUTE_COLORS[n % len(ROUTE_COLORS)], weight=3, opacity=0.8,
+                        tooltip=f"Route {route}: {len(stops) - 1} stops, {km:.1f} km").add_to(group)
+    group.add_to(m)
+    return group
+
+# ---------------- GWR local coefficients ----------------
+DIVERGING = ((33, 102, 172), (247, 247, 247), (178, 24, 43))  # negative, zero, positive
+
+def diverging_colors(values, scale=None):
+    # hex colors on a blue-white-red ramp; scale defaults to the 95th percentile of |value|
+    v = np.asarray(values, dtype=float)
+    if scale is None:
+        finite = np.abs(v[np.isfinite(v)])
+        scale = float(np.percentile(finite, 95)) if len(finite) else 1.0
+    t = np.clip(np.nan_to_num(v / (scale or 1.0)), -1.0, 1.0)
+    lo, mid, hi = (np.array(c, dtype=float) for c in DIVERGING)
+    end = np.where(t[:, None] < 0, lo, hi)
+    rgb = np.rint(mid + (end - mid) * np.abs(t)[:, None]).astype(int)
+    return ["#%02x%02x%02x" % tuple(c) for c in rgb]
+
+class CoefficientLayer(Layer):
+    # one local-coefficient surface as circle markers; tracts with |t| < 1.96 are faded
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        var {{ this.get_name() }} = L.geoJSON({{ this.data }}, {
+            pointToLayer: function(f, latlng) {
+                var p = f.properties;
+                return L.circleMarker(latlng, {
+                    radius: 7, weight: 1, color: "#555", fillColor: p.c,
+                    fillOpacity: p.s ? 0.9 : 0.3
+                });
+            },
+            onEachFeature: function(f, layer) {
+                var p = f.properties;
+                layer.bindTooltip("Tract " + p.t + ": {{ this.term }} = " + p.v
+                    + (p.z === undefined ? "" : " (t = " + p.z + ")"));
+            }
+        });
+        {% endmacro %}
+    """)
+
+    def __init__(self, coefs, term, name=None, show=False):
+        super().__init__(name=name or f"GWR: {term}", overlay=True, control=True, show=show)
+        self._name = "CoefficientLayer"
+        self.term = term
+        ok = coefs["lat"].notna() & coefs["lon"].notna() & coefs[term].notna()
+        c = coefs[ok]
+        colors = diverging_colors(c[term])
+        tvals = c[f"t_{term}"].to_numpy(dtype=float) if f"t_{term}" in c else np.full(len(c), np.nan)
+        features = []
+        for j, (tract, lat, lon, v) in enumerate(zip(c["Tract_FIPS"].astype(str), c["lat"], c["lon"], c[term])):
+            props = {"t": tract, "v": float(f"{v:.4g}"), "c": colors[j], "s": int(not math.isnan(tvals[j]) and abs(tvals[j]) >= 1.96)}
+            if not math.isnan(tvals[j]):
+                props["z"] = round(float(tvals[j]), 2)
+            features.append({"type": "Feature", "geometry": {"type": "Point", "coordinates": [round(float(lon), 5), round(float(lat), 5)]},
+                             "properties": props})
+        self.data = json.dumps({"type": "FeatureCollection", "features": features}, separators=(",", ":"))
+
+def add_coefficient_layers(m, coefs, terms):
+    # one toggleable layer per term (see gwr.coefficient_frame); the first starts visible
+    return [CoefficientLayer(coefs, term, show=(j == 0)).add_to(m) for j, term in enumerate(terms)]
+
+# ---------------- composite score trend (panel.py) ----------------
+class TrendLayer(Layer):
+    # change in composite score between a tract's first and last panel vintage;
+    # red = need rising, blue = falling
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        var {{ this.get_name() }} = L.geoJSON({{ this.data }}, {
+            pointToLayer: function(f, latlng) {
+                return L.circleMarker(latlng, {
+                    radius: 7, weight: 1, color: "#555", fillColor: f.properties.c, fillOpacity: 0.85
+                });
+            },
+            onEachFeature: function(f, layer) {
+                var p = f.properties;
+                layer.bindTooltip("Tract " + p.t + ": composite " + p.a + " (" + p.f + ") → "
+                    + p.b + " (" + p.l + "), " + (p.v > 0 ? "+" : "") + p.v);
+            }
+        });
+        {% endmacro %}
+    """)
+
+    def __init__(self, work_sorted, trend, name="Need trend", show=False):
+        super().__init__(name=name, overlay=True, control=True, show=show)
+        self._name = "TrendLayer"
+        # positions come from the map's tracts; trend is panel.Panel.trend() output
+        rows, lat, lon = _located(work_sorted)
+        fips = pd.Series(np.asarray(work_sorted["Tract_FIPS"])[rows], dtype=str).str.zfill(11).to_numpy()
+        by_tract = trend.set_index("GEOID").reindex(fips)
+        ok = by_tract["change"].notna().to_numpy()
+        t = by_tract[ok]
+        colors = diverging_colors(t["change"])
+        features = []
+        for j, (tract, la, lo, r) in enumerate(zip(fips[ok], lat[ok], lon[ok], t.itertuples())):
+            props = {"t": tract, "c": colors[j], "v": round(float(r.change), 3), "a": round(float(r.first_score), 3),
+                     "b": round(float(r.last_score), 3), "f": int(r.first_vintage), "l": int(r.last_vintage)}
+            features.append({"type": "Feature", "geometry": {"type": "Point", "coordinates": [round(float(lo), 5), round(float(la), 5)]},
+                             "properties": props})
+        self.count = len(features)
+        self.data = json.dumps({"type": "FeatureCollection", "features": features}, separators=(",", ":"))
+
+def add_trend_layer(m, work_sorted, trend):
+    return TrendLayer(work_sorted, trend).add_to(m)
+
+def add_layer_control(m):
+    folium.LayerControl(collapsed=False).add_to(m)
+
+# ---------------- map ----------------
+def build_map(work_sorted, mode="auto"):
+    if mode == "auto":
+        mode = "markers" if len(work_sorted) <= GEOJSON_THRESHOLD else "geojson"
+    if mode not in ("markers", "geojson"):
+        raise ValueError(f"unknown map mode: {mode!r}")
+
+    m = folium.Map(location=MAP_CENTER, zoom_start=11)
+    if mode == "markers":
+        # one popup per row; a TractTable is small enough here to go through pandas
+        add_markers(m, work_sorted if isinstance(work_sorted, pd.DataFrame) else work_sorted.to_frame())
+    else:
+        add_geojson_layer(m, work_sorted)
+
+    # legend
+    m.get_root().html.add_child(Element(LEGEND_HTML))
+
+    _, lat, lon = _located(work_sorted)
+    if len(lat):
+        m.fit_bounds([[float(lat.min()), float(lon.min())],
+                      [float(lat.max()), float(lon.max())]], padding=(20, 20))
+    return m
@@ -0,0 +1,128 @@
+# nourishnet.py — one command line for the analysis scripts
+# usage: python nourishnet.py <command> [args]
+#   score     [data_sheet.csv] [--out scored_tracts.csv]     composite scores and ranks, no map
+#   map       [data_sheet.csv] [--out okc_food_map.html]     the full OKC_MAPPED.py run
+#   sensitivity [data_sheet.csv] [--samples 20000] [--out weight_sensitivity.csv]
+#                                                            ranks under perturbed weights, no map
+#   centroids [GEOID ...] [--out tract_centroids.csv]        tract centroids, geocode cache first
+#   regress   [okc_data.csv] [--out gwr_coefficients.csv]    Regression.py (OLS, bootstrap, CV, GWR)
+#   moran     [okc_data.csv] [--out spatial_clusters.csv]    Morans I.py (Moran's I, LISA, Gi*)
+#   extract   census.csv [places_extract.py options]         tracts out of the CDC PLACES file
+#   serve     [scored_tracts.csv] [--port 8765]              tract_service.py HTTP lookups
+#
+# Only this file and the standard library load at startup. Each command imports its
+# modules when it runs, so `score` never loads folium or scipy and `centroids` never
+# loads pandas. The scripts whose file names have spaces are loaded by path through
+# script(). load(command) performs a command's imports without running it; the
+# -X importtime budgets in benchmarks/bench_startup.py are measured through it.
+import importlib
+import importlib.util
+import os
+import sys
+
+REPO = os.path.dirname(os.path.abspath(__file__))
+SCORED_CSV = "scored_tracts.csv"
+SENSITIVITY_SAMPLES = 20000
+
+# command: (modules or script files it imports, summary)
+COMMANDS = {
+    "score": (["OKC_MAPPED"], "composite scores and ranks for the data sheet"),
+    "map": (["OKC_MAPPED", "map_render", "site_selection", "routing", "tiger_client"],
+            "scores, sites, routes and the folium map"),
+    "sensitivity": (["OKC_MAPPED", "sensitivity"], "rank stability of the scores under perturbed weights"),
+    "centroids": (["latitude and longitude.py", "tiger_client"], "tract centroids from the cache or TIGERweb"),
+    "regress": (["Regression"], "OLS with bootstrap and cross-validation, then GWR"),
+    "moran": (["Morans I.py"], "global and local spatial autocorrelation"),
+    "extract": (["places_extract"], "stream selected tracts out of the CDC PLACES file"),
+    "serve": (["tract_service"], "HTTP lookups of scored tracts by GEOID or coordinate"),
+}
+
+def script(filename):
+    # a top-level script imported as a module; its __main__ block does not run
+    name = os.path.splitext(filename)[0].replace(" ", "_")
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(name, os.path.join(REPO, filename))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[name]
+
+def load(command):
+    # import everything a command needs, in COMMANDS order; returns the modules
+    if REPO not in sys.path:
+        sys.path.insert(0, REPO)
+    return [script(m) if m.endswith(".py") else importlib.import_module(m) for m in COMMANDS[command][0]]
+
+def _options(argv, names, usage, max_args=1):
+    args = list(argv)
+    opts = {}
+    for name in names:
+        if name in args:
+            i = args.index(name)
+            opts[name] = args[i + 1]
+            del args[i:i + 2]
+    if len(args) > max_args:
+        raise SystemExit(f"usage: python nourishnet.py {usage}")
+    return args, opts
+
+# ---------------- commands ----------------
+def score(argv):
+    okc, = load("score")
+    args, opts = _options(argv, ("--out",), "score [data_sheet.csv] [--out FILE]")
+    work = okc.score_work(okc.load_work(args[0] if args else okc.CSV_FILE))
+    out = opts.get("--out", SCORED_CSV)
+    work.to_csv(out, index=False)
+    print(f"\nScored tracts saved to {out}")
+
+def map_(argv):
+    okc = load("map")[0]
+    args, opts = _options(argv, ("--out",), "map [data_sheet.csv] [--out FILE]")
+    okc.main(args[0] if args else okc.CSV_FILE, opts.get("--out", okc.OUTPUT_HTML))
+
+def sensitivity(argv):
+    okc, _ = load("sensitivity")
+    args, opts = _options(argv, ("--samples", "--out"), "sensitivity [data_sheet.csv] [--samples N] [--out FILE]")
+    work = okc.score_work(okc.load_work(args[0] if args else okc.CSV_FILE))
+    okc.weight_sensitivity(work, int(opts.get("--samples", SENSITIVITY_SAMPLES)), opts.get("--out", okc.SENSITIVITY_CSV))
+
+def centroids(argv):
+    lat_lon = load("centroids")[0]
+    args, opts = _options(argv, ("--out",), "centroids [GEOID ...] [--out FILE]", max_args=sys.maxsize)
+    lat_lon.fetch_centroids(args or lat_lon.geoids, opts.get("--out", lat_lon.out_csv))
+
+def regress(argv):
+    regression, = load("regress")
+    args, opts = _options(argv, ("--out",), "regress [okc_data.csv] [--out FILE]")
+    regression.run(args[0] if args else regression.CSV_FILE, opts.get("--out", regression.GWR_CSV))
+
+def moran(argv):
+    morans_i, = load("moran")
+    args, opts = _options(argv, ("--out",), "moran [okc_data.csv] [--out FILE]")
+    morans_i.run(args[0] if args else morans_i.CSV_FILE, opts.get("--out", morans_i.LOCAL_CSV))
+
+def extract(argv):
+    places_extract, = load("extract")
+    places_extract.main(argv)
+
+def serve(argv):
+    tract_service, = load("serve")
+    tract_service.main(argv)
+
+RUN = {"score": score, "map": map_, "sensitivity": sensitivity, "centroids": centroids, "regress": regress, "moran": moran, "extract": extract,
+       "serve": serve}
+
+def usage():
+    width = max(map(len, COMMANDS))
+    return "usage: python nourishnet.py <command> [args]\n\ncommands:\n" + "\n".join(
+        f"  {name:<{width}}  {summary}" for name, (_, summary) in COMMANDS.items())
+
+def main(argv):
+    if not argv or argv[0] in ("-h", "--help", "help"):
+        print(usage())
+        return
+    if argv[0] not in RUN:
+        raise SystemExit(f"unknown command: {argv[0]!r}\n\n{usage()}")
+    RUN[argv[0]](argv[1:])
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
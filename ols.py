@@ -0,0 +1,129 @@
+# ols.py — least squares with batched bootstrap intervals and k-fold cross-validation
+# Regression.py fits low_access ~ poverty + health + income; this module adds:
+#   bootstrap()      — thousands of resamples as one batched solve: each resample is a
+#                      row of multiplicity counts, so every X'WX / X'Wy comes out of a
+#                      single (resamples, n) x (n, p*p) product
+#   cross_validate() — k-fold out-of-sample R² for a grid of feature subsets, with the
+#                      subsets spread over a process pool
+# Point estimates are the ordinary least-squares fit with an intercept, the same
+# numbers sklearn's LinearRegression gives.
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+BOOTSTRAPS = 2000
+CHUNK = 200          # resamples per batched solve
+FOLDS = 5
+CONFIDENCE = 0.95
+
+# ---------------- fitting ----------------
+def _design(X):
+    X = np.asarray(X, dtype=float)
+    return X[:, None] if X.ndim == 1 else X
+
+def fit(X, y):
+    # (intercept, coefficients) of the least-squares fit
+    X = _design(X)
+    y = np.asarray(y, dtype=float)
+    mx, my = X.mean(axis=0), y.mean()
+    coef = np.linalg.lstsq(X - mx, y - my, rcond=None)[0]
+    return my - mx @ coef, coef
+
+def predict(X, intercept, coef):
+    return intercept + _design(X) @ coef
+
+def r2(y, pred):
+    y = np.asarray(y, dtype=float)
+    return 1.0 - ((y - pred) ** 2).sum() / ((y - y.mean()) ** 2).sum()
+
+# ---------------- bootstrap ----------------
+def _resample_counts(rng, n, size):
+    # (size, n) multiplicities of a with-replacement resample of n rows
+    idx = rng.integers(0, n, (size, n)) + (np.arange(size) * n)[:, None]
+    return np.bincount(idx.ravel(), minlength=size * n).reshape(size, n).astype(float)
+
+def bootstrap(X, y, names=None, n_boot=BOOTSTRAPS, confidence=CONFIDENCE, seed=None, chunk=CHUNK):
+    # percentile intervals; returns (summary DataFrame, (n_boot, 1 + p) draws incl. intercept)
+    X = _design(X)
+    y = np.asarray(y, dtype=float)
+    n, p = X.shape
+    names = ["intercept"] + (list(names) if names is not None else [f"x{j}" for j in range(p)])
+    # centred design with an intercept column keeps the normal equations well conditioned
+    mx, my = X.mean(axis=0), y.mean()
+    D = np.column_stack([np.ones(n), X - mx])
+    outer = (D[:, :, None] * D[:, None, :]).reshape(n, -1)   # (n, (p+1)^2)
+    cross = D * (y - my)[:, None]                             # (n, p+1)
+
+    rng = np.random.default_rng(seed)
+    draws = np.empty((n_boot, p + 1))
+    for b0 in range(0, n_boot, chunk):
+        b1 = min(n_boot, b0 + chunk)
+        w = _resample_counts(rng, n, b1 - b0)
+        xtx = (w @ outer).reshape(-1, p + 1, p + 1)
+        xty = w @ cross
+        beta = np.linalg.solve(xtx, xty[:, :, None])[:, :, 0]
+        draws[b0:b1, 1:] = beta[:, 1:]
+        draws[b0:b1, 0] = beta[:, 0] + my - beta[:, 1:] @ mx
+
+    intercept, coef = fit(X, y)
+    alpha = (1.0 - confidence) / 2.0
+    lo, hi = np.quantile(draws, [alpha, 1.0 - alpha], axis=0)
+    summary = pd.DataFrame({
+        "estimate": np.concatenate([[intercept], coef]),
+        "std_err": draws.std(axis=0, ddof=1),
+        f"ci_{alpha * 100:g}": lo,
+        f"ci_{(1 - alpha) * 100:g}": hi,
+    }, index=pd.Index(names, name="term"))
+    return summary, draws
+
+# ---------------- cross-validation ----------------
+def fold_ids(n, k=FOLDS, seed=None):
+    ids = np.arange(n) % k
+    np.random.default_rng(seed).shuffle(ids)
+    return ids
+
+_STATE = {}
+
+def _init_worker(state):
+    _STATE.clear()
+    _STATE.update(state)
+
+def _cv_subset(cols):
+    X, y, folds = _STATE["X"], _STATE["y"], _STATE["folds"]
+    Xs = X[:, list(cols)]
+    pred = np.empty(len(y))
+    for f in np.unique(folds):
+        test = folds == f
+        b0, b = fit(Xs[~test], y[~test])
+        pred[test] = predict(Xs[test], b0, b)
+    sse = ((y - pred) ** 2).sum()
+    return cols, 1.0 - sse / ((y - y.mean()) ** 2).sum(), np.sqrt(sse / len(y))
+
+def feature_subsets(p, min_size=1):
+    return [c for r in range(min_size, p + 1) for c in combinations(range(p), r)]
+
+def cross_validate(X, y, names=None, subsets=None, k=FOLDS, seed=None, workers=1):
+    # out-of-sample R² (pooled over folds) and RMSE per feature subset, best first;
+    # every subset sees the same folds
+    X = _design(X)
+    y = np.asarray(y, dtype=float)
+    names = list(names) if names is not None else [f"x{j}" for j in range(X.shape[1])]
+    subsets = subsets if subsets is not None else feature_subsets(X.shape[1])
+    state = {"X": X, "y": y, "folds": fold_ids(len(y), k, seed)}
+    tasks = [tuple(c) for c in subsets]
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(state,)) as pool:
+            results = list(pool.map(_cv_subset, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+    else:
+        _init_worker(state)
+        results = [_cv_subset(t) for t in tasks]
+    _STATE.clear()
+    rows = []
+    for cols, oos_r2, rmse in results:
+        b0, b = fit(X[:, list(cols)], y)
+        rows.append({"features": " + ".join(names[c] for c in cols), "n_features": len(cols),
+                     "in_sample_r2": r2(y, predict(X[:, list(cols)], b0, b)),
+                     "cv_r2": oos_r2, "cv_rmse": rmse})
+    return pd.DataFrame(rows).sort_values("cv_r2", ascending=False, kind="stable").reset_index(drop=True)
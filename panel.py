@@ -0,0 +1,362 @@
+# panel.py — append-only multi-vintage tract panel keyed by (GEOID, vintage)
+# usage: python panel.py ingest sheet|atlas|places FILE --vintage 2019 [--boundaries 2010|2020] [--replace]
+#        python panel.py crosswalk tab20_tract20_tract10_natl.txt
+#        python panel.py history GEOID [GEOID ...]
+#        python panel.py deltas [--state 40] [--out trend.csv]
+#        python panel.py list
+#        (every command takes --store DIR, default panel_store)
+#
+# Each ingested file becomes one partition, <store>/<source>/<vintage>.feather, holding
+# int64 GEOIDs and the float32 indicators of tract_table.INDICATORS; manifest.json
+# records the source file's content hash, so re-ingesting an unchanged file is a
+# no-op and a new year only writes its own partition. Sources:
+#   sheet   the hand-made data sheet (ACS-style poverty/income/SNAP/access/health), via schema.py
+#   atlas   USDA Food Access Research Atlas (food_access.csv)
+#   places  CDC PLACES tract file (census.csv), via places_extract.py
+# Queries run on one consolidated table: per vintage the sources are merged (sheet,
+# then atlas, then places, first present value wins), partitions on 2010 tract
+# boundaries are carried onto 2020 tracts through the registered crosswalk, the
+# composite score is computed, and the result is written sorted by (GEOID, vintage)
+# as panel-<manifest key>.feather. It is rebuilt only when the manifest changes and is
+# memory-mapped afterwards, so a tract's history or a state's rows are a binary
+# search away (a state is a contiguous GEOID range).
+import hashlib
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+import scoring
+from atlas_cache import source_hash
+from tract_table import GEOID_WIDTH, INDICATORS
+
+STORE_DIR = "panel_store"
+SOURCE_ORDER = ("sheet", "atlas", "places")  # precedence when two sources give the same field
+FIRST_2020_VINTAGE = 2020  # earlier vintages default to 2010 tract boundaries
+STATE_DIGITS = 2
+
+# USDA atlas column names by field; the first one present in the file is used
+ATLAS_KEY = "CensusTract"
+ATLAS_FIELDS = {
+    "total_pop": ("Pop2010", "POP2010", "Pop2020"),
+    "poverty": ("PovertyRate",),
+    "income": ("MedianFamilyIncome",),
+    "lap1_pct": ("lapop1share",),
+    "lap10_pct": ("lapop20share", "lapop10share"),
+}
+PLACES_FIELDS = {"obesity": "Adult_Obesity_%", "diabetes": "Adult_Diabetes_%", "inactive": "% Physically_Inactive"}
+
+# 2010 -> 2020 crosswalk columns: Census relationship file names first, then common CSV names
+CROSSWALK_FROM = ("GEOID_TRACT_10", "tr2010ge", "geoid10", "tract10")
+CROSSWALK_TO = ("GEOID_TRACT_20", "tr2020ge", "geoid20", "tract20")
+CROSSWALK_WEIGHT = ("wt_pop", "weight", "afact")
+
+# ---------------- source readers ----------------
+def _canonical(fips, fields):
+    # GEOID int64 + every INDICATORS column as float32; non-tract ids are dropped
+    fips = pd.Series(np.asarray(fips), dtype=str).str.strip().str.replace(r"\.0$", "", regex=True).str.zfill(GEOID_WIDTH)
+    ok = fips.str.fullmatch(r"\d{%d}" % GEOID_WIDTH).to_numpy()
+    out = pd.DataFrame({"geoid": fips[ok].astype(np.int64).to_numpy()})
+    for name in INDICATORS:
+        v = fields.get(name)
+        out[name] = (np.full(ok.sum(), np.nan) if v is None else np.asarray(v, dtype=float)[ok]).astype(np.float32)
+    return out.drop_duplicates("geoid").reset_index(drop=True)
+
+def read_sheet(path):
+    import datasheet
+    import schema
+
+    df, profile = schema.load_sheet(path)
+    work = datasheet.build_work(df, profile["mapping"], log=lambda *_: None)
+    return _canonical(work["Tract_FIPS"], {k: work[k] for k in INDICATORS})
+
+def read_atlas(path):
+    import schema
+
+    header = schema.read_header(path)
+    cols = {field: next((c for c in names if c in header), None) for field, names in ATLAS_FIELDS.items()}
+    if ATLAS_KEY not in header:
+        raise SystemExit(f"'{path}' has no {ATLAS_KEY} column")
+    df = pd.read_csv(path, usecols=[ATLAS_KEY, *(c for c in cols.values() if c)], dtype=str)
+    return _canonical(df[ATLAS_KEY], {f: pd.to_numeric(df[c], errors="coerce") for f, c in cols.items() if c})
+
+def read_places(path):
+    from places_extract import extract_places
+
+    df, _ = extract_places(path, progress=False)
+    return _canonical(df["tractfips"], {f: df[c] for f, c in PLACES_FIELDS.items() if c in df})
+
+READERS = {"sheet": read_sheet, "atlas": read_atlas, "places": read_places}
+
+def read_crosswalk(path):
+    # (geoid10, geoid20, weight) with weight = share of the 2010 tract going to the 2020 tract;
+    # without a weight column the land-area share of the Census relationship file is used
+    sep = "|" if open(path, encoding="utf-8-sig").readline().count("|") else ","
+    df = pd.read_csv(path, sep=sep, dtype=str, encoding="utf-8-sig")
+    lower = {c.lower(): c for c in df.columns}
+    pick = lambda names: next((lower[n.lower()] for n in names if n.lower() in lower), None)
+    src, dst, wcol = pick(CROSSWALK_FROM), pick(CROSSWALK_TO), pick(CROSSWALK_WEIGHT)
+    if src is None or dst is None:
+        raise SystemExit(f"'{path}' needs 2010 and 2020 tract GEOID columns, e.g. {CROSSWALK_FROM[0]}/{CROSSWALK_TO[0]}")
+    if wcol is not None:
+        weight = pd.to_numeric(df[wcol], errors="coerce")
+    elif "arealand_part" in lower and "arealand_tract_10" in lower:
+        part = pd.to_numeric(df[lower["arealand_part"]], errors="coerce")
+        weight = part / pd.to_numeric(df[lower["arealand_tract_10"]], errors="coerce").where(lambda a: a > 0)
+    else:
+        weight = pd.Series(1.0, index=df.index)
+    out = pd.DataFrame({"geoid10": pd.to_numeric(df[src], errors="coerce"), "geoid20": pd.to_numeric(df[dst], errors="coerce"),
+                        "weight": weight.fillna(0.0).astype(float)}).dropna(subset=["geoid10", "geoid20"])
+    out = out[out["weight"] > 0].astype({"geoid10": np.int64, "geoid20": np.int64})
+    return out.sort_values(["geoid10", "geoid20"]).reset_index(drop=True)
+
+def to_2020(frame, crosswalk):
+    # carry a 2010-boundary partition onto 2020 tracts: population counts are split by
+    # the crosswalk weight, rates are averaged with weight x 2010 population (weight
+    # alone where the population is unknown); tracts missing from the crosswalk keep their id
+    pairs = crosswalk.merge(frame, left_on="geoid10", right_on="geoid", how="inner")
+    target, geoid20 = pd.factorize(pairs["geoid20"], sort=True)
+    w = pairs["weight"].to_numpy()
+    pop = pairs["total_pop"].to_numpy(dtype=float)
+    rate_w = np.where(pop > 0, w * pop, w)
+    out = pd.DataFrame({"geoid": geoid20.to_numpy(dtype=np.int64)})
+    for name in INDICATORS:
+        v = pairs[name].to_numpy(dtype=float)
+        ok = ~np.isnan(v)
+        wt = w if name == "total_pop" else rate_w
+        num = np.bincount(target, weights=np.where(ok, wt * v, 0.0), minlength=len(out))
+        if name == "total_pop":
+            res = np.where(np.bincount(target, weights=ok, minlength=len(out)) > 0, num, np.nan)
+        else:
+            den = np.bincount(target, weights=np.where(ok, wt, 0.0), minlength=len(out))
+            res = np.divide(num, den, out=np.full(len(out), np.nan), where=den > 0)
+        out[name] = res.astype(np.float32)
+    rest = frame[~frame["geoid"].isin(crosswalk["geoid10"])]
+    return pd.concat([out, rest[out.columns]], ignore_index=True).drop_duplicates("geoid")
+
+# ---------------- store ----------------
+class Panel:
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+        try:
+            with open(os.path.join(root, "manifest.json")) as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {"partitions": {}, "crosswalk": None}
+        self._table = None
+
+    def _save(self):
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, "manifest.json")
+        tmp = path + f".{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp, path)
+        self._table = None
+
+    def ingest(self, source, path, vintage, boundaries=None, replace=False):
+        # returns (manifest entry, whether anything was written); a partition is never
+        # overwritten by a different file unless replace=True
+        if source not in READERS:
+            raise SystemExit(f"unknown source {source!r}; expected one of {', '.join(READERS)}")
+        vintage = int(vintage)
+        key = f"{source}/{vintage}"
+        digest = source_hash(path)
+        old = self.manifest["partitions"].get(key)
+        if old is not None and old["hash"] == digest:
+            return old, False
+        if old is not None and not replace:
+            raise SystemExit(f"{key} was ingested from a different file ({old['path']}); "
+                             f"the panel is append-only, pass --replace to supersede it")
+        t0 = time.perf_counter()
+        frame = READERS[source](path)
+        rel = os.path.join(source, f"{vintage}.feather")
+        os.makedirs(os.path.join(self.root, source), exist_ok=True)
+        feather.write_feather(frame, os.path.join(self.root, rel), compression="uncompressed")
+        entry = {"source": source, "vintage": vintage, "file": rel, "path": os.path.abspath(path), "hash": digest,
+                 "rows": len(frame), "fields": [c for c in INDICATORS if frame[c].notna().any()],
+                 "boundaries": int(boundaries or (2020 if vintage >= FIRST_2020_VINTAGE else 2010)),
+                 "ingested": time.time(), "seconds": round(time.perf_counter() - t0, 3)}
+        self.manifest["partitions"][key] = entry
+        self._save()
+        return entry, True
+
+    def set_crosswalk(self, path):
+        cw = read_crosswalk(path)
+        os.makedirs(self.root, exist_ok=True)
+        feather.write_feather(cw, os.path.join(self.root, "crosswalk.feather"), compression="uncompressed")
+        self.manifest["crosswalk"] = {"path": os.path.abspath(path), "hash": source_hash(path), "pairs": len(cw)}
+        self._save()
+        return len(cw)
+
+    @property
+    def vintages(self):
+        return sorted({p["vintage"] for p in self.manifest["partitions"].values()})
+
+    # ---------------- consolidated table ----------------
+    def _key(self):
+        parts = sorted((k, p["hash"], p["boundaries"]) for k, p in self.manifest["partitions"].items())
+        cw = self.manifest["crosswalk"]["hash"] if self.manifest["crosswalk"] else None
+        return hashlib.sha1(json.dumps([parts, cw]).encode()).hexdigest()[:16]
+
+    def _build(self, path):
+        crosswalk = None
+        if self.manifest["crosswalk"]:
+            crosswalk = feather.read_feather(os.path.join(self.root, "crosswalk.feather"))
+        years = []
+        for vintage in self.vintages:
+            frames = []
+            for rank, source in enumerate(SOURCE_ORDER):
+                entry = self.manifest["partitions"].get(f"{source}/{vintage}")
+                if entry is None:
+                    continue
+                frame = feather.read_feather(os.path.join(self.root, entry["file"]))
+                if entry["boundaries"] == 2010:
+                    if crosswalk is None:
+                        print(f"panel: {source}/{vintage} is on 2010 tracts and no crosswalk is registered; "
+                              f"using its GEOIDs as they are", file=sys.stderr)
+                    else:
+                        frame = to_2020(frame, crosswalk)
+                frames.append(frame.assign(_rank=rank))
+            # first present value per field in SOURCE_ORDER (groupby.first skips NaN)
+            merged = pd.concat(frames, ignore_index=True).sort_values(["geoid", "_rank"], kind="stable")
+            merged = merged.groupby("geoid", sort=True)[list(INDICATORS)].first().reset_index()
+            merged.insert(1, "vintage", np.int16(vintage))
+            merged["composite_score"] = scoring.composite_scores(merged)
+            years.append(merged)
+        columns = ["geoid", "vintage", *INDICATORS, "composite_score"]
+        table = pd.concat(years, ignore_index=True) if years else pd.DataFrame(columns=columns)
+        table = table.sort_values(["geoid", "vintage"], kind="stable").reset_index(drop=True)
+        table = table.astype({"geoid": np.int64, "vintage": np.int16, **{c: np.float32 for c in INDICATORS},
+                              "composite_score": float})
+        feather.write_feather(table[columns], path, compression="uncompressed")
+
+    def table(self):
+        # the consolidated (GEOID, vintage) table as a memory-mapped Arrow table
+        if self._table is None:
+            path = os.path.join(self.root, f"panel-{self._key()}.feather")
+            if not os.path.exists(path):
+                for old in os.listdir(self.root) if os.path.isdir(self.root) else ():
+                    if old.startswith("panel-") and old.endswith(".feather"):
+                        os.remove(os.path.join(self.root, old))
+                os.makedirs(self.root, exist_ok=True)
+                self._build(path)
+            self._table = feather.read_table(path, memory_map=True)
+        return self._table
+
+    def _geoids(self):
+        return self.table().column("geoid").to_numpy()
+
+    # ---------------- queries ----------------
+    def _frame(self, rows):
+        table = self.table()
+        if len(rows) and rows[-1] - rows[0] == len(rows) - 1:
+            table = table.slice(rows[0], len(rows))  # one tract or one state: a zero-copy range
+        else:
+            table = table.take(pa.array(rows, type=pa.int64()))
+        out = table.to_pandas().astype({c: float for c in INDICATORS})  # float64 for pandas consumers
+        out.insert(0, "GEOID", out.pop("geoid").astype(str).str.zfill(GEOID_WIDTH))
+        return out
+
+    def _rows(self, geoids=None, state=None):
+        # row positions of the given tracts, or of a state's GEOID range, or everything
+        ids = self._geoids()
+        if geoids is not None:
+            keys = np.unique(np.asarray([int(g) for g in map(str, geoids) if g.strip().isdigit()], dtype=np.int64))
+            lo, hi = np.searchsorted(ids, keys, "left"), np.searchsorted(ids, keys, "right")
+            return np.concatenate([np.arange(a, b) for a, b in zip(lo, hi)]) if len(keys) else np.zeros(0, np.int64)
+        if state is not None:
+            scale = 10 ** (GEOID_WIDTH - STATE_DIGITS)
+            lo, hi = np.searchsorted(ids, [int(state) * scale, (int(state) + 1) * scale])
+            return np.arange(lo, hi)
+        return np.arange(len(ids))
+
+    def history(self, geoids):
+        # one row per (tract, vintage) for the given tracts, oldest vintage first
+        return self._frame(self._rows(geoids))
+
+    def deltas(self, geoids=None, state=None):
+        # history plus prev_vintage, delta and delta_per_year of the composite score
+        # against the tract's previous vintage (NaN on its first)
+        out = self._frame(self._rows(geoids, state))
+        same = np.r_[False, out["GEOID"].to_numpy()[1:] == out["GEOID"].to_numpy()[:-1]]
+        score = out["composite_score"].to_numpy()
+        vintage = out["vintage"].to_numpy().astype(float)
+        prev_score = np.where(same, np.r_[np.nan, score[:-1]], np.nan)
+        prev_vintage = np.where(same, np.r_[np.nan, vintage[:-1]], np.nan)
+        out["prev_vintage"] = pd.array(prev_vintage, dtype="Int16")
+        out["delta"] = score - prev_score
+        out["delta_per_year"] = out["delta"] / (vintage - prev_vintage)
+        return out
+
+    def trend(self, geoids=None, state=None):
+        # one row per tract: first/last scored vintage and score, change, change per
+        # year and the latest year-over-year delta
+        d = self.deltas(geoids, state)
+        d = d[d["composite_score"].notna()]
+        g = d.groupby("GEOID", sort=True)
+        out = pd.DataFrame({
+            "first_vintage": g["vintage"].first(), "last_vintage": g["vintage"].last(),
+            "first_score": g["composite_score"].first(), "last_score": g["composite_score"].last(),
+            "last_delta": g["delta"].last(), "vintages": g.size(),
+        })
+        span = (out["last_vintage"] - out["first_vintage"]).astype(float).where(lambda s: s > 0)
+        out["change"] = (out["last_score"] - out["first_score"]).where(span.notna())
+        out["change_per_year"] = out["change"] / span
+        return out.reset_index()
+
+    def report(self):
+        lines = [f"Panel {self.root}: {len(self.manifest['partitions'])} partitions, vintages {self.vintages}"]
+        for key, p in sorted(self.manifest["partitions"].items()):
+            lines.append(f"  {key:<14} {p['rows']:>8,} tracts  {p['boundaries']} tracts  fields {', '.join(p['fields'])}")
+        cw = self.manifest["crosswalk"]
+        lines.append(f"  crosswalk: {cw['pairs']:,} 2010->2020 pairs from {cw['path']}" if cw else "  crosswalk: none")
+        return "\n".join(lines)
+
+# ---------------- command line ----------------
+def main(argv):
+    args = list(argv)
+    opts = {}
+    for name in ("--store", "--vintage", "--boundaries", "--state", "--out"):
+        if name in args:
+            i = args.index(name)
+            opts[name] = args[i + 1]
+            del args[i:i + 2]
+    replace = "--replace" in args
+    args = [a for a in args if a != "--replace"]
+    store = Panel(opts.get("--store", STORE_DIR))
+    command = args[0] if args else None
+    t0 = time.perf_counter()
+    if command == "ingest" and len(args) == 3 and "--vintage" in opts:
+        entry, wrote = store.ingest(args[1], args[2], opts["--vintage"], opts.get("--boundaries"), replace)
+        print(f"{args[1]}/{entry['vintage']}: " + (f"{entry['rows']:,} tracts written in {entry['seconds']:.2f}s"
+                                                   if wrote else "unchanged, nothing to do"))
+    elif command == "crosswalk" and len(args) == 2:
+        print(f"Registered {store.set_crosswalk(args[1]):,} 2010->2020 tract pairs")
+    elif command == "history" and len(args) > 1:
+        print(store.history(args[1:]).round(3).to_string(index=False))
+        print(f"({time.perf_counter() - t0:.3f}s)")
+    elif command == "deltas" and len(args) == 1:
+        trend = store.trend(state=opts.get("--state"))
+        print(f"{len(trend):,} tracts, vintages {store.vintages} in {time.perf_counter() - t0:.2f}s")
+        print(trend.sort_values("change", ascending=False).head(10).round(3).to_string(index=False))
+        if "--out" in opts:
+            trend.to_csv(opts["--out"], index=False)
+            print(f"Wrote {opts['--out']}")
+    elif command == "list":
+        print(store.report())
+    else:
+        raise SystemExit("usage: python panel.py ingest sheet|atlas|places FILE --vintage YEAR [--boundaries 2010|2020] [--replace]\n"
+                         "       python panel.py crosswalk RELATIONSHIP_FILE\n"
+                         "       python panel.py history GEOID [GEOID ...]\n"
+                         "       python panel.py deltas [--state FIPS] [--out FILE]\n"
+                         "       python panel.py list\n"
+                         "       (all take --store DIR)")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,104 @@
+# parsing.py — column-at-a-time parsers for the messy numeric fields in the source sheets
+# Every parser takes a whole column and returns (float array, failed mask).
+# "failed" marks cells that held something other than a blank/NA token but
+# produced no number. String work runs on Arrow compute kernels.
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+NA_TOKENS = ("na", "n/a", "nan", "--")
+
+LATLON_PATTERN = r"(?P<lat>-?\d+\.\d+)\s*,\s*(?P<lon>-?\d+\.\d+)"
+
+# what float() accepts once everything but digits, '.' and '-' is gone
+_DIGITS_FLOAT = r"^-?(\d+\.?\d*|\.\d+)$"
+_PLAIN_FLOAT = r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$"
+
+# ---------------- helpers ----------------
+def _series(values):
+    if isinstance(values, pd.Series):
+        return values.reset_index(drop=True)
+    return pd.Series(values)
+
+def _strings(s):
+    # Arrow string array; null where the cell is missing or not a string
+    if pd.api.types.is_numeric_dtype(s.dtype) or pd.api.types.is_bool_dtype(s.dtype):
+        return pa.nulls(len(s), pa.string())
+    if s.dtype == object:
+        s = s.where(s.str.len().notna())
+    return pa.array(s.astype("string[pyarrow]"), type=pa.string())
+
+def _numbers(s):
+    # cells that already hold a number (e.g. an all-numeric column read without dtype=str)
+    if pd.api.types.is_bool_dtype(s.dtype):
+        return np.full(len(s), np.nan)
+    if pd.api.types.is_numeric_dtype(s.dtype):
+        return s.to_numpy(dtype=float, na_value=np.nan)
+    if s.dtype == object:
+        return pd.to_numeric(s.where(s.str.len().isna()), errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    return np.full(len(s), np.nan)
+
+def _to_float(arr, pattern):
+    ok = pc.fill_null(pc.match_substring_regex(arr, pattern), False)
+    vals = pc.cast(pc.if_else(ok, arr, pa.scalar(None, pa.string())), pa.float64())
+    return vals.to_numpy(zero_copy_only=False).astype(float, copy=True)
+
+def _to_numpy(mask):
+    return pc.fill_null(mask, False).to_numpy(zero_copy_only=False).astype(bool)
+
+def _present(s):
+    return s.notna().to_numpy()
+
+def _as_text(s):
+    # str(x) of every present cell, the way the per-cell helpers saw it
+    return pa.array(s.where(s.notna()).astype("string[pyarrow]"), type=pa.string())
+
+# ---------------- parsers ----------------
+def parse_number(values):
+    # "$45,000" -> 45000, "12.3%" -> 12.3; drops every character except digits, '.' and '-'
+    s = _series(values)
+    out = _numbers(s)
+    arr = _strings(s)
+    is_str = _to_numpy(pc.is_valid(arr))
+    if is_str.any():
+        t = pc.utf8_trim_whitespace(arr)
+        na = _to_numpy(pc.or_(pc.equal(t, ""), pc.is_in(pc.utf8_lower(t), pa.array(NA_TOKENS))))
+        digits = pc.replace_substring_regex(t, r"[^0-9.\-]+", "")
+        val = _to_float(digits, _DIGITS_FLOAT)
+        out = np.where(is_str, val, out)
+        failed = is_str & ~na & np.isnan(val)
+    else:
+        failed = np.zeros(len(s), dtype=bool)
+    return out, failed
+
+def parse_pct(values):
+    # prefers the "(18.2%)" part of "1,234 (18.2%)", then any "12.3%", then the first number
+    s = _series(values)
+    present = _present(s)
+    t = _as_text(s)
+    m = None
+    for pattern in (r"\((?P<v>[\d.]+)%\)", r"(?P<v>[\d.]+)%", r"(?P<v>[\d.]+)"):
+        found = pc.struct_field(pc.extract_regex(t, pattern), [0])
+        m = found if m is None else pc.coalesce(m, found)
+    out = _to_float(m, _DIGITS_FLOAT)
+    out[~present] = np.nan
+    return out, present & np.isnan(out)
+
+def parse_plain(values):
+    # strips '%', '$' and ',' and expects a plain number in what is left
+    s = _series(values)
+    present = _present(s)
+    t = pc.utf8_trim_whitespace(pc.replace_substring_regex(_as_text(s), r"[%$,]", ""))
+    out = _to_float(t, _PLAIN_FLOAT)
+    out[~present] = np.nan
+    na = _to_numpy(pc.is_in(pc.utf8_lower(t), pa.array(NA_TOKENS)))
+    return out, present & ~na & np.isnan(out)
+
+def parse_latlon(values):
+    # first "lat, lon" pair found in each cell
+    s = _series(values)
+    m = pc.extract_regex(_as_text(s), LATLON_PATTERN)
+    lat = _to_float(pc.struct_field(m, [0]), _DIGITS_FLOAT)
+    lon = _to_float(pc.struct_field(m, [1]), _DIGITS_FLOAT)
+    return lat, lon
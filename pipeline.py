@@ -0,0 +1,254 @@
+# pipeline.py — incremental runner for the NourishNet scripts
+# usage: python pipeline.py [stage ...] [--force] [--workers 3] [--dry-run] [--list]
+#
+# Every script is a stage with declared input and output files. A stage is skipped
+# when the content hashes of its inputs and the hash of its code (the script plus
+# the repo modules it imports) match the last successful run and its outputs are
+# untouched; skipped stages replay their saved console output. Stages whose inputs
+# are produced by other stages wait for them; the rest run in parallel. CSV outputs
+# are also stored as typed Feather tables keyed by content hash; a downstream script
+# reads its inputs through read_csv(), which maps the Feather copy when one matches
+# the file's bytes and falls back to parsing the CSV when run on its own.
+import ast
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+import pyarrow.feather as feather
+
+from atlas_cache import source_hash
+
+CACHE_DIR = os.path.join(".nourishnet_cache", "pipeline")
+STATE_FILE = "state.json"
+WORKERS = 3
+ID_TOKENS = ("fips", "geoid", "tract")  # columns kept as strings in stored tables (leading zeros)
+REPO = os.path.dirname(os.path.abspath(__file__))
+
+Stage = namedtuple("Stage", "name script inputs outputs")
+
+# inputs that may be absent are still declared: creating one later re-runs the stage.
+# The map also reads the panel store (its manifest changes with every ingest) and
+# the geocode cache fill_centroids consults
+PANEL_MANIFEST = os.path.join("panel_store", "manifest.json")
+GEOCODE_DB = os.path.join(".nourishnet_cache", "geocode.sqlite")
+STAGES = [
+    Stage("health", "Statistics information.py", ["census.csv"], ["tract_health_data.csv"]),
+    Stage("centroids", "latitude and longitude.py", [], ["tract_centroids.csv"]),
+    Stage("grocery", "GroceryStore_Income.py", ["food_access.csv"], []),
+    Stage("regression", "Regression.py", ["okc_data.csv"], ["gwr_coefficients.csv"]),
+    Stage("moran", "Morans I.py", ["okc_data.csv"], ["spatial_clusters.csv"]),
+    Stage("map", "OKC_MAPPED.py",
+          ["Data Sheet of OKC - Sheet1.csv", "candidate_sites.csv", "gwr_coefficients.csv",
+           "grocery_stores.csv", "block_groups.csv", PANEL_MANIFEST, GEOCODE_DB],
+          ["okc_food_map.html", "pantry_sites.csv", "delivery_routes.csv", "tract_access.csv"]),
+]
+
+# ---------------- hashing ----------------
+def file_hash(path, cache_dir=CACHE_DIR):
+    return source_hash(path, cache_dir) if os.path.exists(path) else "missing"
+
+def _local_imports(path):
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(a.name.split(".")[0] for a in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split(".")[0])
+    return [os.path.join(REPO, n + ".py") for n in sorted(names) if os.path.exists(os.path.join(REPO, n + ".py"))]
+
+def code_hash(script, cache_dir=CACHE_DIR):
+    # the script and every repo module it imports, transitively
+    seen, todo = {}, [os.path.join(REPO, script)]
+    while todo:
+        path = todo.pop()
+        if path in seen:
+            continue
+        seen[path] = file_hash(path, cache_dir)
+        todo.extend(_local_imports(path))
+    return json.dumps(sorted((os.path.basename(p), h) for p, h in seen.items()))
+
+def stage_key(stage, cache_dir=CACHE_DIR):
+    import hashlib
+
+    h = hashlib.sha256(code_hash(stage.script, cache_dir).encode())
+    for path in stage.inputs:
+        h.update(f"|{path}={file_hash(path, cache_dir)}".encode())
+    return h.hexdigest()
+
+# ---------------- state ----------------
+def load_state(cache_dir=CACHE_DIR):
+    try:
+        with open(os.path.join(cache_dir, STATE_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_state(state, cache_dir=CACHE_DIR):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, STATE_FILE)
+    tmp = path + f".{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=1)
+    os.replace(tmp, path)
+
+def is_fresh(stage, key, state, cache_dir=CACHE_DIR):
+    rec = state.get(stage.name)
+    if rec is None or rec.get("key") != key:
+        return False
+    return all(file_hash(p, cache_dir) == h for p, h in rec.get("outputs", {}).items())
+
+# ---------------- typed intermediates ----------------
+def _table_path(path, digest, cache_dir):
+    stem = os.path.splitext(os.path.basename(path))[0].replace(" ", "_")
+    return os.path.join(cache_dir, "tables", f"{stem}-{digest[:16]}.feather")
+
+def store_table(path, digest, cache_dir=CACHE_DIR):
+    out = _table_path(path, digest, cache_dir)
+    if not os.path.exists(out):
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+        header = pd.read_csv(path, nrows=0).columns
+        df = pd.read_csv(path, dtype={c: str for c in header if any(t in c.lower() for t in ID_TOKENS)})
+        tmp = out + f".{os.getpid()}.tmp"
+        feather.write_feather(df, tmp, compression="uncompressed")
+        os.replace(tmp, out)
+    return out
+
+def load(name, cache_dir=CACHE_DIR):
+    # typed DataFrame of a stage's CSV output from the last successful run
+    for rec in load_state(cache_dir).values():
+        digest = rec.get("outputs", {}).get(name)
+        if digest and digest != "missing":
+            return feather.read_table(_table_path(name, digest, cache_dir), memory_map=True).to_pandas()
+    raise KeyError(f"no stored table for {name!r}; run the pipeline first")
+
+def read_csv(path, dtype=None, cache_dir=CACHE_DIR):
+    # a stage input: the stored Feather table for these exact bytes, else the parsed CSV
+    if os.path.isdir(os.path.join(cache_dir, "tables")):
+        table = _table_path(path, file_hash(path, cache_dir), cache_dir)
+        if os.path.exists(table):
+            df = feather.read_table(table, memory_map=True).to_pandas()
+            return df.astype(dtype) if dtype else df
+    return pd.read_csv(path, dtype=dtype)
+
+# ---------------- running ----------------
+def upstream(stages):
+    # stage name -> names of the stages producing its inputs
+    producer = {out: s.name for s in stages for out in s.outputs}
+    return {s.name: sorted({producer[i] for i in s.inputs if i in producer and producer[i] != s.name}) for s in stages}
+
+def run_stage(stage, cache_dir=CACHE_DIR):
+    log_path = os.path.join(cache_dir, "logs", f"{stage.name}.log")
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    t0 = time.perf_counter()
+    with open(log_path, "w") as log:
+        proc = subprocess.run([sys.executable, os.path.join(REPO, stage.script)], stdout=log,
+                              stderr=subprocess.STDOUT, env={**os.environ, "PYTHONPATH": REPO})
+    return proc.returncode, time.perf_counter() - t0, log_path
+
+def run(names=None, force=False, workers=WORKERS, dry_run=False, stages=STAGES, cache_dir=CACHE_DIR):
+    deps = upstream(stages)
+    by_name = {s.name: s for s in stages}
+    wanted = set(names or by_name)
+    unknown = wanted - set(by_name)
+    if unknown:
+        raise SystemExit(f"unknown stage(s): {', '.join(sorted(unknown))}; known: {', '.join(by_name)}")
+    todo = list(wanted)
+    while todo:  # pull in everything upstream of what was asked for
+        for d in deps[todo.pop()]:
+            if d not in wanted:
+                wanted.add(d)
+                todo.append(d)
+    order = [s.name for s in stages if s.name in wanted]
+
+    state = load_state(cache_dir)
+    done, failed, rerun = set(), set(), set()
+    results = []
+    with ThreadPoolExecutor(max(1, workers)) as pool:
+        running = {}
+        while len(done) + len(failed) < len(order):
+            for name in order:
+                if name in done or name in failed or name in running.values():
+                    continue
+                if any(d in failed for d in deps[name]):
+                    failed.add(name)
+                    results.append((name, "blocked", 0.0))
+                    continue
+                if not all(d in done for d in deps[name] if d in wanted):
+                    continue
+                stage = by_name[name]
+                # inputs are hashed only now, after every upstream stage has written them, so an
+                # upstream re-run that reproduces the same bytes does not cascade; a dry run
+                # cannot know that and assumes it would
+                key = stage_key(stage, cache_dir)
+                stale_upstream = dry_run and any(d in rerun for d in deps[name])
+                if not force and not stale_upstream and is_fresh(stage, key, state, cache_dir):
+                    done.add(name)
+                    results.append((name, "cached", state[name].get("seconds", 0.0)))
+                    continue
+                if dry_run:
+                    done.add(name)
+                    rerun.add(name)
+                    results.append((name, "would run", 0.0))
+                    continue
+                running[pool.submit(run_stage, stage, cache_dir)] = name
+            if not running:
+                continue
+            finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for fut in finished:
+                name = running.pop(fut)
+                stage = by_name[name]
+                code, seconds, log_path = fut.result()
+                if code != 0:
+                    failed.add(name)
+                    results.append((name, f"failed (exit {code}, see {log_path})", seconds))
+                    continue
+                outputs = {p: file_hash(p, cache_dir) for p in stage.outputs}
+                for p, h in outputs.items():
+                    if h != "missing" and p.endswith(".csv"):
+                        store_table(p, h, cache_dir)
+                state[name] = {"key": stage_key(stage, cache_dir), "outputs": outputs,
+                               "seconds": seconds, "log": log_path}
+                save_state(state, cache_dir)
+                done.add(name)
+                results.append((name, "ran", seconds))
+    return results, state
+
+def main(argv):
+    args = list(argv)
+    workers = WORKERS
+    if "--workers" in args:
+        i = args.index("--workers")
+        workers = int(args[i + 1])
+        del args[i:i + 2]
+    flags = {a for a in args if a.startswith("--")}
+    names = [a for a in args if not a.startswith("--")]
+    if "--list" in flags:
+        deps = upstream(STAGES)
+        for s in STAGES:
+            after = f"  (after {', '.join(deps[s.name])})" if deps[s.name] else ""
+            print(f"{s.name:<11} {s.script:<28} {', '.join(s.inputs) or '-'} -> {', '.join(s.outputs) or '-'}{after}")
+        return
+    t0 = time.perf_counter()
+    results, state = run(names or None, force="--force" in flags, workers=workers, dry_run="--dry-run" in flags)
+    for name, status, seconds in results:
+        log = state.get(name, {}).get("log")
+        if status in ("ran", "cached") and log and os.path.exists(log):
+            print(f"==================== {name} ({status}) ====================")
+            with open(log) as f:
+                print(f.read().rstrip())
+    print("\nPipeline summary:")
+    for name, status, seconds in results:
+        print(f"  {name:<11} {status:<10} {seconds:7.2f} s")
+    print(f"Total wall time {time.perf_counter() - t0:.2f} s")
+    if any(s.startswith(("failed", "blocked")) for _, s, _ in results):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
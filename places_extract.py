@@ -0,0 +1,127 @@
+# places_extract.py — streaming tract extractor for the national CDC PLACES census.csv
+# usage: python places_extract.py census.csv [--tracts 40109108005,40109107900] [--tracts-file ids.txt]
+#                                 [--county 40109,40027] [--out tract_health_data.csv] [--chunksize 200000]
+# Reads the file in chunks, projects only the needed columns and keeps rows whose
+# tractfips is in a hashed set (or starts with a county FIPS prefix), so memory
+# stays bounded by the chunk size no matter how large the file is.
+import sys
+import time
+
+import pandas as pd
+
+CHUNK_ROWS = 200_000
+
+# Select useful columns — keeping key health measures
+COLUMNS_TO_KEEP = [
+    "stateabbr",
+    "countyname",
+    "tractfips",
+    "obesity_crudeprev",
+    "diabetes_crudeprev",
+    "lpa_crudeprev",
+]
+
+# Rename columns to friendlier names
+RENAME = {
+    "obesity_crudeprev": "Adult_Obesity_%",
+    "diabetes_crudeprev": "Adult_Diabetes_%",
+    "lpa_crudeprev": "% Physically_Inactive",
+}
+
+def _norm_fips(values):
+    return pd.Series(values, dtype=str).str.strip().str.zfill(11)
+
+def extract_places(path, tracts=None, prefixes=None, out_path=None, columns=COLUMNS_TO_KEEP,
+                   rename=RENAME, chunksize=CHUNK_ROWS, progress=True):
+    # returns (DataFrame of kept rows, or None when streaming to out_path, stats dict)
+    wanted = [c.lower() for c in columns]
+    tract_set = set(_norm_fips(list(tracts))) if tracts is not None else None
+    by_len = {}
+    for p in prefixes or []:
+        p = str(p).strip()
+        by_len.setdefault(len(p), set()).add(p)
+
+    reader = pd.read_csv(
+        path, encoding="utf-8", on_bad_lines="skip", dtype=str, chunksize=chunksize,
+        usecols=lambda c: c.strip().lower() in wanted,
+    )
+    kept_parts = []
+    scanned = kept = 0
+    header_written = False
+    t0 = time.perf_counter()
+    for chunk in reader:
+        # Normalize column names (makes it easier to work with)
+        chunk.columns = chunk.columns.str.strip().str.lower()
+        if "tractfips" not in chunk.columns:
+            raise SystemExit(f"'{path}' has no tractfips column")
+        scanned += len(chunk)
+        fips = _norm_fips(chunk["tractfips"])
+        mask = pd.Series(tract_set is None and not by_len, index=chunk.index)
+        if tract_set is not None:
+            mask |= fips.isin(tract_set).to_numpy()
+        for n, group in by_len.items():
+            mask |= fips.str[:n].isin(group).to_numpy()
+        if mask.any():
+            # Some columns may not exist depending on version, so only keep what's available
+            keep = mask.to_numpy()
+            present = [c for c in wanted if c in chunk.columns]
+            part = chunk.loc[keep, present].copy()
+            part["tractfips"] = fips[keep].to_numpy()
+            for c in present:
+                if c in rename:
+                    part[c] = pd.to_numeric(part[c], errors="coerce")
+            part = part.rename(columns=rename)
+            kept += len(part)
+
+            if out_path is not None:
+                part.to_csv(out_path, mode="a" if header_written else "w", header=not header_written, index=False)
+                header_written = True
+            else:
+                kept_parts.append(part)
+        if progress:
+            rate = scanned / max(time.perf_counter() - t0, 1e-9)
+            print(f"  scanned {scanned:,} rows, kept {kept:,} ({rate:,.0f} rows/s)", file=sys.stderr)
+
+    elapsed = time.perf_counter() - t0
+    stats = {"rows_scanned": scanned, "rows_kept": kept, "seconds": elapsed,
+             "rows_per_sec": scanned / elapsed if elapsed > 0 else float("inf")}
+    if out_path is not None and not header_written:
+        # still leave a valid (empty) output behind
+        pd.DataFrame(columns=[rename.get(c, c) for c in wanted]).to_csv(out_path, index=False)
+    if out_path is not None:
+        return None, stats
+    if kept_parts:
+        return pd.concat(kept_parts, ignore_index=True), stats
+    return pd.DataFrame(columns=[rename.get(c, c) for c in wanted]), stats
+
+def report(stats):
+    return (f"Scanned {stats['rows_scanned']:,} rows in {stats['seconds']:.1f}s "
+            f"({stats['rows_per_sec']:,.0f} rows/s), kept {stats['rows_kept']:,}")
+
+# ---------------- command line ----------------
+def main(argv):
+    args = list(argv)
+    opts = {}
+    for name in ("--tracts", "--tracts-file", "--county", "--out", "--chunksize"):
+        if name in args:
+            i = args.index(name)
+            opts[name] = args[i + 1]
+            del args[i:i + 2]
+    if len(args) != 1:
+        raise SystemExit("usage: python places_extract.py census.csv [--tracts IDS] [--tracts-file FILE] "
+                         "[--county PREFIXES] [--out FILE] [--chunksize N]")
+    tracts = None
+    if "--tracts" in opts or "--tracts-file" in opts:
+        tracts = [t for t in opts.get("--tracts", "").split(",") if t.strip()]
+        if "--tracts-file" in opts:
+            with open(opts["--tracts-file"]) as f:
+                tracts += [line.strip() for line in f if line.strip()]
+    prefixes = [p for p in opts.get("--county", "").split(",") if p.strip()] or None
+    out = opts.get("--out", "tract_health_data.csv")
+    _, stats = extract_places(args[0], tracts=tracts, prefixes=prefixes, out_path=out,
+                              chunksize=int(opts.get("--chunksize", CHUNK_ROWS)))
+    print(report(stats))
+    print(f"Filtered data saved to: {out}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,172 @@
+# schema.py — cached column mapping and load plan for the hand-made sheets
+# usage: python schema.py show sheet.csv [--kind datasheet|regression]
+#        python schema.py clear
+#
+# The column guessing (datasheet.detect_columns for the OKC sheet, the keyword match
+# Regression.py used for okc_data.csv) runs once per header signature instead of on
+# every run. The first load of a sheet reads it whole as strings, as before, resolves
+# the mapping and writes a small JSON profile under .nourishnet_cache/schema/ with the
+# signature, the mapping, the columns the analysis actually reads and a dtype for
+# each: float64 when every cell was a plain number, str otherwise. Later loads of the
+# same bytes (content hash, remembered per size and mtime as in atlas_cache.py) read
+# only those columns with those dtypes through pyarrow's CSV reader. Any edit to the
+# sheet is re-inferred, since a hand-typed "lat, lon" pair or a stray word can land
+# in a column the profile does not load; a changed header is also reported on stderr
+# (added/removed columns).
+import csv
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import datasheet
+import parsing
+from atlas_cache import source_hash
+
+SCHEMA_DIR = os.path.join(".nourishnet_cache", "schema")
+# keys whose columns stay strings whatever they hold (tract ids keep leading zeros)
+TEXT_KEYS = ("tract", "notes")
+_DIGITS = r"-?(\d+\.?\d*|\.\d+)"
+# Regression.py's keywords, matched as substrings of the stripped, lowercased header
+REGRESSION_KEYWORDS = ("poverty", "income", "grocery", "obesity", "diabetes", "inactive", "latitude", "tract")
+
+# ---------------- column mappings ----------------
+def regression_columns(cols):
+    # {keyword: first column containing it}, the way Regression.py's find_col matched
+    lower = [(c.strip().lower(), c) for c in cols]
+    return {k: next((c for lc, c in lower if k in lc), None) for k in REGRESSION_KEYWORDS}
+
+def _datasheet_columns(cols):
+    found = datasheet.detect_columns(cols)
+    # notes are never parsed; they are only loaded when they hold "lat, lon" pairs
+    return {**found, "notes": None}
+
+# kind: (header -> {key: column or None}, whether to look for combined "lat, lon" columns)
+KINDS = {
+    "datasheet": (_datasheet_columns, True),
+    "regression": (regression_columns, False),
+}
+
+# ---------------- header and profile files ----------------
+def read_header(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), [])
+
+def signature(columns):
+    return hashlib.sha1("\x1f".join(columns).encode()).hexdigest()[:16]
+
+def profile_path(path, kind, schema_dir=SCHEMA_DIR):
+    key = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:12]
+    return os.path.join(schema_dir, f"{kind}-{key}.json")
+
+def read_profile(path, kind, schema_dir=SCHEMA_DIR):
+    try:
+        with open(profile_path(path, kind, schema_dir)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_profile(profile, schema_dir):
+    os.makedirs(schema_dir, exist_ok=True)
+    dest = profile_path(profile["source"], profile["kind"], schema_dir)
+    tmp = dest + f".{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(profile, f, indent=1)
+    os.replace(tmp, dest)
+
+# ---------------- inference ----------------
+def _dtype(values):
+    # float64 when every present cell is a plain number parse_number would read the same way
+    present = values.dropna()
+    present = present[present.str.len() > 0]
+    return "float64" if len(present) and present.str.fullmatch(_DIGITS).all() else "str"
+
+def infer(df, path, kind, content):
+    # profile for a sheet read whole with dtype=str; content is the file's hash
+    columns_for, scan_coords = KINDS[kind]
+    cols = list(df.columns)
+    mapping = columns_for(cols)
+    coords = []
+    if scan_coords:
+        # every column holding a "lat, lon" pair, for datasheet.build_work's fallback
+        for c in cols:
+            if df[c].str.contains(",", regex=False).any():
+                lat, lon = parsing.parse_latlon(df[c])
+                if (~np.isnan(lat) & ~np.isnan(lon)).any():
+                    coords.append(c)
+    wanted = set(coords) | {c for c in mapping.values() if c is not None}
+    load = [c for c in cols if c in wanted]  # header order, as build_work scans them
+    text = {mapping[k] for k in TEXT_KEYS if mapping.get(k)}
+    return {
+        "kind": kind,
+        "source": os.path.abspath(path),
+        "signature": signature(cols),
+        "content": content,
+        "columns": cols,
+        "mapping": mapping,
+        "load": load,
+        "dtypes": {c: "str" if c in text else _dtype(df[c]) for c in load},
+        "coords": coords,
+        "created": time.time(),
+    }
+
+def _changes(old, new):
+    added = [c for c in new if c not in old]
+    removed = [c for c in old if c not in new]
+    if not added and not removed:
+        return "columns reordered or renamed in place"
+    return "; ".join(p for p in (f"added {added}" if added else "", f"removed {removed}" if removed else "") if p)
+
+# ---------------- loading ----------------
+def load_sheet(path, kind="datasheet", schema_dir=SCHEMA_DIR):
+    # (DataFrame of the columns the analysis reads, profile); profile["mapping"] is
+    # the {key: column or None} guess and profile["columns"] the full header
+    header = read_header(path)
+    content = source_hash(path, schema_dir)
+    profile = read_profile(path, kind, schema_dir)
+    if profile is not None and profile["signature"] == signature(header) and profile.get("content") == content:
+        try:
+            df = pd.read_csv(path, usecols=profile["load"], engine="pyarrow",
+                             dtype={c: float if t == "float64" else str for c, t in profile["dtypes"].items()})
+            return df[profile["load"]], profile
+        except ValueError as exc:
+            print(f"schema: '{path}' no longer fits its cached dtypes ({exc}); re-inferring", file=sys.stderr)
+    elif profile is not None and profile["signature"] != signature(header):
+        print(f"schema: header of '{path}' changed since {time.strftime('%Y-%m-%d %H:%M', time.localtime(profile['created']))} "
+              f"({_changes(profile['columns'], header)}); re-inferring the column mapping", file=sys.stderr)
+    df = pd.read_csv(path, dtype=str)
+    profile = infer(df, path, kind, content)
+    _write_profile(profile, schema_dir)
+    return df[profile["load"]], profile
+
+# ---------------- command line ----------------
+def main(argv):
+    args = list(argv)
+    kind = "datasheet"
+    if "--kind" in args:
+        i = args.index("--kind")
+        kind = args[i + 1]
+        del args[i:i + 2]
+    if args[:1] == ["clear"]:
+        shutil.rmtree(SCHEMA_DIR, ignore_errors=True)
+        print(f"Removed {SCHEMA_DIR}")
+        return
+    if len(args) != 2 or args[0] != "show" or kind not in KINDS:
+        raise SystemExit("usage: python schema.py show sheet.csv [--kind datasheet|regression]\n"
+                         "       python schema.py clear")
+    t0 = time.perf_counter()
+    df, profile = load_sheet(args[1], kind)
+    print(f"Loaded {len(df):,} rows x {df.shape[1]} of {len(profile['columns'])} columns in "
+          f"{time.perf_counter() - t0:.3f}s (profile {profile_path(args[1], kind)})")
+    for key, col in profile["mapping"].items():
+        print(f"  {key:<10} {col!s:<40} {profile['dtypes'].get(col, '')}")
+    if profile["coords"]:
+        print(f"  'lat, lon' pairs in: {profile['coords']}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
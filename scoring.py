@@ -0,0 +1,115 @@
+# scoring.py — vectorized CDC-like composite score shared by the NourishNet scripts
+import math
+
+import numpy as np
+
+W_POV = 0.35
+W_SNAP = 0.25
+W_HEALTH = 0.20
+W_DIST = 0.15
+W_INC = 0.05
+
+# column order of the indicator matrix; weights follow the same order
+INDICATORS = ("poverty", "snap", "health", "distance", "income")
+DEFAULT_WEIGHTS = np.array([W_POV, W_SNAP, W_HEALTH, W_DIST, W_INC])
+
+INCOME_CEILING = 200000.0
+
+# ---------------- helpers ----------------
+def _col(frame, key, n=None):
+    # accept DataFrames, dicts of arrays or anything indexable by column name
+    try:
+        v = frame[key]
+    except KeyError:
+        return np.full(n if n is not None else len(frame), np.nan)
+    return np.asarray(v, dtype=float)
+
+def lap_to_pct(raw, total_pop):
+    # values above 100 are treated as population counts and converted with total_pop;
+    # counts without a usable population are dropped
+    raw = np.asarray(raw, dtype=float)
+    total_pop = np.asarray(total_pop, dtype=float)
+    out = np.full(raw.shape, np.nan)
+    with np.errstate(invalid="ignore"):
+        small = raw <= 100
+        big = (raw > 100) & (total_pop > 0)
+    out[small] = raw[small]
+    out[big] = np.clip((raw[big] / total_pop[big]) * 100.0, 0.0, 100.0)
+    return out
+
+# ---------------- indicator matrix ----------------
+def indicator_matrix(frame):
+    # returns (values, mask) of shape (n, 5) in INDICATORS order;
+    # masked-out cells hold 0.0 so the matrix can be used directly in products
+    poverty = _col(frame, "poverty")
+    n = len(poverty)
+    snap = _col(frame, "snap", n)
+    income = _col(frame, "income", n)
+    lap1 = _col(frame, "lap1_pct", n)
+    lap10 = _col(frame, "lap10_pct", n)
+
+    values = np.zeros((n, len(INDICATORS)))
+    mask = np.zeros((n, len(INDICATORS)), dtype=bool)
+
+    with np.errstate(invalid="ignore"):
+        values[:, 0] = np.clip(poverty / 100.0, 0.0, 1.0)
+        values[:, 1] = np.clip(snap / 100.0, 0.0, 1.0)
+
+        # health = mean of whichever of obesity/diabetes/inactive are present (no clipping)
+        hsum = np.zeros(n)
+        hcnt = np.zeros(n)
+        for k in ("obesity", "diabetes", "inactive"):
+            v = _col(frame, k, n)
+            ok = ~np.isnan(v)
+            hsum = hsum + np.where(ok, v / 100.0, 0.0)
+            hcnt += ok
+        values[:, 2] = np.where(hcnt > 0, hsum / np.maximum(hcnt, 1), np.nan)
+
+        # distance prefers the 1-mile share and falls back to the 10-mile share
+        lap = np.where(np.isnan(lap1), lap10, lap1)
+        values[:, 3] = np.clip((100.0 - lap) / 100.0, 0.0, 1.0)
+
+        values[:, 4] = np.clip(1.0 - (income / INCOME_CEILING), 0.0, 1.0)
+
+    mask[:] = ~np.isnan(values)
+    values[~mask] = 0.0
+    return values, mask
+
+def composite_from_matrix(values, mask, weights=DEFAULT_WEIGHTS):
+    # weights are renormalized per tract over the indicators that are present.
+    # Accumulate column by column (not np.sum) so the result is bit-identical
+    # to the old per-row Python sums and ranks never flip on ties.
+    weights = np.asarray(weights, dtype=float)
+    num = np.zeros(values.shape[0])
+    den = np.zeros(values.shape[0])
+    for k in range(values.shape[1]):
+        num = num + np.where(mask[:, k], values[:, k] * weights[k], 0.0)
+        den = den + np.where(mask[:, k], weights[k], 0.0)
+    out = np.full(values.shape[0], np.nan)
+    has = den > 0
+    out[has] = num[has] / den[has]
+    return out
+
+def composite_scores(frame, weights=DEFAULT_WEIGHTS):
+    values, mask = indicator_matrix(frame)
+    return composite_from_matrix(values, mask, weights)
+
+def rank_scores(scores):
+    # same as Series.rank(method="min", ascending=False); NaN scores stay unranked
+    scores = np.asarray(scores, dtype=float)
+    ranks = np.full(scores.shape, np.nan)
+    ok = ~np.isnan(scores)
+    neg = -scores[ok]
+    ranks[ok] = np.searchsorted(np.sort(neg), neg, side="left") + 1
+    return ranks
+
+# ---------------- risk badge ----------------
+def risk_badge(score):
+    # (marker color, badge text, level) shown on the map and by tract_service.py
+    if score is None or (isinstance(score, float) and math.isnan(score)):
+        return ("gray", "⚪️ Unknown", "Unknown")
+    if score >= 0.66:
+        return ("darkred", "🔥 HIGH", "Severe")
+    if score >= 0.33:
+        return ("orange", "⚠️ MEDIUM", "Moderate")
+    return ("green", "✅ LOW", "Low")
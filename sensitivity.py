@@ -0,0 +1,152 @@
+# sensitivity.py — how much the composite ranking depends on the hand-picked weights
+# usage: python sensitivity.py scored_tracts.csv [--samples 20000] [--concentration 50] [--top 10] [--out FILE]
+#
+# Weight vectors are drawn from a Dirichlet centred on scoring.DEFAULT_WEIGHTS
+# (concentration sets how far they stray). Every tract is scored under a whole chunk
+# of them at once: with the (tracts, 5) indicator values and presence mask from
+# scoring.indicator_matrix,
+#     scores = (W @ values.T) / (W @ mask.T)
+# which is the same per-tract renormalization over present indicators that
+# composite_from_matrix does, for every sampled W in one pair of products. Ranks are
+# taken per sample (method="min", as rank_scores) and folded into per-tract rank
+# histograms and top-k counts, so memory stays flat however many samples are drawn.
+import math
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import scoring
+
+SAMPLES = 20000
+CONCENTRATION = 50.0     # Dirichlet alpha = CONCENTRATION * default weights
+TOP_K = (3, 10)
+BLOCK_CELLS = 1 << 23    # tracts x samples scored per chunk
+MAX_RANK_BINS = 2000     # exact rank histograms up to this many tracts, binned past it
+QUANTILES = (0.05, 0.5, 0.95)
+
+def sample_weights(n_samples, base=scoring.DEFAULT_WEIGHTS, concentration=CONCENTRATION, seed=None):
+    # (n_samples, 5) weight vectors summing to 1, with mean equal to the normalized base
+    base = np.asarray(base, dtype=float)
+    return np.random.default_rng(seed).dirichlet(concentration * base / base.sum(), n_samples)
+
+def scores_for(values, mask, weights):
+    # (samples, tracts) composite scores; NaN where a tract has no indicator at all
+    num = weights @ values.T
+    den = weights @ mask.T.astype(float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(den > 0, num / den, np.nan)
+
+def min_ranks(scores):
+    # per row, 1 + number of strictly higher scores (rank_scores for every sample at once);
+    # rows must be free of NaN
+    s, n = scores.shape
+    order = np.argsort(-scores, axis=1)
+    ordered = np.take_along_axis(scores, order, axis=1)
+    # within a run of tied scores every tract gets the position where the run starts
+    start = np.zeros((s, n), dtype=np.int32)
+    if n > 1:
+        start[:, 1:] = np.where(ordered[:, 1:] != ordered[:, :-1], np.arange(1, n, dtype=np.int32), 0)
+    np.maximum.accumulate(start, axis=1, out=start)
+    ranks = np.empty((s, n), dtype=np.int32)
+    np.put_along_axis(ranks, order, start + 1, axis=1)
+    return ranks
+
+def _quantile_from_counts(counts, edges, q):
+    # rank at quantile q from a (tracts, bins) histogram whose bin b starts at edges[b]
+    cum = np.cumsum(counts, axis=1)
+    target = q * cum[:, -1:]
+    return edges[np.argmax(cum >= np.maximum(target, 1), axis=1)]
+
+def rank_stability(frame, n_samples=SAMPLES, concentration=CONCENTRATION, top_k=TOP_K, seed=None,
+                   base=scoring.DEFAULT_WEIGHTS):
+    # returns (per-tract DataFrame in frame order, stats dict)
+    t0 = time.perf_counter()
+    values, mask = scoring.indicator_matrix(frame)
+    base = np.asarray(base, dtype=float)
+    default = scoring.composite_from_matrix(values, mask, base)
+    ok = mask.any(axis=1)
+    v, m = values[ok], mask[ok]
+    n = int(ok.sum())
+    top_k = tuple(k for k in top_k if k <= n)
+    width = max(1, math.ceil(n / MAX_RANK_BINS))
+    bins = math.ceil(n / width)
+    hist = np.zeros(n * bins, dtype=np.int64)
+    rank_sum = np.zeros(n)
+    rank_min = np.full(n, np.iinfo(np.int64).max)
+    rank_max = np.zeros(n, dtype=np.int64)
+    in_top = {k: np.zeros(n, dtype=np.int64) for k in top_k}
+    # how often the default top-k set comes out unchanged
+    default_rank = scoring.rank_scores(default[ok])
+    default_top = {k: default_rank <= k for k in top_k}
+    same_top = {k: 0 for k in top_k}
+
+    rng = np.random.default_rng(seed)
+    chunk = max(1, BLOCK_CELLS // max(n, 1))
+    cols = np.arange(n) * bins
+    for s0 in range(0, n_samples if n else 0, chunk):
+        W = sample_weights(min(chunk, n_samples - s0), base, concentration, rng)
+        ranks = min_ranks(scores_for(v, m, W))
+        hist += np.bincount((cols + (ranks - 1) // width).ravel(), minlength=n * bins)
+        rank_sum += ranks.sum(axis=0)
+        np.minimum(rank_min, ranks.min(axis=0), out=rank_min)
+        np.maximum(rank_max, ranks.max(axis=0), out=rank_max)
+        for k in top_k:
+            inside = ranks <= k
+            in_top[k] += inside.sum(axis=0)
+            same_top[k] += int((inside == default_top[k]).all(axis=1).sum())
+
+    out = pd.DataFrame(index=pd.RangeIndex(len(values)))
+    if "Tract_FIPS" in getattr(frame, "columns", ()):
+        out["Tract_FIPS"] = np.asarray(frame["Tract_FIPS"])
+    out["score"] = default
+    out["rank"] = scoring.rank_scores(default)
+    counts = hist.reshape(n, bins)
+    edges = np.arange(bins) * width + 1
+    full = lambda a: pd.Series(a, index=np.flatnonzero(ok), dtype=float).reindex(out.index)
+    if n_samples and n:
+        out["mean_rank"] = full(rank_sum / n_samples)
+        for q in QUANTILES:
+            out[f"rank_p{round(q * 100)}"] = full(_quantile_from_counts(counts, edges, q))
+        out["best_rank"] = full(rank_min)
+        out["worst_rank"] = full(rank_max)
+        for k in top_k:
+            out[f"p_top{k}"] = full(in_top[k] / n_samples)
+    stats = {"tracts": len(values), "scored": n, "samples": n_samples, "concentration": concentration,
+             "rank_bin_width": width, "seconds": time.perf_counter() - t0,
+             "same_top": {k: same_top[k] / n_samples for k in top_k} if n_samples else {}}
+    return out, stats
+
+def report(stats):
+    same = ", ".join(f"top-{k} {p:.1%}" for k, p in stats["same_top"].items())
+    return (f"Weight sensitivity: {stats['samples']:,} Dirichlet weight draws (concentration "
+            f"{stats['concentration']:g}) over {stats['scored']:,} tracts in {stats['seconds']:.2f}s; "
+            f"default set unchanged in {same or 'n/a'}")
+
+# ---------------- command line ----------------
+def main(argv):
+    args = list(argv)
+    opts = {}
+    for name in ("--samples", "--concentration", "--top", "--seed", "--out"):
+        if name in args:
+            i = args.index(name)
+            opts[name] = args[i + 1]
+            del args[i:i + 2]
+    if len(args) != 1:
+        raise SystemExit("usage: python sensitivity.py scored_tracts.csv [--samples N] [--concentration C] "
+                         "[--top K] [--seed S] [--out FILE]")
+    work = pd.read_csv(args[0], dtype={"Tract_FIPS": str})
+    top = int(opts.get("--top", 10))
+    table, stats = rank_stability(work, int(opts.get("--samples", SAMPLES)),
+                                  float(opts.get("--concentration", CONCENTRATION)),
+                                  top_k=tuple(sorted({3, top})),
+                                  seed=int(opts["--seed"]) if "--seed" in opts else None)
+    print(report(stats))
+    print(table.sort_values("rank").head(top).round(3).to_string(index=False))
+    out = opts.get("--out", "weight_sensitivity.csv")
+    table.sort_values("rank", na_position="last").to_csv(out, index=False)
+    print(f"Wrote {len(table)} tracts to {out}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,283 @@
+# site_selection.py — pantry site selection over tract centroids (p-median / maximal coverage)
+# usage: python site_selection.py scored_tracts.csv candidate_sites.csv [-p 10]
+#                                 [--model p-median|coverage] [--radius-km 3] [--out pantry_sites.csv]
+#
+# Demand points are tract centroids weighted by population x composite need.
+# Distances come from a KD-tree on unit-sphere vectors: each demand point only
+# keeps its k nearest candidates (p-median) or the candidates within the radius
+# (coverage), so nothing ever builds an all-pairs matrix. Both models use a
+# greedy pass with lazy (CELF) gain evaluation followed by a swap local search.
+import heapq
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from geo import chord_to_km, find_latlon_columns, km_to_chord, unit_xyz
+
+K_NEIGHBORS = 25        # candidate sites kept per demand point for p-median
+SWAP_NEIGHBORS = 10     # replacement candidates tried around each open site
+COVERAGE_RADIUS_KM = 3.0
+TIME_BUDGET = 10.0      # seconds of local search
+
+MODELS = ("p-median", "coverage")
+# columns select_sites adds to the chosen candidates, and of its per-tract assignment
+SITE_COLUMNS = ["pick_order", "tracts_served", "demand_served", "mean_km"]
+ASSIGN_COLUMNS = ["Tract_FIPS", "site", "distance_km", "weight"]
+
+# ---------------- inputs ----------------
+def demand_weights(work):
+    # population x composite need; missing population counts as the median tract
+    pop = pd.to_numeric(work.get("total_pop"), errors="coerce") if "total_pop" in work else pd.Series(1.0, index=work.index)
+    pop = pop.fillna(pop.median() if pop.notna().any() else 1.0)
+    need = pd.to_numeric(work["composite_score"], errors="coerce").fillna(0.0)
+    return (pop * need).to_numpy(dtype=float)
+
+def load_candidates(path):
+    cand = pd.read_csv(path)
+    lat_col, lon_col = find_latlon_columns(cand.columns)
+    if lat_col is None or lon_col is None:
+        raise SystemExit(f"'{path}' needs latitude/longitude columns")
+    name_col = next((c for c in cand.columns if c.strip().lower() in ("name", "site", "site_name", "address")), None)
+    out = pd.DataFrame({
+        "name": cand[name_col].astype(str) if name_col else [f"site {i + 1}" for i in range(len(cand))],
+        "lat": pd.to_numeric(cand[lat_col], errors="coerce"),
+        "lon": pd.to_numeric(cand[lon_col], errors="coerce"),
+    })
+    return out.dropna(subset=["lat", "lon"]).reset_index(drop=True)
+
+def _csr(owner, members, values, n_owners):
+    # group (owner, member, value) triples by owner into CSR-style arrays
+    order = np.argsort(owner, kind="stable")
+    ptr = np.zeros(n_owners + 1, dtype=np.int64)
+    np.cumsum(np.bincount(owner, minlength=n_owners), out=ptr[1:])
+    return ptr, members[order], values[order]
+
+# ---------------- problem ----------------
+class SiteProblem:
+    def __init__(self, demand_lat, demand_lon, weights, cand_lat, cand_lon, k=K_NEIGHBORS):
+        self.w = np.asarray(weights, dtype=float)
+        self.d_xyz = unit_xyz(demand_lat, demand_lon)
+        self.c_xyz = unit_xyz(cand_lat, cand_lon)
+        self.n, self.m = len(self.d_xyz), len(self.c_xyz)
+        self.cand_tree = cKDTree(self.c_xyz)
+        self.k = min(k, self.m)
+        chord, idx = self.cand_tree.query(self.d_xyz, self.k)
+        self.dist = chord_to_km(chord).reshape(self.n, self.k)
+        self.idx = np.asarray(idx).reshape(self.n, self.k)
+        # demand whose k nearest candidates are all closed is charged the k-th distance
+        self.fallback = self.dist[:, -1].copy()
+        demand = np.repeat(np.arange(self.n), self.k)
+        self.ptr, self.c_dem, self.c_dist = _csr(self.idx.ravel(), demand, self.dist.ravel(), self.m)
+
+    # ---------------- p-median ----------------
+    def pmedian_cost(self, open_mask):
+        d = np.where(open_mask[self.idx], self.dist, np.inf).min(axis=1)
+        d = np.where(np.isinf(d), self.fallback, d)
+        return float(np.dot(self.w, d))
+
+    def _pm_gain(self, j, cur):
+        s, e = self.ptr[j], self.ptr[j + 1]
+        i = self.c_dem[s:e]
+        return float(np.dot(self.w[i], np.maximum(cur[i] - self.c_dist[s:e], 0.0)))
+
+    def greedy_pmedian(self, p):
+        cur = self.fallback.copy()
+        cand_of_entry = np.repeat(np.arange(self.m), np.diff(self.ptr))
+        gains = np.bincount(cand_of_entry, self.w[self.c_dem] * np.maximum(cur[self.c_dem] - self.c_dist, 0.0), minlength=self.m)
+        heap = [(-g, j, 0) for j, g in enumerate(gains)]
+        heapq.heapify(heap)
+        chosen = []
+        while heap and len(chosen) < p:
+            neg, j, stamp = heapq.heappop(heap)
+            if stamp == len(chosen):
+                chosen.append(j)
+                s, e = self.ptr[j], self.ptr[j + 1]
+                i = self.c_dem[s:e]
+                cur[i] = np.minimum(cur[i], self.c_dist[s:e])
+            else:
+                # gains only shrink as sites open (submodular), so a stale bound is safe to re-check lazily
+                heapq.heappush(heap, (-self._pm_gain(j, cur), j, len(chosen)))
+        return chosen
+
+    # ---------------- maximal coverage ----------------
+    def build_coverage(self, radius_km):
+        dem_tree = cKDTree(self.d_xyz)
+        lists = dem_tree.query_ball_point(self.c_xyz, float(km_to_chord(radius_km)))
+        sizes = np.fromiter((len(x) for x in lists), dtype=np.int64, count=self.m)
+        self.cov_ptr = np.zeros(self.m + 1, dtype=np.int64)
+        np.cumsum(sizes, out=self.cov_ptr[1:])
+        self.cov_dem = np.fromiter((i for x in lists for i in x), dtype=np.int64, count=int(sizes.sum()))
+
+    def _cov(self, j):
+        return self.cov_dem[self.cov_ptr[j]:self.cov_ptr[j + 1]]
+
+    def coverage(self, open_sites):
+        cnt = np.zeros(self.n, dtype=np.int64)
+        for j in open_sites:
+            cnt[self._cov(j)] += 1
+        return cnt
+
+    def greedy_coverage(self, p):
+        cnt = np.zeros(self.n, dtype=np.int64)
+        cand_of_entry = np.repeat(np.arange(self.m), np.diff(self.cov_ptr))
+        gains = np.bincount(cand_of_entry, self.w[self.cov_dem], minlength=self.m)
+        heap = [(-g, j, 0) for j, g in enumerate(gains)]
+        heapq.heapify(heap)
+        chosen = []
+        while heap and len(chosen) < p:
+            neg, j, stamp = heapq.heappop(heap)
+            if stamp == len(chosen):
+                chosen.append(j)
+                cnt[self._cov(j)] += 1
+            else:
+                i = self._cov(j)
+                heapq.heappush(heap, (-float(self.w[i][cnt[i] == 0].sum()), j, len(chosen)))
+        return chosen
+
+    # ---------------- local search ----------------
+    def _swap_candidates(self, r, open_mask):
+        kk = min(SWAP_NEIGHBORS + 1, self.m)
+        _, near = self.cand_tree.query(self.c_xyz[r], kk)
+        return [int(c) for c in np.atleast_1d(near) if not open_mask[c]]
+
+    def improve_pmedian(self, chosen, time_budget=TIME_BUDGET):
+        open_mask = np.zeros(self.m, dtype=bool)
+        open_mask[chosen] = True
+        best = self.pmedian_cost(open_mask)
+        deadline = time.perf_counter() + time_budget
+        improved = True
+        while improved and time.perf_counter() < deadline:
+            improved = False
+            for pos, r in enumerate(list(chosen)):
+                for c in self._swap_candidates(r, open_mask):
+                    open_mask[r], open_mask[c] = False, True
+                    cost = self.pmedian_cost(open_mask)
+                    if cost < best - 1e-9:
+                        best, chosen[pos], r, improved = cost, c, c, True
+                    else:
+                        open_mask[r], open_mask[c] = True, False
+                if time.perf_counter() >= deadline:
+                    break
+        return chosen, best
+
+    def improve_coverage(self, chosen, time_budget=TIME_BUDGET):
+        open_mask = np.zeros(self.m, dtype=bool)
+        open_mask[chosen] = True
+        cnt = self.coverage(chosen)
+        deadline = time.perf_counter() + time_budget
+        improved = True
+        while improved and time.perf_counter() < deadline:
+            improved = False
+            for pos, r in enumerate(list(chosen)):
+                ir = self._cov(r)
+                cnt[ir] -= 1
+                loss = float(self.w[ir][cnt[ir] == 0].sum())
+                best_c, best_gain = None, loss + 1e-9
+                for c in self._swap_candidates(r, open_mask):
+                    ic = self._cov(c)
+                    g = float(self.w[ic][cnt[ic] == 0].sum())
+                    if g > best_gain:
+                        best_c, best_gain = c, g
+                if best_c is None:
+                    cnt[ir] += 1
+                    continue
+                cnt[self._cov(best_c)] += 1
+                open_mask[r], open_mask[best_c] = False, True
+                chosen[pos] = best_c
+                improved = True
+                if time.perf_counter() >= deadline:
+                    break
+        return chosen, float(self.w[cnt > 0].sum())
+
+# ---------------- driver ----------------
+def select_sites(work, candidates, p, model="p-median", radius_km=COVERAGE_RADIUS_KM,
+                 k=K_NEIGHBORS, time_budget=TIME_BUDGET):
+    # returns (chosen sites DataFrame, per-tract assignment DataFrame, stats dict)
+    if model not in MODELS:
+        raise ValueError(f"unknown model {model!r}; expected one of {MODELS}")
+    ok = work["lat"].notna() & work["lon"].notna()
+    dem = work[ok].reset_index(drop=True)
+    w = demand_weights(dem)
+    p = min(p, len(candidates))
+    if p == 0 or dem.empty:
+        # nothing to place or no one to serve: empty frames with the usual columns
+        note = ("no candidate site has coordinates" if len(candidates) == 0
+                else "no tract has coordinates" if dem.empty else "no sites requested")
+        sites = candidates.iloc[:0].reindex(columns=[*candidates.columns, *SITE_COLUMNS])
+        stats = {"model": model, "p": 0, "demand_points": len(dem), "candidates": len(candidates), "note": note}
+        return sites.reset_index(drop=True), pd.DataFrame(columns=ASSIGN_COLUMNS), stats
+
+    t0 = time.perf_counter()
+    prob = SiteProblem(dem["lat"], dem["lon"], w, candidates["lat"], candidates["lon"], k=k)
+    if model == "p-median":
+        chosen = prob.greedy_pmedian(p)
+        open_mask = np.zeros(prob.m, dtype=bool)
+        open_mask[chosen] = True
+        greedy_obj = prob.pmedian_cost(open_mask)
+        chosen, obj = prob.improve_pmedian(chosen, time_budget)
+    else:
+        prob.build_coverage(radius_km)
+        chosen = prob.greedy_coverage(p)
+        greedy_obj = float(w[prob.coverage(chosen) > 0].sum())
+        chosen, obj = prob.improve_coverage(chosen, time_budget)
+    elapsed = time.perf_counter() - t0
+
+    # exact nearest chosen site for every tract (not limited to the k-nearest lists)
+    chord, nearest = cKDTree(prob.c_xyz[chosen]).query(prob.d_xyz)
+    km = chord_to_km(chord)
+    assign = pd.DataFrame({
+        "Tract_FIPS": dem["Tract_FIPS"] if "Tract_FIPS" in dem else np.arange(len(dem)),
+        "site": np.asarray(chosen)[nearest],
+        "distance_km": km,
+        "weight": w,
+    })
+    sites = candidates.iloc[chosen].copy()
+    sites["pick_order"] = np.arange(1, len(chosen) + 1)
+    grouped = assign.groupby("site")
+    sites["tracts_served"] = grouped.size().reindex(chosen).fillna(0).astype(int).to_numpy()
+    sites["demand_served"] = grouped["weight"].sum().reindex(chosen).fillna(0).to_numpy()
+    wkm = (assign["weight"] * assign["distance_km"]).groupby(assign["site"]).sum().reindex(chosen).to_numpy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sites["mean_km"] = wkm / sites["demand_served"].to_numpy()
+    if model == "coverage":
+        sites["covered_within_km"] = radius_km
+    stats = {"model": model, "p": p, "demand_points": prob.n, "candidates": prob.m,
+             "greedy_objective": greedy_obj, "objective": obj, "seconds": elapsed}
+    return sites.reset_index(drop=True), assign, stats
+
+def report(stats):
+    if "note" in stats:
+        return f"{stats['model']}: no sites selected ({stats['note']})"
+    what = "weighted km" if stats["model"] == "p-median" else "covered demand"
+    return (f"{stats['model']}: {stats['p']} sites from {stats['candidates']:,} candidates for "
+            f"{stats['demand_points']:,} tracts in {stats['seconds']:.2f}s; {what} "
+            f"{stats['greedy_objective']:,.1f} (greedy) -> {stats['objective']:,.1f} (after swaps)")
+
+# ---------------- command line ----------------
+def main(argv):
+    args = list(argv)
+    opts = {}
+    for name in ("-p", "--model", "--radius-km", "--out"):
+        if name in args:
+            i = args.index(name)
+            opts[name] = args[i + 1]
+            del args[i:i + 2]
+    if len(args) != 2:
+        raise SystemExit("usage: python site_selection.py scored_tracts.csv candidate_sites.csv "
+                         "[-p N] [--model p-median|coverage] [--radius-km R] [--out FILE]")
+    work = pd.read_csv(args[0], dtype={"Tract_FIPS": str})
+    lat_col, lon_col = find_latlon_columns(work.columns)
+    work = work.rename(columns={lat_col: "lat", lon_col: "lon"})
+    sites, _assign, stats = select_sites(work, load_candidates(args[1]), int(opts.get("-p", 10)),
+                                         model=opts.get("--model", "p-median"),
+                                         radius_km=float(opts.get("--radius-km", COVERAGE_RADIUS_KM)))
+    print(report(stats))
+    out = opts.get("--out", "pantry_sites.csv")
+    sites.to_csv(out, index=False)
+    print(f"Wrote {len(sites)} sites to {out}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
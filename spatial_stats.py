@@ -0,0 +1,182 @@
+# spatial_stats.py — batched permutation inference for global Moran's I, LISA and Getis-Ord Gi*
+# Several variables share one weights matrix and one set of random draws:
+#   global Moran's I — every permutation chunk is a single sparse W x (n, perms*vars) product
+#   Local Moran / Gi* — conditional randomization: each permutation draws one set of
+#                       k+1 distinct sites shared by all tracts, so the random spatial lags
+#                       of a row block are one dense (rows, k) x (k, perms*vars) product
+#                       plus a sparse correction where a tract drew itself
+# Permutation chunks are independent and can run in worker processes.
+# Statistics and pseudo p-values follow esda (Moran, Moran_Local, G_Local star=True, "directed").
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+PERMUTATIONS = 999
+CHUNK = 128              # permutations per task
+BLOCK_CELLS = 1 << 23    # rows x permutations x variables held at once
+QUADS = {1: "HH", 2: "LH", 3: "LL", 4: "HL"}
+
+# ---------------- weights ----------------
+def _neighbour_table(W):
+    # (self weights, (n, kmax) other-neighbour weights padded with 0, cardinalities)
+    W = sp.csr_matrix(W, dtype=float)
+    selfw = W.diagonal()
+    off = W - sp.diags(selfw)
+    off.eliminate_zeros()
+    off.sort_indices()
+    card = np.diff(off.indptr)
+    kmax = int(card.max()) if len(card) else 0
+    pos = np.zeros((W.shape[0], kmax))
+    slot = np.arange(off.nnz) - np.repeat(off.indptr[:-1], card)
+    pos[np.repeat(np.arange(W.shape[0]), card), slot] = off.data
+    return selfw, pos, card
+
+# ---------------- permutation chunks ----------------
+_STATE = {}
+
+def _init_worker(state):
+    _STATE.clear()
+    _STATE.update(state)
+
+def _draws(rng, n, k, size):
+    # size rows of k distinct site indices
+    if n * size <= 1 << 22:
+        return np.argsort(rng.random((size, n)), axis=1)[:, :k]
+    d = rng.integers(0, n, (size, k))
+    while True:
+        s = np.sort(d, axis=1)
+        bad = (s[:, 1:] == s[:, :-1]).any(axis=1)
+        if not bad.any():
+            return d
+        d[bad] = rng.integers(0, n, (int(bad.sum()), k))
+
+def _random_lags(pos, sub, r0, r1, draws, vals, k):
+    # random lags (rows, perms, vars) of rows r0:r1 for one set of draws.
+    # Each draw has k+1 sites; a tract that drew itself swaps in the spare last site.
+    rows, nperm, nvar = r1 - r0, draws.shape[0], vals.shape[1]
+    vd = vals[draws]                                          # (perms, k+1, vars)
+    lag = (pos[r0:r1] @ vd[:, :k, :].transpose(1, 0, 2).reshape(k, nperm * nvar)).reshape(rows, nperm, nvar)
+    for c in range(k):
+        s = draws[:, c]
+        b = np.nonzero((s >= r0) & (s < r1))[0]
+        if len(b):
+            s = s[b]
+            lag[s - r0, b] += pos[s, c][:, None] * (vd[b, k, :] - sub[s])
+    return lag
+
+def _run_chunk(task):
+    seed, nperm = task
+    st = _STATE
+    rng = np.random.default_rng(seed)
+    Z, Y, W = st["Z"], st["Y"], st["W"]
+    n, nvar = Z.shape
+    k = st["pos"].shape[1]
+
+    # global Moran: full random relabelling, one sparse product per sub-chunk
+    I_rand = np.empty((nperm, nvar))
+    step = max(1, BLOCK_CELLS // (n * nvar))
+    for b0 in range(0, nperm, step):
+        b1 = min(nperm, b0 + step)
+        perm = rng.permuted(np.tile(np.arange(n)[:, None], (1, b1 - b0)), axis=0)
+        zp = Z[perm].reshape(n, -1)                           # (n, perms*vars)
+        num = np.einsum("ij,ij->j", zp, W @ zp).reshape(b1 - b0, nvar)
+        I_rand[b0:b1] = st["n_over_s0"] * num / st["den"]
+
+    # local statistics: conditional randomization with shared draws
+    larger_lisa = np.zeros((n, nvar), dtype=np.int64)
+    larger_gi = np.zeros((n, nvar), dtype=np.int64)
+    if k:
+        draws = _draws(rng, n, k + 1, nperm)
+        rows = max(1, BLOCK_CELLS // (nperm * nvar))
+        for r0 in range(0, n, rows):
+            r1 = min(n, r0 + rows)
+            z, y = Z[r0:r1, None, :], Y[r0:r1, None, :]
+            lag = _random_lags(st["pos"], Z, r0, r1, draws, Z, k)
+            lag += st["selfw"][r0:r1, None, None] * z
+            larger_lisa[r0:r1] = (z * lag * st["lisa_scale"] >= st["Is"][r0:r1, None, :]).sum(axis=1)
+            glag = _random_lags(st["bin"], Y, r0, r1, draws, Y, k)
+            larger_gi[r0:r1] = ((glag + y) / st["ysum"] >= st["Gs"][r0:r1, None, :]).sum(axis=1)
+    return I_rand, larger_lisa, larger_gi
+
+def _directed_p(larger, permutations):
+    larger = np.where(permutations - larger < larger, permutations - larger, larger)
+    return (larger + 1.0) / (permutations + 1.0)
+
+# ---------------- driver ----------------
+def autocorrelation(values, W, names=None, permutations=PERMUTATIONS, seed=None, workers=1, chunk=CHUNK):
+    # values: (n, vars) without missing cells; W: row-standardized sparse weights
+    # (see spatial_weights.py).
+    # Returns (global DataFrame indexed by variable, local DataFrame with one row per tract).
+    Y = np.asarray(values, dtype=float)
+    if Y.ndim == 1:
+        Y = Y[:, None]
+    n, nvar = Y.shape
+    names = list(names) if names is not None else [f"v{j}" for j in range(nvar)]
+    if np.isnan(Y).any():
+        raise ValueError("values contain NaN; drop incomplete rows before building the weights")
+    W = sp.csr_matrix(W, dtype=float)
+
+    Z = (Y - Y.mean(axis=0)) / Y.std(axis=0)
+    den = (Z * Z).sum(axis=0)
+    lag = W @ Z
+    I = n / W.sum() * (Z * lag).sum(axis=0) / den
+    Is = (n - 1) * Z * lag / den
+    zp, lp = Z > 0, lag > 0
+    quad = np.where(zp, np.where(lp, 1, 4), np.where(lp, 2, 3))
+
+    # Gi*: binary neighbours plus the tract itself, analytic z-scores as in esda
+    selfw, pos, _card = _neighbour_table(W)
+    binary = (pos != 0).astype(float)
+    ysum = Y.sum(axis=0)
+    B = sp.csr_matrix((W != 0) + sp.identity(n, format="csr"), dtype=float)
+    Gs = (B @ Y) / ysum
+    cg = np.asarray(B.sum(axis=1)).ravel()[:, None]
+    mean = ysum / n
+    var = (Y ** 2).sum(axis=0) / n - mean ** 2
+    VG = cg * (n - cg) / (n - 1) / n ** 2 * var / mean ** 2
+    Gz = (Gs - cg / n) / np.sqrt(VG)
+
+    state = {"Z": Z, "Y": Y, "W": W, "pos": pos, "bin": binary, "selfw": selfw,
+             "den": den, "n_over_s0": n / W.sum(), "lisa_scale": (n - 1) / den,
+             "Is": Is, "Gs": Gs, "ysum": ysum}
+    sizes = [min(chunk, permutations - b) for b in range(0, permutations, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = list(zip(seeds, sizes))
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(state,)) as pool:
+            results = list(pool.map(_run_chunk, tasks))
+    else:
+        _init_worker(state)
+        results = [_run_chunk(t) for t in tasks]
+    _STATE.clear()
+
+    I_rand = np.concatenate([r[0] for r in results]) if results else np.empty((0, nvar))
+    larger = (I_rand >= I).sum(axis=0)
+    EI_sim, seI_sim = I_rand.mean(axis=0), I_rand.std(axis=0)
+    glob = pd.DataFrame({
+        "I": I, "EI": -1.0 / (n - 1), "EI_sim": EI_sim,
+        "z_sim": (I - EI_sim) / seI_sim, "p_sim": _directed_p(larger, permutations),
+    }, index=pd.Index(names, name="variable"))
+
+    lisa_p = _directed_p(sum(r[1] for r in results), permutations)
+    gi_p = _directed_p(sum(r[2] for r in results), permutations)
+    cols = {}
+    for j, v in enumerate(names):
+        cols[f"{v}_Is"] = Is[:, j]
+        cols[f"{v}_q"] = quad[:, j]
+        cols[f"{v}_p"] = lisa_p[:, j]
+        cols[f"{v}_Gi_z"] = Gz[:, j]
+        cols[f"{v}_Gi_p"] = gi_p[:, j]
+    return glob, pd.DataFrame(cols)
+
+def hot_spots(local, name, alpha=0.05):
+    # "hot" / "cold" where Gi* is significant at alpha, "" elsewhere
+    z, p = local[f"{name}_Gi_z"].to_numpy(), local[f"{name}_Gi_p"].to_numpy()
+    return np.where(p < alpha, np.where(z > 0, "hot", "cold"), "")
+
+def clusters(local, name, alpha=0.05):
+    # LISA cluster labels (HH, LH, LL, HL) where significant at alpha, "" elsewhere
+    q, p = local[f"{name}_q"].to_numpy(), local[f"{name}_p"].to_numpy()
+    return np.where(p < alpha, pd.Series(q).map(QUADS).fillna("").to_numpy(), "")
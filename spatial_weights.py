@@ -0,0 +1,219 @@
+# spatial_weights.py — KD-tree spatial weights as CSR matrices, cached on disk
+# usage: python spatial_weights.py coords.csv [knn|band|kernel] [--k 4] [--threshold D] [--geographic]
+#
+# Weights are built straight from cKDTree queries into scipy.sparse CSR matrices
+# (no dict-of-lists). cached() stores each matrix in .nourishnet_cache/weights as
+# .npy buffers in a directory keyed by a hash of the coordinates, the kind and the
+# parameters; later runs memory-map them instead of rebuilding. to_libpysal()
+# converts back to a libpysal W for code that still needs one.
+import hashlib
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.spatial import cKDTree
+
+from geo import chord_to_km, find_latlon_columns, km_to_chord, unit_xyz
+
+CACHE_DIR = os.path.join(".nourishnet_cache", "weights")
+KINDS = ("knn", "band", "kernel")
+KERNELS = ("triangular", "uniform", "quadratic", "quartic", "gaussian", "bisquare")
+
+# ---------------- geometry ----------------
+def _points(x, y, geographic):
+    # KD-tree points and a function turning tree distances into output distances.
+    # Planar coordinates are used as given (libpysal's default); geographic ones
+    # (x=lon, y=lat) go on the unit sphere and distances come back in km.
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if geographic:
+        return unit_xyz(y, x), chord_to_km, km_to_chord
+    same = lambda d: np.asarray(d, dtype=float)
+    return np.column_stack([x, y]), same, same
+
+def _knn_table(pts, k):
+    # (n, k) neighbour indices and tree distances, excluding each point itself
+    n = len(pts)
+    dist, idx = cKDTree(pts).query(pts, k + 1)
+    self_hit = idx == np.arange(n)[:, None]
+    # normally column 0; when points coincide the point itself may sit elsewhere (or not appear)
+    drop = np.where(self_hit.any(axis=1), self_hit.argmax(axis=1), k)
+    keep = np.ones_like(self_hit)
+    keep[np.arange(n), drop] = False
+    return idx[keep].reshape(n, k), dist[keep].reshape(n, k)
+
+def row_standardize(W):
+    W = sp.csr_matrix(W, dtype=float, copy=True)
+    rs = np.asarray(W.sum(axis=1)).ravel()
+    scale = np.divide(1.0, rs, out=np.zeros_like(rs), where=rs != 0)
+    W.data *= np.repeat(scale, np.diff(W.indptr))
+    return W
+
+def _finish(W, transform):
+    W = sp.csr_matrix(W, dtype=float)
+    W.sum_duplicates()
+    W.sort_indices()
+    if transform.upper() == "R":
+        return row_standardize(W)
+    if transform.upper() != "B":
+        raise ValueError(f"unknown transform {transform!r}; expected 'R' or 'B'")
+    return W
+
+# ---------------- builders ----------------
+def knn(x, y, k=4, transform="R", geographic=False):
+    # k nearest neighbours, like libpysal KNN.from_array
+    pts, _, _ = _points(x, y, geographic)
+    n = len(pts)
+    idx, _ = _knn_table(pts, k)
+    W = sp.csr_matrix((np.ones(n * k), idx.ravel(), np.arange(0, n * k + 1, k)), shape=(n, n))
+    return _finish(W, transform)
+
+def distance_band(x, y, threshold, binary=True, alpha=-1.0, transform="R", geographic=False):
+    # neighbours within threshold (km when geographic); inverse-distance d**alpha when not binary
+    pts, to_out, to_tree = _points(x, y, geographic)
+    n = len(pts)
+    tree = cKDTree(pts)
+    D = tree.sparse_distance_matrix(tree, float(to_tree(threshold)), output_type="coo_matrix")
+    off = D.row != D.col
+    rows, cols, d = D.row[off], D.col[off], to_out(D.data[off])
+    if binary:
+        vals = np.ones(len(rows))
+    else:
+        with np.errstate(divide="ignore"):
+            vals = np.where(d > 0, d ** alpha, 0.0)
+    return _finish(sp.coo_matrix((vals, (rows, cols)), shape=(n, n)), transform)
+
+def _kernel(z, function):
+    # z = d / bandwidth in [0, 1]
+    if function == "triangular":
+        return 1.0 - z
+    if function == "uniform":
+        return np.full_like(z, 0.5)
+    if function == "quadratic":
+        return 0.75 * (1.0 - z ** 2)
+    if function == "quartic":
+        return (15.0 / 16.0) * (1.0 - z ** 2) ** 2
+    if function == "gaussian":
+        return np.exp(-0.5 * z ** 2) / np.sqrt(2.0 * np.pi)
+    if function == "bisquare":
+        return (1.0 - z ** 2) ** 2
+    raise ValueError(f"unknown kernel {function!r}; expected one of {KERNELS}")
+
+def kernel(x, y, k=8, function="triangular", bandwidth=None, diagonal=True, transform="B", geographic=False):
+    # kernel weights over each point's k nearest neighbours. Adaptive by default:
+    # each point's bandwidth is the distance to its k-th neighbour (libpysal Kernel
+    # fixed=False); pass bandwidth for one fixed value. The diagonal holds K(0) unless
+    # diagonal=False.
+    pts, to_out, _ = _points(x, y, geographic)
+    n = len(pts)
+    idx, dist = _knn_table(pts, k)
+    d = to_out(dist)
+    # like libpysal, nudge the adaptive bandwidth so the k-th neighbour keeps a tiny weight
+    bw = np.full(n, float(bandwidth)) if bandwidth is not None else d[:, -1] * 1.0000001
+    bw[bw <= 0] = np.finfo(float).eps
+    z = d / bw[:, None]
+    vals = np.where(z < 1.0, _kernel(np.minimum(z, 1.0), function), 0.0) if function != "gaussian" else _kernel(z, function)
+    rows = np.repeat(np.arange(n), k)
+    W = sp.coo_matrix((vals.ravel(), (rows, idx.ravel())), shape=(n, n))
+    if diagonal:
+        W = W + sp.diags(np.full(n, float(_kernel(np.zeros(1), function)[0])))
+    W = sp.csr_matrix(W)
+    W.eliminate_zeros()
+    return _finish(W, transform)
+
+BUILDERS = {"knn": knn, "band": distance_band, "kernel": kernel}
+
+# ---------------- cache ----------------
+def weights_key(kind, x, y, params):
+    pts = np.round(np.column_stack([np.asarray(x, dtype=float), np.asarray(y, dtype=float)]), 7)
+    h = hashlib.sha256(pts.tobytes())
+    h.update(json.dumps({"kind": kind, **params}, sort_keys=True, default=str).encode())
+    return h.hexdigest()[:24]
+
+PARTS = ("data", "indices", "indptr")
+
+def save(W, path):
+    # one directory of plain .npy buffers, so np.load can memory-map each of them
+    W = sp.csr_matrix(W)
+    tmp = path + f".{os.getpid()}.tmp"
+    os.makedirs(tmp, exist_ok=True)
+    for name in PARTS:
+        np.save(os.path.join(tmp, name + ".npy"), getattr(W, name))
+    np.save(os.path.join(tmp, "shape.npy"), np.array(W.shape))
+    try:
+        os.replace(tmp, path)
+    except OSError:
+        # another process stored the same weights first
+        for name in PARTS + ("shape",):
+            os.remove(os.path.join(tmp, name + ".npy"))
+        os.rmdir(tmp)
+
+def load(path, mmap=True):
+    # CSR matrix whose buffers are memory-mapped from the cache
+    mode = "r" if mmap else None
+    parts = [np.load(os.path.join(path, name + ".npy"), mmap_mode=mode) for name in PARTS]
+    shape = tuple(int(v) for v in np.load(os.path.join(path, "shape.npy")))
+    W = sp.csr_matrix(shape)
+    W.data, W.indices, W.indptr = parts
+    return W
+
+def cached(kind, x, y, cache_dir=CACHE_DIR, **params):
+    # build-or-load; returns (CSR matrix, cache hit?)
+    if kind not in BUILDERS:
+        raise ValueError(f"unknown weights kind {kind!r}; expected one of {KINDS}")
+    path = os.path.join(cache_dir, f"{kind}-{weights_key(kind, x, y, params)}")
+    if os.path.isdir(path):
+        return load(path), True
+    W = BUILDERS[kind](x, y, **params)
+    save(W, path)
+    return W, False
+
+# ---------------- libpysal ----------------
+def to_libpysal(W, ids=None):
+    # libpysal W with the same neighbours and weights (libpysal is only needed here)
+    from libpysal.weights import WSP
+
+    W = sp.csr_matrix(W, dtype=float, copy=True)
+    return WSP(W, id_order=list(ids) if ids is not None else None).to_W(silence_warnings=True)
+
+def from_libpysal(w):
+    return sp.csr_matrix(w.sparse, dtype=float)
+
+# ---------------- command line ----------------
+def main(argv):
+    args = list(argv)
+    opts = {}
+    for name in ("--k", "--threshold"):
+        if name in args:
+            i = args.index(name)
+            opts[name] = args[i + 1]
+            del args[i:i + 2]
+    geographic = "--geographic" in args
+    args = [a for a in args if a != "--geographic"]
+    if len(args) not in (1, 2):
+        raise SystemExit("usage: python spatial_weights.py coords.csv [knn|band|kernel] "
+                         "[--k K] [--threshold D] [--geographic]")
+    kind = args[1] if len(args) == 2 else "knn"
+    df = pd.read_csv(args[0])
+    lat_col, lon_col = find_latlon_columns(df.columns)
+    if lat_col is None or lon_col is None:
+        raise SystemExit(f"'{args[0]}' needs separate latitude/longitude columns")
+    df = df.dropna(subset=[lat_col, lon_col])
+    x, y = df[lon_col].to_numpy(dtype=float), df[lat_col].to_numpy(dtype=float)
+    params = {"geographic": geographic}
+    if kind == "band":
+        params["threshold"] = float(opts.get("--threshold", 5.0))
+    else:
+        params["k"] = int(opts.get("--k", 4 if kind == "knn" else 8))
+    for attempt in ("first", "second"):
+        t0 = time.perf_counter()
+        W, hit = cached(kind, x, y, **params)
+        print(f"{attempt} call: {'loaded (mmap)' if hit else 'built'} {kind} weights for {W.shape[0]:,} points, "
+              f"{W.nnz:,} links in {time.perf_counter() - t0:.3f} s")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
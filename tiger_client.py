@@ -0,0 +1,174 @@
+# tiger_client.py — batched, concurrent TIGERweb tract-centroid client
+# One pooled session, GEOID IN (...) batches, a token-bucket rate limit shared by
+# all worker threads, retries with exponential backoff, and per-batch fallback
+# across the MapServer layers (only GEOIDs still missing move to the next layer).
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from tiger_local import ring_centroid
+
+SERVICES = [
+    "https://tigerweb.geo.census.gov/arcgis/rest/services/TIGERweb/Tracts_Blocks/MapServer/16/query",
+    "https://tigerweb.geo.census.gov/arcgis/rest/services/TIGERweb/Tracts/MapServer/11/query",
+    "https://tigerweb.geo.census.gov/arcgis/rest/services/TIGERweb/MapServer/23/query",
+]
+
+BATCH_SIZE = 50      # GEOIDs per query; keeps GET URLs well under server limits
+MAX_WORKERS = 8
+RATE = 5.0           # requests per second across all workers (TIGERweb is a shared service)
+BURST = 8
+RETRIES = 3
+BACKOFF = 0.5        # seconds, doubled on every retry
+TIMEOUT = 15
+
+NOT_FOUND = "not found"
+
+# ---------------- helpers ----------------
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.stamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        # seconds spent waiting for a token
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+                self.stamp = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return waited
+                wait = (1.0 - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+def geometry_centroid(geom):
+    # (lat, lon) of an ArcGIS JSON geometry; polygons use the area-weighted centroid
+    if geom.get("rings"):
+        return ring_centroid(geom["rings"])
+    if "x" in geom and "y" in geom:
+        return float(geom["y"]), float(geom["x"])
+    return None
+
+def where_clause(geoids):
+    # GEOIDs are validated digit strings, so plain quoting is safe here
+    return "GEOID IN (" + ",".join(f"'{g}'" for g in geoids) + ")"
+
+# ---------------- client ----------------
+class TigerClient:
+    def __init__(self, services=SERVICES, batch_size=BATCH_SIZE, max_workers=MAX_WORKERS,
+                 rate=RATE, burst=BURST, retries=RETRIES, backoff=BACKOFF, timeout=TIMEOUT):
+        self.services = list(services)
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate, burst)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=len(self.services), pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.lock = threading.Lock()
+        self.http_calls = 0
+        self.http_retries = 0
+        self.failed_batches = 0
+        self.wait_seconds = 0.0  # rate-limit and backoff pauses, summed over workers
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.session.close()
+
+    def _count(self, calls=0, retries=0, failed=0, waited=0.0):
+        with self.lock:
+            self.http_calls += calls
+            self.http_retries += retries
+            self.failed_batches += failed
+            self.wait_seconds += waited
+
+    def _query(self, svc, geoids):
+        # {GEOID: geometry} from one layer, or None when the layer kept failing
+        params = {
+            "where": where_clause(geoids),
+            "outFields": "GEOID",
+            "returnGeometry": "true",
+            "outSR": "4326",
+            "f": "json",
+        }
+        for attempt in range(self.retries + 1):
+            if attempt:
+                pause = self.backoff * (2 ** (attempt - 1)) * (1 + random.random())
+                self._count(retries=1, waited=pause)
+                time.sleep(pause)
+            self._count(calls=1, waited=self.bucket.acquire())
+            try:
+                r = self.session.get(svc, params=params, timeout=self.timeout)
+                if r.status_code != 200:
+                    continue
+                j = r.json()
+                if "error" in j:
+                    continue
+            except (requests.RequestException, ValueError):
+                continue
+            out = {}
+            for feat in j.get("features") or []:
+                gid = str((feat.get("attributes") or {}).get("GEOID", ""))
+                if feat.get("geometry") and gid:
+                    out[gid] = feat["geometry"]
+            return out
+        self._count(failed=1)
+        return None
+
+    def _resolve_batch(self, geoids):
+        found = {}
+        todo = list(geoids)
+        all_answered = True
+        for svc in self.services:
+            if not todo:
+                break
+            geoms = self._query(svc, todo)
+            if geoms is None:
+                all_answered = False
+                continue
+            for gid in todo:
+                geom = geoms.get(gid)
+                c = geometry_centroid(geom) if geom else None
+                if c is not None:
+                    found[gid] = (c[0], c[1], svc)
+            todo = [g for g in todo if g not in found]
+        if all_answered:
+            # every layer answered and none had these tracts
+            for gid in todo:
+                found[gid] = (None, None, NOT_FOUND)
+        return found
+
+    def fetch(self, geoids):
+        # {GEOID: (lat, lon, source)}; GEOIDs hit only by errors are left out so callers can retry
+        geoids = [str(g) for g in dict.fromkeys(geoids)]
+        batches = [geoids[i:i + self.batch_size] for i in range(0, len(geoids), self.batch_size)]
+        results = {}
+        if not batches:
+            return results
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as pool:
+            for part in pool.map(self._resolve_batch, batches):
+                results.update(part)
+        return results
+
+    def report(self):
+        return (f"TIGERweb: {self.http_calls} HTTP calls, {self.http_retries} retries, "
+                f"{self.failed_batches} failed batch queries, {self.wait_seconds:.1f} s throttled")
@@ -0,0 +1,240 @@
+# tiger_local.py — offline tract centroids from local TIGER/Line tract files
+# usage: python tiger_local.py ingest tl_2023_40_tract.zip [--out tracts.npz]
+#        python tiger_local.py centroids tracts.npz [--csv tract_centroids.csv] [--warm-cache] [--vintage 2023]
+#
+# Polygons are kept as flat arrays: coords (m, 2) lon/lat, ring_offsets (r + 1)
+# into coords and tract_offsets (n + 1) into rings. Every ring is closed
+# (first vertex repeated), so consecutive vertices inside a ring are its edges.
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+GEOID_FIELDS = ("GEOID", "GEOID20", "GEOID10", "GEOIDFQ")
+
+# ---------------- polygon store ----------------
+class TractPolygons:
+    def __init__(self, geoid, coords, ring_offsets, tract_offsets):
+        self.geoid = np.asarray(geoid, dtype=np.int64)
+        self.coords = np.asarray(coords, dtype=np.float64)
+        self.ring_offsets = np.asarray(ring_offsets, dtype=np.int64)
+        self.tract_offsets = np.asarray(tract_offsets, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.geoid)
+
+    def geoid_strings(self):
+        return np.char.zfill(self.geoid.astype(str), 11)
+
+    def save(self, path):
+        np.savez(path, geoid=self.geoid, coords=self.coords,
+                 ring_offsets=self.ring_offsets, tract_offsets=self.tract_offsets)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as z:
+            return cls(z["geoid"], z["coords"], z["ring_offsets"], z["tract_offsets"])
+
+    @classmethod
+    def from_rings(cls, geoids, polygons):
+        # polygons: per tract, a list of rings, each a sequence of (lon, lat)
+        coords, ring_offsets, tract_offsets = [], [0], [0]
+        for rings in polygons:
+            for ring in rings:
+                ring = np.asarray(ring, dtype=np.float64)[:, :2]
+                if len(ring) and not np.array_equal(ring[0], ring[-1]):
+                    ring = np.vstack([ring, ring[:1]])
+                coords.append(ring)
+                ring_offsets.append(ring_offsets[-1] + len(ring))
+            tract_offsets.append(len(ring_offsets) - 1)
+        coords = np.vstack(coords) if coords else np.empty((0, 2))
+        return cls(np.asarray([int(g) for g in geoids], dtype=np.int64), coords, ring_offsets, tract_offsets)
+
+# ---------------- readers ----------------
+def _geoid_of(props):
+    for k in GEOID_FIELDS:
+        if props.get(k):
+            return str(props[k])[-11:]
+    raise KeyError(f"no GEOID field in {sorted(props)}")
+
+def read_geojson(path):
+    with open(path) as f:
+        data = json.load(f)
+    geoids, polygons = [], []
+    for feat in data.get("features", []):
+        geom = feat.get("geometry") or {}
+        if geom.get("type") == "Polygon":
+            rings = geom["coordinates"]
+        elif geom.get("type") == "MultiPolygon":
+            rings = [ring for poly in geom["coordinates"] for ring in poly]
+        else:
+            continue
+        geoids.append(_geoid_of(feat.get("properties") or {}))
+        polygons.append(rings)
+    return TractPolygons.from_rings(geoids, polygons)
+
+def read_shapefile(path):
+    try:
+        import shapefile  # pyshp; reads .shp and zipped TIGER/Line downloads
+    except ImportError:
+        raise SystemExit("Reading shapefiles needs pyshp: pip install pyshp")
+    sf = shapefile.Reader(path)
+    fields = [f[0] for f in sf.fields[1:]]
+    geoids, polygons = [], []
+    for sr in sf.iterShapeRecords():
+        pts = sr.shape.points
+        if not pts:
+            continue
+        starts = list(sr.shape.parts) + [len(pts)]
+        polygons.append([pts[a:b] for a, b in zip(starts[:-1], starts[1:])])
+        geoids.append(_geoid_of(dict(zip(fields, sr.record))))
+    return TractPolygons.from_rings(geoids, polygons)
+
+def read_tracts(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".json", ".geojson"):
+        return read_geojson(path)
+    if ext in (".shp", ".zip"):
+        return read_shapefile(path)
+    raise SystemExit(f"Unsupported tract file: {path} (expected .shp, .zip, .geojson)")
+
+# ---------------- centroids ----------------
+def _edges(polys):
+    # start/end vertex of every edge and the tract it belongs to
+    m = len(polys.coords)
+    ring_of_vertex = np.repeat(np.arange(len(polys.ring_offsets) - 1), np.diff(polys.ring_offsets))
+    tract_of_ring = np.repeat(np.arange(len(polys)), np.diff(polys.tract_offsets))
+    is_edge = np.ones(max(m - 1, 0), dtype=bool)
+    is_edge[polys.ring_offsets[1:-1] - 1] = False  # last vertex of a ring -> first vertex of the next
+    i = np.nonzero(is_edge)[0]
+    return i, i + 1, tract_of_ring[ring_of_vertex[i]]
+
+def centroids(polys):
+    # area-weighted centroids, (lat, lon) arrays; holes subtract because their
+    # winding is opposite to the outer rings in both shapefiles and GeoJSON
+    n = len(polys)
+    a, b, t = _edges(polys)
+    # shift every tract to its first vertex so the cross products don't cancel badly
+    first = polys.coords[polys.ring_offsets[polys.tract_offsets[:-1]]]
+    x0 = polys.coords[a, 0] - first[t, 0]
+    y0 = polys.coords[a, 1] - first[t, 1]
+    x1 = polys.coords[b, 0] - first[t, 0]
+    y1 = polys.coords[b, 1] - first[t, 1]
+    cross = x0 * y1 - x1 * y0
+    area2 = np.bincount(t, cross, minlength=n)
+    cx = np.bincount(t, (x0 + x1) * cross, minlength=n)
+    cy = np.bincount(t, (y0 + y1) * cross, minlength=n)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        lon = cx / (3.0 * area2) + first[:, 0]
+        lat = cy / (3.0 * area2) + first[:, 1]
+    # degenerate (zero-area) tracts fall back to the vertex mean
+    bad = ~np.isfinite(lon) | ~np.isfinite(lat) | (area2 == 0)
+    if bad.any():
+        cnt = np.bincount(t, minlength=n)
+        mx = np.bincount(t, polys.coords[a, 0], minlength=n)
+        my = np.bincount(t, polys.coords[a, 1], minlength=n)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            lon[bad] = (mx / cnt)[bad]
+            lat[bad] = (my / cnt)[bad]
+    return lat, lon
+
+def contains(polys, lat, lon):
+    # even-odd point-in-polygon test of one point per tract, all tracts at once
+    a, b, t = _edges(polys)
+    px, py = lon[t], lat[t]
+    xa, ya = polys.coords[a, 0], polys.coords[a, 1]
+    xb, yb = polys.coords[b, 0], polys.coords[b, 1]
+    straddle = (ya > py) != (yb > py)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        xint = xa + (py - ya) * (xb - xa) / (yb - ya)
+    crossings = np.bincount(t, straddle & (px < xint), minlength=len(polys))
+    return crossings % 2 == 1
+
+def _scanline_point(xy_rings, y):
+    # midpoint of the widest inside-span of a horizontal line through y
+    xs = []
+    for ring in xy_rings:
+        xa, ya = ring[:-1, 0], ring[:-1, 1]
+        xb, yb = ring[1:, 0], ring[1:, 1]
+        hit = (ya > y) != (yb > y)
+        xs.append(xa[hit] + (y - ya[hit]) * (xb[hit] - xa[hit]) / (yb[hit] - ya[hit]))
+    xs = np.sort(np.concatenate(xs)) if xs else np.empty(0)
+    if len(xs) < 2:
+        return None
+    spans = xs[1::2][: len(xs) // 2] - xs[0::2][: len(xs) // 2]
+    k = int(np.argmax(spans))
+    return (xs[2 * k] + xs[2 * k + 1]) / 2.0
+
+def interior_points(polys, lat=None, lon=None):
+    # the centroid when it falls inside the tract, otherwise a scanline point
+    if lat is None or lon is None:
+        lat, lon = centroids(polys)
+    lat, lon = lat.copy(), lon.copy()
+    outside = np.nonzero(~contains(polys, lat, lon))[0]
+    for i in outside:
+        r0, r1 = polys.tract_offsets[i], polys.tract_offsets[i + 1]
+        rings = [polys.coords[polys.ring_offsets[r]:polys.ring_offsets[r + 1]] for r in range(r0, r1)]
+        ys = np.concatenate([r[:, 1] for r in rings])
+        for y in (lat[i], (ys.min() + ys.max()) / 2.0):
+            x = _scanline_point(rings, y)
+            if x is not None:
+                lat[i], lon[i] = y, x
+                break
+    return lat, lon
+
+def ring_centroid(rings):
+    # (lat, lon) of one polygon given as ArcGIS/GeoJSON rings of [lon, lat]
+    polys = TractPolygons.from_rings([0], [rings])
+    lat, lon = centroids(polys)
+    return float(lat[0]), float(lon[0])
+
+# ---------------- command line ----------------
+def _opt(args, name, default=None):
+    if name in args:
+        i = args.index(name)
+        value = args[i + 1] if i + 1 < len(args) and not args[i + 1].startswith("--") else True
+        del args[i:i + (1 if value is True else 2)]
+        return value
+    return default
+
+def main(argv):
+    args = list(argv)
+    out = _opt(args, "--out")
+    csv_path = _opt(args, "--csv", "tract_centroids.csv")
+    warm = _opt(args, "--warm-cache", False)
+    vintage = _opt(args, "--vintage")
+    if len(args) != 2 or args[0] not in ("ingest", "centroids"):
+        raise SystemExit("usage: python tiger_local.py ingest <tracts.shp|.zip|.geojson> [--out tracts.npz]\n"
+                         "       python tiger_local.py centroids <tracts.npz> [--csv out.csv] [--warm-cache] [--vintage V]")
+    t0 = time.perf_counter()
+    if args[0] == "ingest":
+        polys = read_tracts(args[1])
+        out = out or os.path.splitext(os.path.basename(args[1]))[0] + ".npz"
+        polys.save(out)
+        print(f"Stored {len(polys)} tracts ({len(polys.coords)} vertices) in {out} "
+              f"in {time.perf_counter() - t0:.1f}s")
+        return
+
+    polys = TractPolygons.load(args[1])
+    lat, lon = centroids(polys)
+    ilat, ilon = interior_points(polys, lat, lon)
+    print(f"Computed {len(polys)} centroids in {time.perf_counter() - t0:.2f}s "
+          f"({int(((ilat != lat) | (ilon != lon)).sum())} needed an interior point)")
+
+    import pandas as pd
+    ids = polys.geoid_strings()
+    pd.DataFrame({
+        "GEOID": ids, "latitude": lat, "longitude": lon,
+        "interior_latitude": ilat, "interior_longitude": ilon,
+    }).to_csv(csv_path, index=False)
+    print(f"Wrote {csv_path}")
+    if warm:
+        from geocode_cache import GeocodeCache, DEFAULT_VINTAGE
+        with GeocodeCache(vintage=vintage or DEFAULT_VINTAGE) as cache:
+            n = cache.put_many(zip(ids, lat.tolist(), lon.tolist(), [f"tiger_line:{os.path.basename(args[1])}"] * len(ids)))
+            print(f"Warmed {cache.path} with {n} centroids")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
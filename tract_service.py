@@ -0,0 +1,328 @@
+# tract_service.py — local HTTP lookups of the scored tracts by GEOID or coordinate
+# usage: python tract_service.py [scored_tracts.csv] [--host 127.0.0.1] [--port 8765] [--cache 8192]
+#   GET  /tract/<GEOID>                  one tract: score, rank, risk badge, indicators
+#   GET  /tracts?geoid=GEOID,GEOID,...   batch lookup (POST /tracts with {"geoids": [...]} too)
+#   GET  /nearest?lat=35.47&lon=-97.52[&k=3]   nearest tract centroids, great-circle km
+#   GET  /health                         table size, cache and request counters
+#
+# Serves the table `nourishnet score` writes (scored_tracts.csv); without one the
+# data sheet is scored at startup the way OKC_MAPPED.py does it. Missing centroids
+# are filled from the geocode cache only, never from TIGERweb. Tracts live in a
+# tract_table.TractTable, so a GEOID is one hash probe on its int64 index, and
+# nearest queries run on a KD-tree of unit-sphere vectors (geo.py). Rendered JSON
+# is kept in an LRU keyed by the normalized request: a tract's record is rendered
+# once and batch responses are stitched from those cached records.
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+import datasheet
+from geo import chord_to_km, unit_xyz
+from scoring import risk_badge
+from tract_table import GEOID_WIDTH, INDICATORS, TractTable
+
+SCORED_CSV = "scored_tracts.csv"  # nourishnet.SCORED_CSV
+HOST = "127.0.0.1"
+PORT = 8765
+CACHE_SIZE = 8192   # rendered responses kept
+MAX_BATCH = 500     # GEOIDs per batch request
+MAX_NEAREST = 25    # k per nearest request
+COORD_DECIMALS = 5  # nearest queries are cached per ~1 m grid cell
+
+# ---------------- response cache ----------------
+class LRUCache:
+    # rendered responses by key, least recently used evicted past maxsize; thread-safe
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key, render):
+        # cached value, or render() stored under key (None results are not kept)
+        with self.lock:
+            value = self.data.get(key)
+            if value is not None:
+                self.data.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+        value = render()
+        if value is not None and self.maxsize:
+            with self.lock:
+                self.data[key] = value
+                self.data.move_to_end(key)
+                while len(self.data) > self.maxsize:
+                    self.data.popitem(last=False)
+        return value
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {"size": len(self.data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses,
+                    "hit_rate": round(self.hits / total, 4) if total else None}
+
+# ---------------- lookups ----------------
+def normalize_geoid(value):
+    # 11-digit tract GEOID string, or None when it cannot be one
+    g = str(value).strip()
+    return g.zfill(GEOID_WIDTH) if g.isdigit() and len(g) <= GEOID_WIDTH else None
+
+def _num(v, digits):
+    v = float(v)
+    return None if math.isnan(v) else round(v, digits)
+
+class TractService:
+    def __init__(self, table, cache_size=CACHE_SIZE):
+        # table: TractTable with composite_score and rank columns
+        self.table = table
+        self.cache = LRUCache(cache_size)
+        self.located = np.flatnonzero(~np.isnan(table.lat) & ~np.isnan(table.lon))
+        self.tree = cKDTree(unit_xyz(table.lat[self.located], table.lon[self.located]))
+        table.index  # build the GEOID hash index now rather than on the first request
+
+    @classmethod
+    def from_work(cls, work, cache_size=CACHE_SIZE):
+        # one row per GEOID (the TractTable hash index needs unique keys): a tract
+        # listed twice keeps its best-ranked row
+        dupes = work["Tract_FIPS"].duplicated()
+        if dupes.any():
+            print(f"tract_service: {int(dupes.sum())} repeated tract rows; keeping the best-ranked of each", file=sys.stderr)
+            work = (work.sort_values("composite_score", ascending=False, na_position="last", kind="stable")
+                    .drop_duplicates("Tract_FIPS").sort_index())
+        table = TractTable.from_work(work)
+        for name in ("composite_score", "rank"):
+            table[name] = np.asarray(work[name], dtype=float)
+        return cls(table, cache_size)
+
+    def record(self, pos):
+        # the JSON-ready dict for one table row
+        t = self.table
+        score = float(t["composite_score"][pos])
+        rank = t["rank"][pos]
+        color, badge, level = risk_badge(score)  # on the unrounded score, as the map does
+        return {
+            "geoid": str(t.geoid[pos]).zfill(GEOID_WIDTH),
+            "composite_score": _num(score, 4),
+            "rank": None if math.isnan(rank) else int(rank),
+            "badge": badge, "level": level, "color": color,
+            "lat": _num(t.lat[pos], 6), "lon": _num(t.lon[pos], 6),
+            "indicators": {name: _num(t.indicators[name][pos], 3) for name in INDICATORS},
+        }
+
+    def _rendered(self, geoid, pos=None):
+        # cached JSON bytes of one tract, None when the table does not have it;
+        # pos saves the index probe when the caller already made it
+        def render():
+            p = self.table.positions([geoid])[0] if pos is None else pos
+            return None if p < 0 else json.dumps(self.record(p), separators=(",", ":")).encode()
+        return self.cache.get(("tract", geoid), render)
+
+    def lookup(self, geoid):
+        g = normalize_geoid(geoid)
+        return None if g is None else self._rendered(g)
+
+    def batch(self, geoids):
+        # {"tracts": [...], "missing": [...]} in request order, duplicates answered once;
+        # all GEOIDs are probed in one vectorized index lookup
+        raw = list(dict.fromkeys(str(g).strip() for g in geoids))
+        norm = [normalize_geoid(g) for g in raw]
+        valid = [g for g in norm if g is not None]
+        positions = dict(zip(valid, self.table.positions(valid))) if valid else {}
+        found, missing = [], []
+        for r, g in zip(raw, norm):
+            body = None if g is None else self._rendered(g, positions[g])
+            (found if body is not None else missing).append(body if body is not None else r)
+        return b'{"tracts":[' + b",".join(found) + b'],"missing":' + json.dumps(missing).encode() + b"}"
+
+    def nearest(self, lat, lon, k=1):
+        # the k tract centroids closest to (lat, lon) with their great-circle distance
+        lat, lon = round(lat, COORD_DECIMALS), round(lon, COORD_DECIMALS)
+        k = min(k, len(self.located))
+
+        def render():
+            chord, idx = self.tree.query(unit_xyz([lat], [lon])[0], k)
+            chord, idx = np.atleast_1d(chord), np.atleast_1d(idx)
+            tracts = [{**self.record(self.located[i]), "distance_km": round(float(km), 3)}
+                      for i, km in zip(idx, chord_to_km(chord))]
+            return json.dumps({"lat": lat, "lon": lon, "tracts": tracts}, separators=(",", ":")).encode()
+        return self.cache.get(("nearest", lat, lon, k), render)
+
+    def health(self):
+        return {"tracts": len(self.table), "located": len(self.located), "cache": self.cache.stats()}
+
+def load_work(path=SCORED_CSV, sheet=None):
+    # the scored work table: the CSV `nourishnet score` wrote, or the data sheet scored now
+    if os.path.exists(path):
+        work = pd.read_csv(path, dtype={"Tract_FIPS": str})
+    else:
+        import OKC_MAPPED
+
+        print(f"'{path}' not found; scoring '{sheet or OKC_MAPPED.CSV_FILE}'", file=sys.stderr)
+        work = OKC_MAPPED.score_work(OKC_MAPPED.load_work(sheet or OKC_MAPPED.CSV_FILE))
+    datasheet.fill_centroids(work, fetch=False, log=lambda *a: print(*a, file=sys.stderr))
+    return work
+
+# ---------------- HTTP ----------------
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # listen backlog; the default 5 drops bursts of new connections
+
+class TractServer:
+    # ThreadingHTTPServer around a TractService; port 0 picks a free port
+    def __init__(self, service, host=HOST, port=PORT):
+        self.service = service
+        self.requests = 0
+        self.errors = 0
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.server = _HTTPServer((host, port), self._handler())
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self.url
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def health(self):
+        with self.lock:
+            counters = {"requests": self.requests, "errors": self.errors}
+        return {**self.service.health(), **counters, "uptime_s": round(time.time() - self.started, 1)}
+
+    def _handler(self):
+        server = self
+        service = self.service
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                self._guarded(self._get)
+
+            def do_POST(self):
+                self._guarded(self._post)
+
+            def _guarded(self, handle):
+                # unexpected errors answer 500 with a JSON body instead of dropping the connection
+                try:
+                    handle()
+                except Exception as exc:
+                    print(f"tract_service: {self.command} {self.path}: {exc!r}", file=sys.stderr)
+                    self.close_connection = True
+                    self._error(500, f"internal error: {type(exc).__name__}")
+
+            def _get(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                parts = url.path.strip("/").split("/")
+                if len(parts) == 2 and parts[0] == "tract":
+                    body = service.lookup(unquote(parts[1]))
+                    if body is None:
+                        return self._error(404, f"tract {unquote(parts[1])!r} not found")
+                    return self._send(200, body)
+                if parts == ["tracts"]:
+                    return self._batch([g for v in query.get("geoid", []) for g in v.split(",") if g.strip()])
+                if parts == ["nearest"]:
+                    try:
+                        lat, lon = float(query["lat"][0]), float(query["lon"][0])
+                        k = int(query.get("k", ["1"])[0])
+                    except (KeyError, ValueError):
+                        return self._error(400, "nearest needs numeric lat and lon (and an integer k)")
+                    if not (-90 <= lat <= 90 and -180 <= lon <= 180) or not 1 <= k <= MAX_NEAREST:
+                        return self._error(400, f"lat/lon out of range or k not in 1..{MAX_NEAREST}")
+                    return self._send(200, service.nearest(lat, lon, k))
+                if parts == ["health"]:
+                    return self._send(200, json.dumps(server.health()).encode())
+                self._error(404, f"no route {url.path!r}")
+
+            def _post(self):
+                if urlparse(self.path).path.strip("/") != "tracts":
+                    return self._error(404, f"no route {self.path!r}")
+                try:
+                    payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                    geoids = payload["geoids"]
+                except (ValueError, KeyError, TypeError):
+                    return self._error(400, 'POST /tracts needs a JSON body {"geoids": [...]}')
+                if not isinstance(geoids, list):
+                    return self._error(400, "geoids must be a list")
+                self._batch(geoids)
+
+            def _batch(self, geoids):
+                if not geoids:
+                    return self._error(400, "no GEOIDs given")
+                if len(geoids) > MAX_BATCH:
+                    return self._error(400, f"at most {MAX_BATCH} GEOIDs per request, got {len(geoids)}")
+                self._send(200, service.batch(geoids))
+
+            def _error(self, status, message):
+                with server.lock:
+                    server.errors += 1
+                self._send(status, json.dumps({"error": message}).encode())
+
+            def _send(self, status, body):
+                with server.lock:
+                    server.requests += 1
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+# ---------------- command line ----------------
+def main(argv):
+    args = list(argv)
+    opts = {}
+    for name in ("--host", "--port", "--cache"):
+        if name in args:
+            i = args.index(name)
+            opts[name] = args[i + 1]
+            del args[i:i + 2]
+    if len(args) > 1:
+        raise SystemExit("usage: python tract_service.py [scored_tracts.csv] [--host HOST] [--port PORT] [--cache N]")
+    t0 = time.perf_counter()
+    service = TractService.from_work(load_work(args[0] if args else SCORED_CSV), int(opts.get("--cache", CACHE_SIZE)))
+    server = TractServer(service, opts.get("--host", HOST), int(opts.get("--port", PORT)))
+    print(f"Serving {len(service.table):,} tracts ({len(service.located):,} located) on {server.url} "
+          f"(loaded in {time.perf_counter() - t0:.2f}s)", flush=True)
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server.server_close()
+        print(json.dumps(server.health()))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
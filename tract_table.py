@@ -0,0 +1,184 @@
+# tract_table.py — compact struct-of-arrays tract table shared by scoring, map_render and the stats code
+# usage: python tract_table.py data_sheet.csv   (sizes of the DataFrame and TractTable forms)
+#
+# One NumPy array per field instead of a DataFrame of float64 and string cells:
+#   geoid      int64, the 11-digit tract FIPS as a number
+#   county     pandas Categorical of the 5-digit county FIPS (int16 codes)
+#   lat, lon   float64 (float32 would move points by up to a metre)
+#   indicators float32, NaN where missing, plus an Arrow-style validity bitmap
+#              (LSB-first packed bits, 1 = present) per field
+#   extras     computed columns (composite_score, rank, ...) at whatever dtype they are added
+# GEOID -> row lookups go through a pandas hash index on the int64 column. Columns
+# come back as zero-copy views, and slice() shares every buffer with its parent
+# (the bitmaps carry a bit offset, as Arrow's do). Indexing by the work table's
+# column names (table["poverty"], table["Tract_FIPS"]) lets scoring.indicator_matrix,
+# sensitivity.rank_stability and map_render take a TractTable where they take the
+# DataFrame; float32 inputs move composite scores by ~1e-7.
+import sys
+
+import numpy as np
+import pandas as pd
+
+INDICATORS = ("total_pop", "poverty", "income", "lap1_pct", "lap10_pct", "snap", "obesity", "diabetes", "inactive")
+GEOID_WIDTH = 11
+
+def pack_validity(values):
+    # Arrow-style validity bitmap (1 = present) of a float array
+    return np.packbits(~np.isnan(values), bitorder="little")
+
+class TractTable:
+    def __init__(self, geoid, county, lat, lon, indicators, extras=None, valid=None, offset=0, index=None):
+        # geoid int64, county Categorical, lat/lon float64, indicators {name: float32};
+        # valid/offset/index are shared by views and recomputed when not given
+        self.geoid = geoid
+        self.county = county
+        self.lat = lat
+        self.lon = lon
+        self.indicators = indicators
+        self.extras = {} if extras is None else extras
+        self.valid_bits = {k: pack_validity(v) for k, v in indicators.items()} if valid is None else valid
+        self.offset = offset
+        self._index = index
+
+    @classmethod
+    def from_work(cls, work):
+        # from datasheet.build_work's table (or anything with its columns); missing
+        # indicator columns come out all-missing
+        n = len(work)
+        fips = pd.Series(np.asarray(work["Tract_FIPS"]), dtype=str)
+        geoid = fips.astype(np.int64).to_numpy()
+        county = pd.Categorical(fips.str[:5].to_numpy())
+        indicators = {}
+        for name in INDICATORS:
+            v = np.asarray(work[name], dtype=np.float32) if name in work else np.full(n, np.nan, dtype=np.float32)
+            indicators[name] = np.ascontiguousarray(v)
+        return cls(geoid, county, np.asarray(work["lat"], dtype=float).copy(), np.asarray(work["lon"], dtype=float).copy(),
+                   indicators)
+
+    # ---------------- column access ----------------
+    def __len__(self):
+        return len(self.geoid)
+
+    @property
+    def columns(self):
+        return ["Tract_FIPS", "county", "lat", "lon", *self.indicators, *self.extras]
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def __getitem__(self, name):
+        # zero-copy view of a column; "Tract_FIPS" is rebuilt as zero-padded strings
+        if name in self.indicators:
+            return self.indicators[name]
+        if name in self.extras:
+            return self.extras[name]
+        if name in ("lat", "lon", "geoid", "county"):
+            return getattr(self, name)
+        if name == "Tract_FIPS":
+            return self.tract_fips()
+        raise KeyError(name)
+
+    def __setitem__(self, name, values):
+        # computed columns keep the dtype they are given
+        values = np.asarray(values)
+        if len(values) != len(self):
+            raise ValueError(f"column {name!r} has {len(values)} rows, table has {len(self)}")
+        self.extras[name] = values
+
+    def tract_fips(self):
+        return np.char.zfill(self.geoid.astype("U"), GEOID_WIDTH)
+
+    def valid(self, name):
+        # bool array, True where the indicator is present
+        bits = np.unpackbits(self.valid_bits[name], count=self.offset + len(self), bitorder="little")
+        return bits[self.offset:].astype(bool)
+
+    def matrix(self, names=INDICATORS, dtype=np.float32):
+        # (tracts, len(names)) copy for code that wants one 2-D array
+        return np.column_stack([np.asarray(self[n], dtype=dtype) for n in names])
+
+    @property
+    def nbytes(self):
+        # bytes held by this table's own buffers (views count their parent's bitmaps)
+        arrays = [self.geoid, self.lat, self.lon, self.county.codes, *self.indicators.values(),
+                  *self.valid_bits.values(), *self.extras.values()]
+        return sum(a.nbytes for a in arrays) + sum(len(str(c)) for c in self.county.categories)
+
+    # ---------------- rows ----------------
+    @property
+    def index(self):
+        # GEOID -> row hash index, built on first use
+        if self._index is None:
+            self._index = pd.Index(self.geoid)
+        return self._index
+
+    def positions(self, geoids):
+        # row of every GEOID (str or int), -1 where the table does not have it
+        keys = np.asarray([int(g) for g in geoids], dtype=np.int64)
+        return self.index.get_indexer(keys)
+
+    def row(self, geoid):
+        # {column: value} for one tract; KeyError when it is not in the table
+        pos = self.positions([geoid])[0]
+        if pos < 0:
+            raise KeyError(geoid)
+        out = {"Tract_FIPS": str(self.geoid[pos]).zfill(GEOID_WIDTH), "county": self.county[pos],
+               "lat": float(self.lat[pos]), "lon": float(self.lon[pos])}
+        for name, v in (*self.indicators.items(), *self.extras.items()):
+            out[name] = v[pos].item()
+        return out
+
+    def slice(self, start, stop):
+        # zero-copy view of rows [start, stop)
+        start, stop, _ = slice(start, stop).indices(len(self))
+        stop = max(stop, start)
+        return TractTable(self.geoid[start:stop], self.county[start:stop], self.lat[start:stop], self.lon[start:stop],
+                          {k: v[start:stop] for k, v in self.indicators.items()},
+                          {k: v[start:stop] for k, v in self.extras.items()},
+                          self.valid_bits, self.offset + start)
+
+    def take(self, rows):
+        # new table holding the given rows in the given order
+        rows = np.asarray(rows)
+        return TractTable(self.geoid[rows], self.county[rows], self.lat[rows], self.lon[rows],
+                          {k: v[rows] for k, v in self.indicators.items()},
+                          {k: v[rows] for k, v in self.extras.items()})
+
+    def sort_by(self, name, ascending=False):
+        # rows ordered by a column, NaN last (DataFrame.sort_values(na_position="last"), stable)
+        v = np.asarray(self[name], dtype=float)
+        key = v if ascending else -v
+        return self.take(np.argsort(key, kind="stable"))
+
+    def county_spans(self):
+        # {county FIPS: (first row, row count)} of a county-sorted table
+        codes = self.county.codes
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        counts = np.diff(np.r_[starts, len(codes)])
+        return {self.county[s]: (int(s), int(c)) for s, c in zip(starts, counts)}
+
+    def to_frame(self):
+        # the work-table DataFrame (float64 indicators, string FIPS) for pandas-only consumers
+        out = {"Tract_FIPS": self.tract_fips(), "lat": self.lat, "lon": self.lon}
+        out.update({k: v.astype(float) for k, v in self.indicators.items()})
+        out.update(self.extras)
+        return pd.DataFrame(out)
+
+# ---------------- command line ----------------
+def main(argv):
+    if len(argv) != 1:
+        raise SystemExit("usage: python tract_table.py data_sheet.csv")
+    import datasheet
+    import schema
+
+    df, profile = schema.load_sheet(argv[0])
+    work = datasheet.build_work(df, profile["mapping"], log=lambda *_: None)
+    table = TractTable.from_work(work)
+    print(f"{len(table):,} tracts in {len(table.county.categories)} counties")
+    print(f"  DataFrame:  {work.memory_usage(deep=True).sum() / 1e6:8.2f} MB")
+    print(f"  TractTable: {table.nbytes / 1e6:8.2f} MB")
+    for name in INDICATORS:
+        print(f"  {name:<10} {int(table.valid(name).sum()):>7,} present")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])